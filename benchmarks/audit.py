@@ -0,0 +1,65 @@
+import asyncio
+import os
+import tempfile
+import time
+
+from deny import Ability, AutoPermission, Policy, authorize
+from deny.audit import AuditLog, FileSink
+
+"""
+Run this benchmark with : `python -m benchmarks.audit`.
+It measures how many decisions per second can be recorded by an AuditLog
+writing to a file, the target being at least 100k decisions per second.
+"""
+
+DECISIONS = 200_000
+
+
+class ProjectPermissions:
+    view = AutoPermission()
+
+
+class UserPolicy(Policy):
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, id: int) -> bool:
+        return id % 2 == 0
+
+
+def bench_record(audit_log: AuditLog) -> float:
+    start = time.perf_counter()
+    for id in range(DECISIONS):
+        audit_log.record(ProjectPermissions.view, id % 2 == 0, (id,), {})
+    return time.perf_counter() - start
+
+
+async def bench_can(ability: Ability) -> float:
+    start = time.perf_counter()
+    for id in range(DECISIONS):
+        await ability.can(ProjectPermissions.view, id)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "audit.log")
+
+        audit_log = AuditLog(FileSink(path), max_size=DECISIONS)
+        duration = bench_record(audit_log)
+        audit_log.close()
+        print(f"AuditLog.record(): {DECISIONS / duration:,.0f} decisions/s")
+
+        duration = asyncio.run(bench_can(Ability(policy=UserPolicy())))
+        print(f"Ability.can() without audit: {DECISIONS / duration:,.0f} decisions/s")
+
+        audit_log = AuditLog(FileSink(path), max_size=DECISIONS)
+        ability = Ability(policy=UserPolicy(), audit_log=audit_log)
+        duration = asyncio.run(bench_can(ability))
+        start = time.perf_counter()
+        audit_log.close()
+        close_duration = time.perf_counter() - start
+        print(f"Ability.can() with audit: {DECISIONS / duration:,.0f} decisions/s")
+        print(f"Remaining records written in {close_duration:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from deny import Ability, AutoPermission, Policy, authorize
+from deny.sync import Ability as SyncAbility
+from deny.sync import Policy as SyncPolicy
+from deny.sync import authorize as sync_authorize
+
+"""
+Run this benchmark with : `python -m benchmarks.can`.
+It compares the cost of a trivial allowed check made with the checks generated
+for the policy class, with the generic checks, and with a plain method call.
+"""
+
+CHECKS = 1_000_000
+
+
+class ProjectPermissions:
+    view = AutoPermission()
+
+
+class UserPolicy(Policy):
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, id: int) -> bool:
+        return True
+
+
+class SyncUserPolicy(SyncPolicy):
+    @sync_authorize(ProjectPermissions.view)
+    def can_view_project(self, id: int) -> bool:
+        return True
+
+
+async def bench_can(ability: Ability) -> float:
+    permission = ProjectPermissions.view
+    start = time.perf_counter()
+    for id in range(CHECKS):
+        await ability.can(permission, id)
+    return time.perf_counter() - start
+
+
+def bench_sync_can(ability: SyncAbility) -> float:
+    permission = ProjectPermissions.view
+    start = time.perf_counter()
+    for id in range(CHECKS):
+        ability.can(permission, id)
+    return time.perf_counter() - start
+
+
+def bench_method(policy: SyncUserPolicy) -> float:
+    start = time.perf_counter()
+    for id in range(CHECKS):
+        policy.can_view_project(id)
+    return time.perf_counter() - start
+
+
+def print_result(name: str, duration: float) -> None:
+    print(f"{name}: {duration / CHECKS * 1e9:,.0f} ns/check")
+
+
+def main() -> None:
+    print_result("Plain method call", bench_method(SyncUserPolicy()))
+    for compiled in (True, False):
+        label = "compiled" if compiled else "generic"
+        ability = Ability(policy=UserPolicy(), compiled=compiled)
+        print_result(f"Ability.can() {label}", asyncio.run(bench_can(ability)))
+        sync_ability = SyncAbility(policy=SyncUserPolicy(), compiled=compiled)
+        print_result(f"sync Ability.can() {label}", bench_sync_can(sync_ability))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import falcon
+import falcon.asgi
+from fastapi import FastAPI
+from flask import Flask, jsonify
+from flask.wrappers import Response
+from sanic import Sanic
+from sanic.request import Request as SanicRequest
+from sanic.response import HTTPResponse, json
+
+from deny import Ability, Permission, Policy, authorize
+from deny.ext.asgi import AuthorizationMiddleware
+from deny.ext.spec import all_of
+from examples.falcon import app as falcon_example
+from examples.fastapi import app as fastapi_example
+from examples.flask import app as flask_example
+from examples.sanic import app as sanic_example
+
+"""
+Run this benchmark with : `python -m benchmarks.frameworks`.
+It drives the example applications in-process (ASGI or WSGI calls, without
+network) at a fixed concurrency, with the authorization of the examples and
+without it (the same endpoint without deny), and reports the requests/s, the
+p50/p99 latency and the CPU time per request of each.
+It then sweeps the complexity of the policy checked by the ASGI middleware:
+the number of permissions required, the depth of the policy inheritance and
+asynchronous or synchronous access methods.
+"""
+
+REQUESTS = 5_000
+CONCURRENCY = 10
+# requests made before measuring (ex: to fill the caches of the frameworks)
+WARM_UP_REQUESTS = 200
+PATH = "/projects/1"
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+ASGIApp = Callable[[Scope, Callable[[], Awaitable[Message]], Any], Awaitable[None]]
+WSGIApp = Callable[[Dict[str, Any], Callable[..., Any]], Any]
+
+
+class Result(NamedTuple):
+    requests: int
+    # wall and CPU seconds of the run
+    seconds: float
+    cpu_seconds: float
+    # sorted latencies of the requests
+    latencies: List[float]
+
+    def percentile(self, ratio: float) -> float:
+        return self.latencies[min(int(ratio * len(self.latencies)), self.requests - 1)]
+
+
+def get_scope(path: str) -> Scope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+
+async def call_asgi(app: ASGIApp, path: str) -> int:
+    status = 0
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(get_scope(path), receive, send)
+    return status
+
+
+async def start_lifespan(app: ASGIApp) -> Callable[[], Awaitable[None]]:
+    # the applications are started (ex: Sanic finalizes its routes) and
+    # the returned function stops them
+    messages: "asyncio.Queue[Message]" = asyncio.Queue()
+    events: "asyncio.Queue[Message]" = asyncio.Queue()
+    task = asyncio.ensure_future(
+        app({"type": "lifespan", "asgi": {"version": "3.0"}}, messages.get, events.put)
+    )
+    await messages.put({"type": "lifespan.startup"})
+    await events.get()
+
+    async def stop() -> None:
+        await messages.put({"type": "lifespan.shutdown"})
+        await events.get()
+        await task
+
+    return stop
+
+
+async def bench_asgi(app: ASGIApp, requests: int, concurrency: int) -> Result:
+    stop = await start_lifespan(app)
+    assert await call_asgi(app, PATH) == 200
+    for _ in range(WARM_UP_REQUESTS):
+        await call_asgi(app, PATH)
+    latencies: List[float] = []
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            start = time.perf_counter()
+            await call_asgi(app, PATH)
+            latencies.append(time.perf_counter() - start)
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    await asyncio.gather(*[worker(requests // concurrency) for _ in range(concurrency)])
+    seconds, cpu_seconds = time.perf_counter() - start, time.process_time() - cpu_start
+    await stop()
+    return Result(len(latencies), seconds, cpu_seconds, sorted(latencies))
+
+
+def call_wsgi(app: WSGIApp, path: str) -> str:
+    status = ""
+
+    def start_response(response_status: str, headers: Any, *args: Any) -> None:
+        nonlocal status
+        status = response_status
+
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "8000",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": None,
+        "wsgi.errors": None,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    b"".join(app(environ, start_response))
+    return status
+
+
+def bench_wsgi(app: WSGIApp, requests: int, concurrency: int) -> Result:
+    assert call_wsgi(app, PATH).startswith("200")
+    for _ in range(WARM_UP_REQUESTS):
+        call_wsgi(app, PATH)
+
+    def worker(count: int) -> List[float]:
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            call_wsgi(app, PATH)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(worker, [requests // concurrency] * concurrency))
+    seconds, cpu_seconds = time.perf_counter() - start, time.process_time() - cpu_start
+    latencies = sorted(latency for result in results for latency in result)
+    return Result(len(latencies), seconds, cpu_seconds, latencies)
+
+
+def create_flask_baseline() -> Flask:
+    app = Flask("baseline")
+
+    @app.get("/projects/<int:id>")
+    def get(id: int) -> Response:
+        return jsonify({"id": id})
+
+    return app
+
+
+def create_fastapi_baseline() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/projects/{id}")
+    async def get(id: int) -> Dict[str, int]:
+        return {"id": id}
+
+    return app
+
+
+def create_falcon_baseline() -> falcon.asgi.App:
+    class ProjectResource:
+        async def on_get(
+            self, req: falcon.asgi.Request, resp: falcon.asgi.Response, id: int
+        ) -> None:
+            resp.media = {"id": id}
+
+    app = falcon.asgi.App()
+    app.add_route("/projects/{id:int}", ProjectResource())
+    return app
+
+
+def create_sanic_baseline() -> Sanic:
+    app = Sanic("baseline")
+    # the methods of the Sanic class can only be rewritten for one application
+    app.config.TOUCHUP = False
+
+    @app.get("/projects/<id:int>")
+    async def get(request: SanicRequest, id: int) -> HTTPResponse:
+        return json({"id": id})
+
+    return app
+
+
+def create_policy(permissions: int, depth: int, is_async: bool) -> Policy:
+    """Returns a policy granting `permissions` permissions, their access
+    methods being spread over `depth` levels of inheritance.
+    """
+    policy_class: type = Policy
+    for level in range(depth + 1):
+        namespace: Dict[str, Any] = {}
+        for index in range(level, permissions, depth + 1):
+            namespace[f"can_{index}"] = create_access_method(
+                PERMISSIONS[index], is_async
+            )
+        policy_class = type(f"Policy{level}", (policy_class,), namespace)
+    return policy_class()
+
+
+def create_access_method(permission: Permission, is_async: bool) -> Any:
+    if is_async:
+
+        async def can(self: Policy, id: int) -> bool:
+            return id > 0
+
+    else:
+
+        def can(self: Policy, id: int) -> bool:  # type: ignore
+            return id > 0
+
+    return authorize(permission)(can)
+
+
+PERMISSIONS = [Permission(f"permission_{index}") for index in range(100)]
+
+
+def create_sweep_app(
+    permissions: int, depth: int, is_async: bool
+) -> AuthorizationMiddleware:
+    policy = create_policy(permissions, depth, is_async)
+    return AuthorizationMiddleware(
+        create_fastapi_baseline(),
+        {
+            ("GET", "/projects/{id:int}"): all_of(
+                *PERMISSIONS[:permissions], params={"id": "id"}
+            )
+        },
+        ability_factory=lambda scope: Ability(policy=policy),
+    )
+
+
+def print_result(name: str, result: Result, baseline: Optional[Result]) -> None:
+    overhead = ""
+    if baseline is not None:
+        added = (result.cpu_seconds - baseline.cpu_seconds) / result.requests
+        overhead = f" | {added * 1e6:+,.1f} µs CPU/request"
+    print(
+        f"{name:<42} {result.requests / result.seconds:>9,.0f} req/s"
+        f" | p50 {result.percentile(0.5) * 1e6:>8,.1f} µs"
+        f" | p99 {result.percentile(0.99) * 1e6:>8,.1f} µs"
+        f" | {result.cpu_seconds / result.requests * 1e6:>7,.1f} µs CPU/request"
+        f"{overhead}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.frameworks")
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+    requests, concurrency = args.requests, args.concurrency
+    print(f"{requests} requests, concurrency {concurrency}")
+    sanic_example.config.TOUCHUP = False
+
+    flask_baseline = bench_wsgi(create_flask_baseline(), requests, concurrency)
+    print_result("Flask without authorization", flask_baseline, None)
+    print_result(
+        "Flask with deny.ext.flask",
+        bench_wsgi(flask_example, requests, concurrency),
+        flask_baseline,
+    )
+
+    asgi_examples: List[Tuple[str, ASGIApp, ASGIApp]] = [
+        ("FastAPI", create_fastapi_baseline(), fastapi_example),
+        ("Falcon", create_falcon_baseline(), falcon_example),
+        ("Sanic", create_sanic_baseline(), sanic_example),
+    ]
+    for name, baseline_app, example_app in asgi_examples:
+        baseline = asyncio.run(bench_asgi(baseline_app, requests, concurrency))
+        print_result(f"{name} without authorization", baseline, None)
+        print_result(
+            f"{name} with deny.ext.{name.lower()}",
+            asyncio.run(bench_asgi(example_app, requests, concurrency)),
+            baseline,
+        )
+
+    print("\nPolicy complexity (FastAPI with deny.ext.asgi)")
+    baseline = asyncio.run(bench_asgi(create_fastapi_baseline(), requests, concurrency))
+    print_result("without authorization", baseline, None)
+    for is_async in (False, True):
+        for permissions in (1, 10, 100):
+            for depth in (0, 5):
+                app = create_sweep_app(permissions, depth, is_async)
+                print_result(
+                    f"{permissions} permissions, depth {depth},"
+                    f" {'async' if is_async else 'sync'} methods",
+                    asyncio.run(bench_asgi(app, requests, concurrency)),
+                    baseline,
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import tracemalloc
+from typing import Any, Callable, List
+
+from deny import Ability, AutoPermission, Policy, authorize
+
+"""
+Run this benchmark with : `python -m benchmarks.memory`.
+It measures with tracemalloc the memory used by each in-flight request,
+holding an Ability and its Policy, with a regular and a slotted policy.
+"""
+
+REQUESTS = 10_000
+
+
+class ProjectPermissions:
+    view = AutoPermission()
+
+
+class UserPolicy(Policy):
+    def __init__(self, user_id: int) -> None:
+        self._user_id = user_id
+
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, owner_id: int) -> bool:
+        return self._user_id == owner_id
+
+
+class SlottedUserPolicy(Policy):
+    __slots__ = ("_user_id",)
+
+    def __init__(self, user_id: int) -> None:
+        self._user_id = user_id
+
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, owner_id: int) -> bool:
+        return self._user_id == owner_id
+
+
+def bench_requests(create_policy: Callable[[int], Policy]) -> float:
+    # the user ids are created beforehand so they are not counted
+    user_ids = list(range(1_000_000, 1_000_000 + REQUESTS))
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    requests: List[Any] = [
+        Ability(policy=create_policy(user_id)) for user_id in user_ids
+    ]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del requests
+    return (end - start) / REQUESTS
+
+
+def main() -> None:
+    print(f"Regular policy: {bench_requests(UserPolicy):,.0f} bytes/request")
+    print(f"Slotted policy: {bench_requests(SlottedUserPolicy):,.0f} bytes/request")
+
+
+if __name__ == "__main__":
+    main()
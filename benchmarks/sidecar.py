@@ -0,0 +1,138 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from deny import Ability, AutoPermission, Policy, authorize
+from deny.sidecar import (
+    AsyncSidecarClient,
+    SidecarPolicy,
+    SyncSidecarClient,
+    SyncSidecarPolicy,
+)
+from deny.sync import Ability as SyncAbility
+
+"""
+Run this benchmark with : `python -m benchmarks.sidecar`.
+It compares checks made in the current process with checks made in a sidecar
+server running in another process: one at a time, concurrently (coalesced
+by the server), and for many objects at once.
+"""
+
+CHECKS = 20_000
+CONCURRENCY = 100
+
+
+class ProjectPermissions:
+    view = AutoPermission()
+
+
+class UserPolicy(Policy):
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, id: int) -> bool:
+        return id % 2 == 0
+
+
+# served by the sidecar started with `python -m deny.sidecar`
+POLICIES = {"UserPolicy": UserPolicy()}
+
+
+def run_server(path: str) -> Callable[[], None]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "deny.sidecar", path, "benchmarks.sidecar:POLICIES"]
+    )
+    while not os.path.exists(path):
+        time.sleep(0.01)
+
+    def stop() -> None:
+        process.send_signal(signal.SIGINT)
+        process.wait()
+
+    return stop
+
+
+async def bench_can(ability: Ability) -> float:
+    start = time.perf_counter()
+    for id in range(CHECKS):
+        await ability.can(ProjectPermissions.view, id)
+    return time.perf_counter() - start
+
+
+async def bench_concurrent_can(ability: Ability) -> float:
+    start = time.perf_counter()
+    for offset in range(0, CHECKS, CONCURRENCY):
+        await asyncio.gather(
+            *[
+                ability.can(ProjectPermissions.view, id)
+                for id in range(offset, offset + CONCURRENCY)
+            ]
+        )
+    return time.perf_counter() - start
+
+
+async def bench_can_many(ability: Ability) -> float:
+    start = time.perf_counter()
+    for offset in range(0, CHECKS, CONCURRENCY):
+        await ability.can_many(
+            ProjectPermissions.view, range(offset, offset + CONCURRENCY)
+        )
+    return time.perf_counter() - start
+
+
+def bench_sync_can(ability: SyncAbility) -> float:
+    start = time.perf_counter()
+    for id in range(CHECKS):
+        ability.can(ProjectPermissions.view, id)
+    return time.perf_counter() - start
+
+
+async def bench_async(path: str) -> None:
+    local_ability = Ability(policy=UserPolicy())
+    client = AsyncSidecarClient(path)
+    sidecar_ability = Ability(policy=SidecarPolicy(client, UserPolicy))
+    try:
+        for name, ability in (
+            ("in-process", local_ability),
+            ("sidecar", sidecar_ability),
+        ):
+            print_result(f"Ability.can() {name}", await bench_can(ability))
+            print_result(
+                f"Ability.can() {name} x{CONCURRENCY} concurrent",
+                await bench_concurrent_can(ability),
+            )
+            print_result(
+                f"Ability.can_many() {name} by {CONCURRENCY}",
+                await bench_can_many(ability),
+            )
+    finally:
+        await client.close()
+
+
+def print_result(name: str, duration: float) -> None:
+    print(f"{name}: {duration / CHECKS * 1e6:,.2f} µs/check")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "deny.sock")
+        stop = run_server(path)
+        try:
+            asyncio.run(bench_async(path))
+            client = SyncSidecarClient(path)
+            print_result(
+                "sync Ability.can() sidecar",
+                bench_sync_can(
+                    SyncAbility(policy=SyncSidecarPolicy(client, UserPolicy))
+                ),
+            )
+            client.close()
+        finally:
+            stop()
+
+
+if __name__ == "__main__":
+    main()
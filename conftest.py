@@ -0,0 +1,2 @@
+# fixtures of deny.ext.pytest_plugin (ex: check_budget) used by the tests
+pytest_plugins = ["deny.ext.pytest_plugin"]
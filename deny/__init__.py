@@ -1,8 +1,18 @@
 __version__ = "0.1.0"
 
 from ._async.ability import Ability
-from ._async.policy import Policy, authorize
+from ._async.policy import Policy, authorize, authorize_batch, depends_on, loader
 from .action import Action
 from .permission import AutoPermission, Permission
 
-__all__ = ["Ability", "Action", "Policy", "authorize", "Permission", "AutoPermission"]
+__all__ = [
+    "Ability",
+    "Action",
+    "Policy",
+    "authorize",
+    "authorize_batch",
+    "depends_on",
+    "loader",
+    "Permission",
+    "AutoPermission",
+]
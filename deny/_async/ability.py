@@ -1,24 +1,147 @@
-from typing import Any, Optional
+import time
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 
 from deny.action import Action
-from deny.errors import UnauthorizedError, UndefinedPermission
+from deny.audit import AuditLog
+from deny.budget import CheckAccount, CheckBudget, open_account
+from deny.compiler import CompiledCan
+from deny.errors import (
+    AccessMethodNotSync,
+    AccessMethodTimeout,
+    CircuitBreakerOpen,
+    UnauthorizedError,
+    UndefinedPermission,
+)
+from deny.fields import FieldProjection, FieldSchema
+from deny.loader import AsyncLoader
+from deny.matrix import PermissionMatrix
+from deny.page import FetchFunction, Page, get_fetch_size
 from deny.permission import Permission
+from deny.singleflight import AsyncSingleFlight, get_call_key
+from deny.timeout import (
+    AsyncTimeout,
+    CircuitBreaker,
+    SyncTimeout,
+    get_deadline,
+    get_timeout,
+)
+from deny.trace import TraceRecorder
+from deny.utils import (
+    AccessMethod,
+    AnyAccessMethod,
+    AnyBatchAccessMethod,
+    KeyFunction,
+    SyncAccessMethod,
+    SyncBatchAccessMethod,
+)
 
 from .policy import Policy
 
 
 class Ability:
+    # an ability is usually created for each request
+    __slots__ = (
+        "_policy",
+        "_default_action",
+        "_single_flight",
+        "_timeout",
+        "_timeouts",
+        "_timeout_action",
+        "_circuit_breaker",
+        "_audit_log",
+        "_trace_recorder",
+        "_check_account",
+        "_is_measured",
+        "_loaders",
+        "_is_guarded",
+        "_compiled_can",
+    )
+
     def __init__(
-        self, policy: Optional[Policy] = None, default_action: Action = Action.DENY
+        self,
+        policy: Optional[Policy] = None,
+        default_action: Action = Action.DENY,
+        single_flight: Optional[AsyncSingleFlight] = None,
+        timeout: Optional[float] = None,
+        timeouts: Optional[Dict[Permission, float]] = None,
+        timeout_action: Action = Action.DENY,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        audit_log: Optional[AuditLog] = None,
+        trace_recorder: Optional[TraceRecorder] = None,
+        budget: Optional[CheckBudget] = None,
+        compiled: bool = True,
     ):
         """
         Args:
             policy (Optional[Policy]): policy that will be checked for permissions
             default_action (Action): action used when the permission
                 was not set on policy
+            single_flight (Optional[AsyncSingleFlight]): if set, concurrent checks
+                of the same permission with the same policy and arguments
+                call the access method only once
+            timeout (Optional[float]): number of seconds the access methods
+                have to return
+            timeouts (Optional[Dict[Permission, float]]): timeouts
+                overriding the default one for some permissions
+            timeout_action (Action): action used when an access method
+                timed out (or when the circuit breaker is open)
+            circuit_breaker (Optional[CircuitBreaker]): if set, stops calling
+                the access methods that keep failing or timing out
+            audit_log (Optional[AuditLog]): if set, the decisions are recorded
+                in this audit log
+            trace_recorder (Optional[TraceRecorder]): if set, the decisions
+                and the time taken to make them are recorded in a trace,
+                which can be replayed against another policy (see deny.replay)
+            budget (Optional[CheckBudget]): if set, the checks are counted
+                and compared to this budget (see deny.budget), by default
+                the budget set with deny.budget.set_default_budget()
+            compiled (bool): use the checks generated for the policy class
+                when none of the options above requires the generic checks,
+                False can help debugging
         """
         self._policy = policy or Policy()
         self._default_action = default_action
+        self._single_flight = single_flight
+        self._timeout = timeout
+        self._timeouts = timeouts or {}
+        self._timeout_action = timeout_action
+        self._circuit_breaker = circuit_breaker
+        self._audit_log = audit_log
+        self._trace_recorder = trace_recorder
+        self._check_account = open_account(budget)
+        self._is_measured = (
+            trace_recorder is not None or self._check_account is not None
+        )
+        # created when a loader is used
+        self._loaders: Optional[Dict[str, AsyncLoader]] = None
+        self._is_guarded = (
+            timeout is not None or bool(timeouts) or circuit_breaker is not None
+        )
+        self._compiled_can: Optional[CompiledCan] = None
+        if (
+            compiled
+            and not self._is_guarded
+            and single_flight is None
+            and audit_log is None
+            and not self._is_measured
+            # policies looking the access methods up differently
+            # (ex: ExecutorPolicy) must use the generic checks
+            and type(self._policy).get_access_method is Policy.get_access_method
+        ):
+            self._compiled_can = self._policy._compiled_can.get(default_action)
 
     async def authorize(
         self, permission: Permission, *args: Any, **kwargs: Any
@@ -41,6 +164,18 @@ class Ability:
         If no access method is found the default_action is used.
         If permission was not defined and default_action is RAISE then an
         UndefinedPermission is raised.
+        Access methods that are not coroutine functions are called directly.
+        When a single_flight is set, concurrent identical checks share
+        the same call to the access method.
+        When an audit_log is set, the decision is recorded in it.
+        When a trace_recorder is set, the decision and its duration are traced.
+        When a budget is set, the check is counted in the check account.
+        If the access method does not return before the timeout, or before the
+        deadline set with deny.timeout.deadline(), the timeout_action is used.
+        The data dependencies of the access method are loaded by the loaders
+        of this ability and passed as keyword arguments.
+        Without any of those options, the check generated for the policy class
+        is used (see deny.compiler).
 
         Args:
             permission (Permission): a permission
@@ -50,12 +185,725 @@ class Ability:
         Returns:
             bool: True if permission is granted, False otherwise
         """
+        compiled_can = self._compiled_can
+        if compiled_can is not None and get_deadline() is None:
+            return await compiled_can(self._policy, permission, args, kwargs)
+
+        start = time.perf_counter() if self._is_measured else 0.0
         try:
             access_method = self._policy.get_access_method(permission)
         except UndefinedPermission as error:
-            if self._default_action == Action.RAISE:
-                raise error
+            result = self._get_action_result(self._default_action, error)
+        else:
+            dependencies = self._policy._dependencies.get(permission)
+            call_kwargs = (
+                kwargs
+                if dependencies is None
+                else await self._load_dependencies(dependencies, args, kwargs)
+            )
+            single_flight = self._single_flight
+            key = (
+                get_call_key(self._policy, permission, args, kwargs)
+                if single_flight is not None
+                else None
+            )
+            if single_flight is not None and key is not None:
+                result = await single_flight.run(
+                    key,
+                    partial(
+                        self._call_access_method,
+                        permission,
+                        access_method,
+                        args,
+                        call_kwargs,
+                    ),
+                )
+            elif self._is_guarded or get_deadline() is not None:
+                result = await self._call_access_method(
+                    permission, access_method, args, call_kwargs
+                )
+            # unguarded calls are inlined to avoid creating another coroutine
+            # unasync: begin async only
+            elif permission in self._policy._sync_access_methods:
+                result = cast(SyncAccessMethod, access_method)(*args, **call_kwargs)
+            # unasync: end async only
+            else:
+                result = await cast(AccessMethod, access_method)(*args, **call_kwargs)
+
+        if self._audit_log is not None:
+            self._audit_log.record(permission, result, args, kwargs)
+        if self._is_measured:
+            self._measure(permission, result, args, kwargs, time.perf_counter() - start)
+        return result
+
+    async def can_many(
+        self, permission: Permission, objects: Iterable[Any], *args: Any, **kwargs: Any
+    ) -> List[bool]:
+        """Checks the permission for each object, the object being passed as first
+        argument to the policy access method.
+        If the policy defines a batch access method for the permission, all the
+        objects are checked in a single call.
+
+        Args:
+            permission (Permission): a permission
+            objects (Iterable[Any]): objects the permission is checked for
+            args (Any): arguments passed to the policy access method
+            kwargs (Any): keyword argumentss passed to the policy access method
+
+        Returns:
+            List[bool]: result of the check for each object
+        """
+        objects = list(objects)
+        batch_access_method = self._policy.get_batch_access_method(permission)
+        start = time.perf_counter() if self._is_measured else 0.0
+        if batch_access_method is None:
+            # load the data dependencies of all the objects at once
+            dependencies = self._policy._dependencies.get(permission, {})
+            for name, key_function in dependencies.items():
+                await self.get_loader(name).load_many(
+                    [key_function(obj, *args, **kwargs) for obj in objects]
+                )
+            return [await self.can(permission, obj, *args, **kwargs) for obj in objects]
+        results = await self._call_batch_access_method(
+            permission, batch_access_method, objects, args, kwargs
+        )
+        if self._audit_log is not None:
+            for obj, result in zip(objects, results):
+                self._audit_log.record(permission, result, (obj, *args), kwargs)
+        if self._is_measured:
+            self._measure_batch(
+                permission, objects, results, args, kwargs, time.perf_counter() - start
+            )
+        return results
+
+    async def stream_filter(
+        self,
+        permission: Permission,
+        objects: AsyncIterable[Any],
+        *args: Any,
+        chunk_size: int = 100,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        """Yields the objects for which the permission is granted.
+        The objects are pulled from the iterable and checked with can_many()
+        by chunks, so at most chunk_size objects are kept in memory and
+        no object is pulled before the consumer asks for it.
+
+        Args:
+            permission (Permission): a permission
+            objects (AsyncIterable[Any]): objects the permission is checked for
+            args (Any): arguments passed to the policy access method
+            chunk_size (int): number of objects checked at once
+            kwargs (Any): keyword argumentss passed to the policy access method
+
+        Returns:
+            AsyncIterator[Any]: allowed objects
+        """
+        chunk: List[Any] = []
+        async for obj in objects:
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                results = await self.can_many(permission, chunk, *args, **kwargs)
+                for allowed_obj, result in zip(chunk, results):
+                    if result:
+                        yield allowed_obj
+                chunk = []
+
+        if chunk:
+            results = await self.can_many(permission, chunk, *args, **kwargs)
+            for allowed_obj, result in zip(chunk, results):
+                if result:
+                    yield allowed_obj
+
+    async def fill_page(
+        self,
+        permission: Permission,
+        fetch: FetchFunction,
+        page_size: int,
+        *args: Any,
+        offset: int = 0,
+        max_fetch_size: int = 1000,
+        **kwargs: Any,
+    ) -> Page:
+        """Returns a page of objects for which the permission is granted,
+        fetched from a paginated source.
+        The number of rows fetched at once adapts to the ratio of denied
+        rows observed, so a page is filled with few calls to fetch.
+
+        Args:
+            permission (Permission): a permission
+            fetch (FetchFunction): function returning the rows of the source,
+                it receives the offset and the maximum number of rows
+            page_size (int): number of objects in the page
+            args (Any): arguments passed to the policy access method
+            offset (int): offset of the first row of the page
+            max_fetch_size (int): maximum number of rows fetched at once
+            kwargs (Any): keyword argumentss passed to the policy access method
+
+        Returns:
+            Page: allowed objects and offset of the next page
+        """
+        items: List[Any] = []
+        seen = 0
+        while len(items) < page_size:
+            limit = get_fetch_size(
+                page_size - len(items), seen, len(items), max_fetch_size
+            )
+            rows = await fetch(offset, limit)
+            results = await self.can_many(permission, rows, *args, **kwargs)
+            consumed = len(rows)
+            for index, (row, result) in enumerate(zip(rows, results)):
+                if result:
+                    items.append(row)
+                    if len(items) == page_size:
+                        consumed = index + 1
+                        break
+            offset += consumed
+            seen += consumed
+            # the source is exhausted and all its rows were checked
+            if len(rows) < limit and consumed == len(rows):
+                return Page(items, None)
+        return Page(items, offset)
+
+    async def permissions_for(
+        self,
+        resources: Iterable[Any],
+        permissions: Optional[Sequence[Permission]] = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> PermissionMatrix:
+        """Checks several permissions for several resources, the resource being
+        passed as first argument to the policy access methods.
+        Each permission is checked with can_many(), and an access method
+        granting several permissions is only called once per resource
+        (the decisions of each permission are still recorded).
+
+        Args:
+            resources (Iterable[Any]): resources the permissions are checked for
+            permissions (Optional[Sequence[Permission]]): permissions to check,
+                by default all the permissions set on the policy (with an access
+                method or a batch access method)
+            args (Any): arguments passed to the policy access methods
+            kwargs (Any): keyword argumentss passed to the policy access methods
+
+        Returns:
+            PermissionMatrix: permissions granted for each resource
+        """
+        resources = list(resources)
+        if permissions is None:
+            permissions = list(
+                dict.fromkeys(
+                    [
+                        *self._policy._access_methods,
+                        *self._policy._batch_access_methods,
+                    ]
+                )
+            )
+
+        masks = [0] * len(resources)
+        results_by_method: Dict[Hashable, List[bool]] = {}
+        for bit, permission in enumerate(permissions):
+            method_key = self._get_method_key(permission)
+            if method_key is not None and method_key in results_by_method:
+                results = results_by_method[method_key]
+                self._record_reused(permission, resources, results, args, kwargs)
             else:
-                return True if self._default_action == Action.ALLOW else False
+                results = await self.can_many(permission, resources, *args, **kwargs)
+                if method_key is not None:
+                    results_by_method[method_key] = results
+
+            bit_mask = 1 << bit
+            for index, result in enumerate(results):
+                if result:
+                    masks[index] |= bit_mask
+
+        return PermissionMatrix(permissions, masks)
+
+    async def visible_fields(
+        self, schema: FieldSchema, objects: Iterable[Any], *args: Any, **kwargs: Any
+    ) -> FieldProjection:
+        """Returns the fields of a serializer visible for each object,
+        the object being passed as first argument to the policy access methods.
+        The permissions of the schema are checked once for all the objects
+        with permissions_for(), so shared permissions and access methods are
+        checked once and the batch access methods are used.
+
+        Args:
+            schema (FieldSchema): permissions required by the fields
+            objects (Iterable[Any]): objects being serialized
+            args (Any): arguments passed to the policy access methods
+            kwargs (Any): keyword argumentss passed to the policy access methods
+
+        Returns:
+            FieldProjection: visible fields of each object
+        """
+        matrix = await self.permissions_for(
+            objects, schema.permissions, *args, **kwargs
+        )
+        return schema.project(matrix)
+
+    def authorize_now(self, permission: Permission, *args: Any, **kwargs: Any) -> None:
+        """Synchronous version of authorize(), see can_now().
+
+        Args:
+            permission (Permission): a permission
+            args (Any): arguments passed to the policy access method
+            kwargs (Any): keyword argumentss passed to the policy access method
+
+        Returns:
+            None:
+        """
+        if not self.can_now(permission, *args, **kwargs):
+            raise UnauthorizedError(permission)
+
+    def can_now(self, permission: Permission, *args: Any, **kwargs: Any) -> bool:
+        """Synchronous version of can(), it can be used when the access method
+        registered for the permission is not a coroutine function.
+        If the access method must be awaited, or if its data dependencies
+        were not loaded yet, an AccessMethodNotSync is raised.
+        Timeouts are only checked once the access method returned.
+
+        Args:
+            permission (Permission): a permission
+            args (Any): arguments passed to the policy access method
+            kwargs (Any): keyword argumentss passed to the policy access method
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+        """
+        start = time.perf_counter() if self._is_measured else 0.0
+        try:
+            access_method = self._policy.get_access_method(permission)
+        except UndefinedPermission as error:
+            result = self._get_action_result(self._default_action, error)
+        else:
+            if permission not in self._policy._sync_access_methods:
+                raise AccessMethodNotSync(permission)
+            dependencies = self._policy._dependencies.get(permission)
+            call_kwargs = (
+                kwargs
+                if dependencies is None
+                else self._load_dependencies_now(permission, dependencies, args, kwargs)
+            )
+            if self._is_guarded or get_deadline() is not None:
+                result = self._call_sync_access_method(
+                    permission,
+                    cast(SyncAccessMethod, access_method),
+                    args,
+                    call_kwargs,
+                )
+            else:
+                result = cast(SyncAccessMethod, access_method)(*args, **call_kwargs)
+
+        if self._audit_log is not None:
+            self._audit_log.record(permission, result, args, kwargs)
+        if self._is_measured:
+            self._measure(permission, result, args, kwargs, time.perf_counter() - start)
+        return result
+
+    @property
+    def check_account(self) -> Optional[CheckAccount]:
+        """
+        Returns:
+            Optional[CheckAccount]: checks counted for the budget,
+                None without any budget
+        """
+        return self._check_account
+
+    def get_loader(self, name: str) -> AsyncLoader:
+        """Returns the loader of this ability using the policy loader
+        registered for the name, values are memoized by the loader.
+
+        Args:
+            name (str): loader name
+
+        Returns:
+            AsyncLoader: loader
+        """
+        loaders = self._loaders
+        if loaders is None:
+            loaders = self._loaders = {}
+        loader = loaders.get(name)
+        if loader is None:
+            loader = loaders[name] = AsyncLoader(self._policy.get_loader_function(name))
+        return loader
+
+    def prime(self, name: str, key: Hashable, value: Any) -> None:
+        """Sets the value of a key in a loader, so it's not loaded
+        (ex: the handler already fetched it).
+
+        Args:
+            name (str): loader name
+            key (Hashable): a key
+            value (Any): value of the key
+        """
+        self.get_loader(name).prime(key, value)
+
+    async def _load_dependencies(
+        self,
+        dependencies: Dict[str, KeyFunction],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Returns the keyword arguments of the access method including
+        its data dependencies.
+
+        Args:
+            dependencies (Dict[str, KeyFunction]): key function of each dependency
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+
+        Returns:
+            Dict[str, Any]: keyword arguments
+        """
+        call_kwargs = dict(kwargs)
+        for name, key_function in dependencies.items():
+            call_kwargs[name] = await self.get_loader(name).load(
+                key_function(*args, **kwargs)
+            )
+        return call_kwargs
+
+    def _load_dependencies_now(
+        self,
+        permission: Permission,
+        dependencies: Dict[str, KeyFunction],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Synchronous version of _load_dependencies().
+
+        Args:
+            permission (Permission): permission being checked
+            dependencies (Dict[str, KeyFunction]): key function of each dependency
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+
+        Returns:
+            Dict[str, Any]: keyword arguments
+        """
+        call_kwargs = dict(kwargs)
+        for name, key_function in dependencies.items():
+            loader = self.get_loader(name)
+            key = key_function(*args, **kwargs)
+            try:
+                call_kwargs[name] = loader.load_now(key)
+            except KeyError:
+                raise AccessMethodNotSync(permission) from None
+        return call_kwargs
+
+    async def _call_access_method(
+        self,
+        permission: Permission,
+        access_method: AnyAccessMethod,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> bool:
+        """Calls the access method with the timeout and the circuit breaker.
+
+        Args:
+            permission (Permission): permission being checked
+            access_method (AnyAccessMethod): access method to call
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+        """
+        # unasync: begin async only
+        if permission in self._policy._sync_access_methods:
+            return self._call_sync_access_method(
+                permission, cast(SyncAccessMethod, access_method), args, kwargs
+            )
+
+        # unasync: end async only
+        circuit_breaker = self._circuit_breaker
+        if circuit_breaker is not None and circuit_breaker.is_open(permission):
+            return self._get_action_result(
+                self._timeout_action, CircuitBreakerOpen(permission)
+            )
+        try:
+            result = await AsyncTimeout.call(
+                permission,
+                cast(AccessMethod, access_method),
+                args,
+                kwargs,
+                get_timeout(self._timeouts.get(permission, self._timeout)),
+            )
+        except AccessMethodTimeout as error:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            return self._get_action_result(self._timeout_action, error)
+        except Exception:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            raise
+        if circuit_breaker is not None:
+            circuit_breaker.record_success(permission)
+        return result
+
+    def _call_sync_access_method(
+        self,
+        permission: Permission,
+        access_method: SyncAccessMethod,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> bool:
+        """Synchronous version of _call_access_method().
+
+        Args:
+            permission (Permission): permission being checked
+            access_method (SyncAccessMethod): access method to call
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+        """
+        circuit_breaker = self._circuit_breaker
+        if circuit_breaker is not None and circuit_breaker.is_open(permission):
+            return self._get_action_result(
+                self._timeout_action, CircuitBreakerOpen(permission)
+            )
+        try:
+            result = SyncTimeout.call(
+                permission,
+                access_method,
+                args,
+                kwargs,
+                get_timeout(self._timeouts.get(permission, self._timeout)),
+            )
+        except AccessMethodTimeout as error:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            return self._get_action_result(self._timeout_action, error)
+        except Exception:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            raise
+        if circuit_breaker is not None:
+            circuit_breaker.record_success(permission)
+        return result
+
+    async def _call_batch_access_method(
+        self,
+        permission: Permission,
+        batch_access_method: AnyBatchAccessMethod,
+        objects: List[Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> List[bool]:
+        """Calls the batch access method with the timeout and the circuit breaker,
+        the timeout action being used for all the objects.
+
+        Args:
+            permission (Permission): permission being checked
+            batch_access_method (AnyBatchAccessMethod): batch access method to call
+            objects (List[Any]): objects the permission is checked for
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
 
-        return await access_method(*args, **kwargs)
+        Returns:
+            List[bool]: result of the check for each object
+        """
+        # unasync: begin async only
+        if permission in self._policy._sync_batch_access_methods:
+            return self._call_sync_batch_access_method(
+                permission,
+                cast(SyncBatchAccessMethod, batch_access_method),
+                objects,
+                args,
+                kwargs,
+            )
+
+        # unasync: end async only
+        circuit_breaker = self._circuit_breaker
+        if circuit_breaker is not None and circuit_breaker.is_open(permission):
+            result = self._get_action_result(
+                self._timeout_action, CircuitBreakerOpen(permission)
+            )
+            return [result] * len(objects)
+        try:
+            results = await AsyncTimeout.call(
+                permission,
+                cast(AccessMethod, batch_access_method),
+                (objects, *args),
+                kwargs,
+                get_timeout(self._timeouts.get(permission, self._timeout)),
+            )
+        except AccessMethodTimeout as error:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            return [self._get_action_result(self._timeout_action, error)] * len(objects)
+        except Exception:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            raise
+        if circuit_breaker is not None:
+            circuit_breaker.record_success(permission)
+        return cast(List[bool], results)
+
+    def _call_sync_batch_access_method(
+        self,
+        permission: Permission,
+        batch_access_method: SyncBatchAccessMethod,
+        objects: List[Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> List[bool]:
+        """Synchronous version of _call_batch_access_method().
+
+        Args:
+            permission (Permission): permission being checked
+            batch_access_method (SyncBatchAccessMethod): batch access method to call
+            objects (List[Any]): objects the permission is checked for
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+
+        Returns:
+            List[bool]: result of the check for each object
+        """
+        circuit_breaker = self._circuit_breaker
+        if circuit_breaker is not None and circuit_breaker.is_open(permission):
+            result = self._get_action_result(
+                self._timeout_action, CircuitBreakerOpen(permission)
+            )
+            return [result] * len(objects)
+        try:
+            results = SyncTimeout.call(
+                permission,
+                cast(SyncAccessMethod, batch_access_method),
+                (objects, *args),
+                kwargs,
+                get_timeout(self._timeouts.get(permission, self._timeout)),
+            )
+        except AccessMethodTimeout as error:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            return [self._get_action_result(self._timeout_action, error)] * len(objects)
+        except Exception:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(permission)
+            raise
+        if circuit_breaker is not None:
+            circuit_breaker.record_success(permission)
+        return cast(List[bool], results)
+
+    def _measure(
+        self,
+        permission: Permission,
+        result: bool,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        duration: float,
+    ) -> None:
+        """Traces a check and counts it in the check account.
+
+        Args:
+            permission (Permission): permission checked
+            result (bool): result of the check
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+            duration (float): number of seconds the check took
+        """
+        if self._trace_recorder is not None:
+            self._trace_recorder.record(
+                self._policy, permission, result, args, kwargs, duration
+            )
+        if self._check_account is not None:
+            self._check_account.record(permission, args, kwargs, duration)
+
+    def _measure_batch(
+        self,
+        permission: Permission,
+        objects: List[Any],
+        results: List[bool],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        duration: float,
+    ) -> None:
+        """Batch version of _measure(), the duration of the batch
+        is shared by the traced objects.
+
+        Args:
+            permission (Permission): permission checked
+            objects (List[Any]): objects checked
+            results (List[bool]): result of the check for each object
+            args (Tuple[Any, ...]): arguments passed to the batch access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the batch
+                access method
+            duration (float): number of seconds the check took
+        """
+        if self._trace_recorder is not None and objects:
+            object_duration = duration / len(objects)
+            for obj, result in zip(objects, results):
+                self._trace_recorder.record(
+                    self._policy,
+                    permission,
+                    result,
+                    (obj, *args),
+                    kwargs,
+                    object_duration,
+                )
+        if self._check_account is not None:
+            self._check_account.record_batch(permission, duration)
+
+    def _record_reused(
+        self,
+        permission: Permission,
+        objects: List[Any],
+        results: List[bool],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """Records the decisions of a permission whose results were
+        computed for another permission granted by the same method,
+        the method not being called again.
+
+        Args:
+            permission (Permission): permission reported
+            objects (List[Any]): objects checked
+            results (List[bool]): result of the check for each object
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+        """
+        if self._audit_log is not None:
+            for obj, result in zip(objects, results):
+                self._audit_log.record(permission, result, (obj, *args), kwargs)
+        if self._trace_recorder is not None:
+            for obj, result in zip(objects, results):
+                self._trace_recorder.record(
+                    self._policy, permission, result, (obj, *args), kwargs, 0.0
+                )
+
+    def _get_method_key(self, permission: Permission) -> Optional[Hashable]:
+        """Returns a key identifying the method can_many() uses to check the
+        permission, or None if the permission is not set on the policy.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            Optional[Hashable]: key of the (batch) access method
+        """
+        batch_access_method_name = self._policy._batch_access_methods.get(permission)
+        if batch_access_method_name is not None:
+            return (True, batch_access_method_name)
+        access_method_name = self._policy._access_methods.get(permission)
+        if access_method_name is not None:
+            return (False, access_method_name)
+        return None
+
+    def _get_action_result(self, action: Action, error: Exception) -> bool:
+        """Returns the result of a check that could not be made by the policy
+        (ex: permission not set on the policy, timeout), based on the action.
+
+        Args:
+            action (Action): action to apply
+            error (Exception): error raised if the action is RAISE
+
+        Returns:
+            bool: True if action is ALLOW, False otherwise
+        """
+        if action == Action.RAISE:
+            raise error
+        return action == Action.ALLOW
@@ -1,16 +1,34 @@
 import inspect
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple, TypeVar
 
-from deny.errors import PermissionAlreadyDefined, UndefinedPermission
+from deny.action import Action
+from deny.compiler import SyncCompiledCan, SyncCompiler
+from deny.errors import (
+    LoaderAlreadyDefined,
+    PermissionAlreadyDefined,
+    UndefinedLoader,
+    UndefinedPermission,
+)
+from deny.loader import SyncBatchLoadFunction
 from deny.permission import Permission
-from deny.utils import SyncAccessMethod
+from deny.utils import KeyFunction, SyncAccessMethod, SyncBatchAccessMethod
 
 _AUTHORIZED_PERMISSIONS_ATTR = "_authorized_permissions"
+_AUTHORIZED_BATCH_PERMISSIONS_ATTR = "_authorized_batch_permissions"
+_LOADER_NAME_ATTR = "_loader_name"
+_DEPENDENCIES_ATTR = "_dependencies"
+
+_AccessMethodT = TypeVar("_AccessMethodT", bound=SyncAccessMethod)
+_BatchAccessMethodT = TypeVar("_BatchAccessMethodT", bound=SyncBatchAccessMethod)
+_LoaderT = TypeVar("_LoaderT", bound=Callable[..., Any])
 
 
 class PolicyMetaclass(type):
     """Metaclass used by the Policy class.
-    It's used to register all the access methods defined by the @authorize() decorator.
+    It's used to register all the access methods defined by the @authorize() decorator
+    and the batch access methods defined by the @authorize_batch() decorator.
+    The loaders (@loader()) and the data dependencies of the access methods
+    (@depends_on()) are registered as well.
     """
 
     def __new__(cls, name: str, bases: Tuple[type, ...], attrs: Dict[str, Any]) -> type:
@@ -20,6 +38,15 @@ class PolicyMetaclass(type):
         If `_authorized_permission` is found we register the method
         in a dictionary in order to access it later using the
         permission being authorized.
+        Access methods that are not coroutine functions are also
+        registered in `_sync_access_methods`, so they can be called
+        without being awaited.
+        Batch access methods are registered the same way using
+        `_authorized_batch_permission`.
+        Loaders are registered by name in `_loaders` and the data dependencies
+        of the access methods by permission in `_dependencies`.
+        A specialized check is generated for each default action in
+        `_compiled_can`, see deny.compiler.
 
         Args:
             cls: a Policy class
@@ -36,23 +63,80 @@ class PolicyMetaclass(type):
 
         # check if @autorize() was used for each method and register
         # the ones that grant a permission
-        access_methods: Dict[Permission, str] = {}
-        for name, value in attributes_to_check.items():
-            permissions: List[Permission] = getattr(
-                value, _AUTHORIZED_PERMISSIONS_ATTR, []
-            )
+        access_methods, sync_access_methods = _register_access_methods(
+            attributes_to_check, _AUTHORIZED_PERMISSIONS_ATTR
+        )
+        attrs["_access_methods"] = access_methods
+        attrs["_sync_access_methods"] = sync_access_methods
 
-            for permission in permissions:
-                if permission in access_methods:
-                    raise PermissionAlreadyDefined(permission)
-                access_methods[permission] = name
+        # same thing for @authorize_batch()
+        batch_access_methods, sync_batch_access_methods = _register_access_methods(
+            attributes_to_check, _AUTHORIZED_BATCH_PERMISSIONS_ATTR
+        )
+        attrs["_batch_access_methods"] = batch_access_methods
+        attrs["_sync_batch_access_methods"] = sync_batch_access_methods
 
-        attrs["_access_methods"] = access_methods
+        loaders: Dict[str, str] = {}
+        for attr_name, value in attributes_to_check.items():
+            loader_name: Optional[str] = getattr(value, _LOADER_NAME_ATTR, None)
+            if loader_name is not None:
+                if loader_name in loaders:
+                    raise LoaderAlreadyDefined(loader_name)
+                loaders[loader_name] = attr_name
+        attrs["_loaders"] = loaders
+
+        dependencies: Dict[Permission, Dict[str, KeyFunction]] = {}
+        for permission, method_name in access_methods.items():
+            method_dependencies: Optional[Dict[str, KeyFunction]] = getattr(
+                attributes_to_check[method_name], _DEPENDENCIES_ATTR, None
+            )
+            if method_dependencies:
+                dependencies[permission] = method_dependencies
+        attrs["_dependencies"] = dependencies
+
+        # specialized checks used by the Ability, generated for each default
+        # action; the policies with data dependencies use the generic checks
+        compiled_can: Dict[Action, SyncCompiledCan] = {}
+        if not dependencies:
+            for action in Action:
+                compiled_can[action] = SyncCompiler.compile_can(
+                    access_methods, sync_access_methods, action
+                )
+        attrs["_compiled_can"] = compiled_can
         return super().__new__(cls, name, bases, attrs)
 
 
-def authorize(permission: Permission) -> Callable[[SyncAccessMethod], SyncAccessMethod]:
-    def decorator(func: SyncAccessMethod) -> SyncAccessMethod:
+def _register_access_methods(
+    attributes: Dict[str, Any], permissions_attr: str
+) -> Tuple[Dict[Permission, str], FrozenSet[Permission]]:
+    """Returns the names of the methods granting each permission, and the
+    permissions whose method is not a coroutine function.
+
+    Args:
+        attributes (Dict[str, Any]): class attributes
+        permissions_attr (str): attribute set by the decorator on the methods
+
+    Returns:
+        Tuple[Dict[Permission, str], FrozenSet[Permission]]: method name
+            for each permission and permissions having a synchronous method
+    """
+    access_methods: Dict[Permission, str] = {}
+    sync_access_methods: Set[Permission] = set()
+    for name, value in attributes.items():
+        permissions: List[Permission] = getattr(value, permissions_attr, [])
+
+        for permission in permissions:
+            if permission in access_methods:
+                raise PermissionAlreadyDefined(permission)
+            access_methods[permission] = name
+            if not inspect.iscoroutinefunction(value):
+                sync_access_methods.add(permission)
+
+    return access_methods, frozenset(sync_access_methods)
+
+
+def authorize(permission: Permission) -> Callable[[_AccessMethodT], _AccessMethodT]:
+    def decorator(func: _AccessMethodT) -> _AccessMethodT:
         """Add an `_authorized_permission` attribute to the method
         in order for the metaclass to recognize it as an AccessMethod.
 
@@ -62,20 +146,101 @@ def authorize(permission: Permission) -> Callable[[SyncAccessMethod], SyncAccess
         Returns:
             AccessMethod: access method received as input
         """
-        if hasattr(func, _AUTHORIZED_PERMISSIONS_ATTR):
-            permissions = getattr(func, _AUTHORIZED_PERMISSIONS_ATTR)
-        else:
-            permissions = []
-            setattr(func, _AUTHORIZED_PERMISSIONS_ATTR, permissions)
+        _add_permission(func, _AUTHORIZED_PERMISSIONS_ATTR, permission)
+        return func
+
+    return decorator
+
+
+def authorize_batch(
+    permission: Permission,
+) -> Callable[[_BatchAccessMethodT], _BatchAccessMethodT]:
+    def decorator(func: _BatchAccessMethodT) -> _BatchAccessMethodT:
+        """Add an `_authorized_batch_permission` attribute to the method
+        in order for the metaclass to recognize it as a BatchAccessMethod.
+        A batch access method receives a list of objects as first argument
+        and returns a list with the result for each object.
+
+        Args:
+            func (BatchAccessMethod): method used to grant access
+
+        Returns:
+            BatchAccessMethod: batch access method received as input
+        """
+        _add_permission(func, _AUTHORIZED_BATCH_PERMISSIONS_ATTR, permission)
+        return func
+
+    return decorator
+
+
+def loader(name: str) -> Callable[[_LoaderT], _LoaderT]:
+    def decorator(func: _LoaderT) -> _LoaderT:
+        """Add a `_loader_name` attribute to the method in order for the
+        metaclass to register it as a loader.
+        A loader receives a list of keys and returns the list of their values,
+        it can be used by the access methods through @depends_on().
+
+        Args:
+            func (BatchLoadFunction): method loading the values
+
+        Returns:
+            BatchLoadFunction: method received as input
+        """
+        setattr(func, _LOADER_NAME_ATTR, name)
+        return func
+
+    return decorator
+
+
+def depends_on(
+    **dependencies: KeyFunction,
+) -> Callable[[_AccessMethodT], _AccessMethodT]:
+    def decorator(func: _AccessMethodT) -> _AccessMethodT:
+        """Add a `_dependencies` attribute to the access method.
+        For each dependency, the key function receives the arguments of the
+        access method and the value returned by the loader for this key is
+        passed to the access method as a keyword argument.
+
+        Example:
+
+            @authorize(ProjectPermissions.edit)
+            @depends_on(members=lambda project: project.id)
+            async def can_edit_project(self, project, members) -> bool:
+                return self._user_id in members
+
+        Args:
+            func (AccessMethod): access method
 
-        permissions.append(permission)
+        Returns:
+            AccessMethod: access method received as input
+        """
+        setattr(func, _DEPENDENCIES_ATTR, dependencies)
         return func
 
     return decorator
 
 
+def _add_permission(func: Any, permissions_attr: str, permission: Permission) -> None:
+    if hasattr(func, permissions_attr):
+        permissions = getattr(func, permissions_attr)
+    else:
+        permissions = []
+        setattr(func, permissions_attr, permissions)
+
+    permissions.append(permission)
+
+
 class Policy(metaclass=PolicyMetaclass):
+    # subclasses can declare __slots__ so their instances have no __dict__
+    __slots__ = ()
+
     _access_methods: Dict[Permission, str]
+    _sync_access_methods: FrozenSet[Permission]
+    _batch_access_methods: Dict[Permission, str]
+    _sync_batch_access_methods: FrozenSet[Permission]
+    _loaders: Dict[str, str]
+    _dependencies: Dict[Permission, Dict[str, KeyFunction]]
+    _compiled_can: Dict[Action, SyncCompiledCan]
 
     def get_access_method(self, permission: Permission) -> SyncAccessMethod:
         """Returns the AccessMethod that was registered for the permission
@@ -92,3 +257,38 @@ class Policy(metaclass=PolicyMetaclass):
             return getattr(self, self._access_methods[permission])
         except KeyError:
             raise UndefinedPermission(permission)
+
+    def get_batch_access_method(
+        self, permission: Permission
+    ) -> Optional[SyncBatchAccessMethod]:
+        """Returns the BatchAccessMethod that was registered for the permission
+        received as input, it checks the permission for a list of objects at once.
+        If None is returned the Ability calls the access method for each object.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            Optional[AnyBatchAccessMethod]: batch access method registered
+                for permission
+        """
+        try:
+            return getattr(self, self._batch_access_methods[permission])
+        except KeyError:
+            return None
+
+    def get_loader_function(self, name: str) -> SyncBatchLoadFunction:
+        """Returns the method registered with @loader() for the name
+        received as input.
+        If no loader is found it raises a UndefinedLoader error.
+
+        Args:
+            name (str): loader name
+
+        Returns:
+            BatchLoadFunction: method loading the values
+        """
+        try:
+            return getattr(self, self._loaders[name])
+        except KeyError:
+            raise UndefinedLoader(name)
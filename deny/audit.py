@@ -0,0 +1,287 @@
+import json
+import logging
+import os
+import queue
+import random
+import socket
+import threading
+import time
+import weakref
+from enum import Enum
+from typing import IO, Any, Dict, List, NamedTuple, Tuple
+
+from deny.permission import Permission
+
+logger = logging.getLogger(__name__)
+
+
+class Overflow(Enum):
+    DROP = "drop"
+    BLOCK = "block"
+
+
+class AuditRecord(NamedTuple):
+    time: float
+    permission: str
+    allowed: bool
+    # repr() of the arguments, made when the decision is recorded
+    args: Tuple[str, ...]
+    kwargs: Dict[str, str]
+
+
+def format_record(record: AuditRecord) -> str:
+    """Serializes a record as a JSON line.
+
+    Args:
+        record (AuditRecord): a record
+
+    Returns:
+        str: JSON line, ending with a new line
+    """
+    return (
+        json.dumps(
+            {
+                "time": record.time,
+                "permission": record.permission,
+                "allowed": record.allowed,
+                "args": list(record.args),
+                "kwargs": record.kwargs,
+            }
+        )
+        + "\n"
+    )
+
+
+class AuditSink:
+    """Destination of the audit records, written in batches
+    by the AuditLog background thread.
+    """
+
+    def write(self, records: List[AuditRecord]) -> None:
+        """
+        Args:
+            records (List[AuditRecord]): records to write
+        """
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink(AuditSink):
+    """Writes the records as JSON lines in a file, rotated once it
+    reaches `max_bytes` (`path.1`, `path.2`, ... being the backups).
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backup_count: int = 5):
+        """
+        Args:
+            path (str): path of the file
+            max_bytes (int): maximum size of the file, 0 disables the rotation
+            backup_count (int): number of rotated files kept
+        """
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._file = self._open()
+
+    def write(self, records: List[AuditRecord]) -> None:
+        self._file.write("".join(format_record(record) for record in records))
+        self._file.flush()
+        if self._max_bytes and self._file.tell() >= self._max_bytes:
+            self._rotate()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _open(self) -> IO[str]:
+        return open(self._path, "a", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        self._file.close()
+        if self._backup_count > 0:
+            for index in range(self._backup_count - 1, 0, -1):
+                source = f"{self._path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self._path}.{index + 1}")
+            os.replace(self._path, f"{self._path}.1")
+        else:
+            os.remove(self._path)
+        self._file = self._open()
+
+
+class SocketSink(AuditSink):
+    """Sends each batch of records as a datagram of JSON lines
+    to a Unix domain socket (ex: a local log collector).
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): path of the Unix domain socket
+        """
+        self._path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def write(self, records: List[AuditRecord]) -> None:
+        data = "".join(format_record(record) for record in records)
+        self._socket.sendto(data.encode("utf-8"), self._path)
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+class AuditLog:
+    """Records the decisions made by the abilities and writes them
+    in batches to a sink from a background thread, so no I/O is made
+    while checking permissions.
+    Denied decisions are always recorded, allowed ones can be sampled.
+    When the buffer is full, new records are either dropped or the caller
+    waits for the buffer to be flushed (which blocks the event loop
+    in an asynchronous environment).
+    The arguments are serialized with repr() when the decision is recorded,
+    so the records are not changed by the arguments mutated afterwards.
+    """
+
+    # set by _start, in the process and in each process forked from it
+    _records: "queue.Queue[AuditRecord]"
+    _wake_up: threading.Event
+    _write_lock: threading.Lock
+    _thread: threading.Thread
+
+    def __init__(
+        self,
+        sink: AuditSink,
+        allowed_sample_rate: float = 1.0,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        overflow: Overflow = Overflow.DROP,
+    ):
+        """
+        Args:
+            sink (AuditSink): destination of the records
+            allowed_sample_rate (float): ratio of allowed decisions recorded
+            max_size (int): maximum number of records waiting to be written
+            batch_size (int): maximum number of records written at once,
+                the background thread is woken up once it's reached
+            flush_interval (float): maximum number of seconds a record waits
+                before being written
+            overflow (Overflow): what to do when the buffer is full
+        """
+        self._sink = sink
+        self._allowed_sample_rate = allowed_sample_rate
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._overflow = overflow
+        self._max_size = max_size
+        self._closed = False
+        self.dropped = 0
+        self._start()
+        # the processes forked from this one (ex: prefork workers) don't
+        # inherit the background thread, a new one is started in each of them
+        audit_log = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: _restart_after_fork(audit_log))
+
+    def record(
+        self,
+        permission: Permission,
+        allowed: bool,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """Adds a decision to the buffer.
+
+        Args:
+            permission (Permission): permission checked
+            allowed (bool): result of the check
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+        """
+        if allowed and random.random() >= self._allowed_sample_rate:
+            return
+
+        records = self._records
+        record = AuditRecord(
+            time.time(),
+            permission.name,
+            allowed,
+            tuple(repr(arg) for arg in args),
+            {key: repr(value) for key, value in kwargs.items()},
+        )
+        try:
+            records.put_nowait(record)
+        except queue.Full:
+            if self._overflow == Overflow.DROP:
+                self._drop()
+                return
+            # wait for the background thread to write a batch
+            while True:
+                self._wake_up.set()
+                try:
+                    records.put(record, timeout=self._flush_interval)
+                    break
+                except queue.Full:
+                    if self._closed:
+                        self._drop()
+                        return
+
+        if records.qsize() >= self._batch_size and not self._wake_up.is_set():
+            self._wake_up.set()
+
+    def flush(self) -> None:
+        """Writes all the buffered records, from the calling thread."""
+        while True:
+            records: List[AuditRecord] = []
+            try:
+                while len(records) < self._batch_size:
+                    records.append(self._records.get_nowait())
+            except queue.Empty:
+                pass
+            if not records:
+                break
+            try:
+                # the sink is written by the background thread and the callers
+                # of flush()
+                with self._write_lock:
+                    self._sink.write(records)
+            except Exception:
+                logger.exception("Failed to write %d audit records", len(records))
+
+    def close(self) -> None:
+        """Stops the background thread, writes the remaining records
+        and closes the sink.
+        """
+        self._closed = True
+        self._wake_up.set()
+        self._thread.join()
+        self.flush()
+        with self._write_lock:
+            self._sink.close()
+
+    def _drop(self) -> None:
+        # records are dropped by any thread making checks
+        with self._records.mutex:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        self._records = queue.Queue(self._max_size)
+        self._wake_up = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="deny-audit", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake_up.wait(self._flush_interval)
+            self._wake_up.clear()
+            self.flush()
+
+
+def _restart_after_fork(audit_log: "weakref.ref[AuditLog]") -> None:
+    # the records buffered by the parent process are written by the parent
+    instance = audit_log()
+    if instance is not None and not instance._closed:
+        instance._start()
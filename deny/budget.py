@@ -0,0 +1,309 @@
+import logging
+import warnings
+from contextlib import contextmanager
+from enum import Enum
+from typing import (
+    Any,
+    Counter,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from deny.errors import CheckBudgetExceeded
+from deny.permission import Permission
+
+logger = logging.getLogger(__name__)
+
+# budget of the abilities created without one, and the lists collecting
+# the accounts of the abilities created while checks are tracked
+_default_budget: Optional["CheckBudget"] = None
+_trackers: List[List["CheckAccount"]] = []
+
+
+# permission and arguments of a check
+_CallKey = Tuple[Permission, Tuple[Hashable, ...], FrozenSet[Tuple[str, Hashable]]]
+
+
+class BudgetAction(Enum):
+    LOG = "log"
+    WARN = "warn"
+    RAISE = "raise"
+
+
+class CheckBudgetWarning(UserWarning):
+    """Warning emitted when an ability exceeds its check budget
+    and the budget action is WARN.
+    """
+
+
+class CheckBudget:
+    """Limits of the checks made by an ability, usually during a request,
+    used in tests and development to catch the permissions checked
+    in a loop (N+1 checks).
+    The action is applied once per limit exceeded by an ability.
+
+    Example:
+
+        budget = CheckBudget(max_checks=50, batch_threshold=10)
+        ability = Ability(policy=UserPolicy(user), budget=budget)
+    """
+
+    def __init__(
+        self,
+        max_checks: Optional[int] = None,
+        max_repeats: Optional[int] = None,
+        max_time: Optional[float] = None,
+        batch_threshold: Optional[int] = None,
+        action: BudgetAction = BudgetAction.LOG,
+    ) -> None:
+        """
+        Args:
+            max_checks (Optional[int]): maximum number of checks, a batch check
+                (can_many() with a batch access method) counting as one
+            max_repeats (Optional[int]): maximum number of times the same
+                permission is checked with the same arguments
+            max_time (Optional[float]): maximum number of seconds spent
+                in the access methods
+            batch_threshold (Optional[int]): number of distinct objects a
+                permission can be checked for one by one before a batch check
+                is suggested
+            action (BudgetAction): what to do when a limit is exceeded
+        """
+        self.max_checks = max_checks
+        self.max_repeats = max_repeats
+        self.max_time = max_time
+        self.batch_threshold = batch_threshold
+        self.action = action
+
+
+class UnhashableKey(NamedTuple):
+    """Key of an argument that is not hashable (ex: a dict), compared by value:
+    its id could be reused by another argument once it's garbage collected.
+    """
+
+    type: type
+    repr: str
+
+
+class CheckAccount:
+    """Checks made by an ability, compared to its budget."""
+
+    def __init__(self, budget: CheckBudget) -> None:
+        """
+        Args:
+            budget (CheckBudget): limits of the checks
+        """
+        self.budget = budget
+        self.checks = 0
+        # number of seconds spent in the access methods
+        self.time = 0.0
+        # messages of the limits exceeded
+        self.violations: List[str] = []
+        self._calls: Counter[_CallKey] = Counter()
+        self._objects: Dict[Permission, Set[Hashable]] = {}
+        self._exceeded: Set[Hashable] = set()
+
+    def record(
+        self,
+        permission: Permission,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        duration: float,
+    ) -> None:
+        """Counts a check of a single permission.
+
+        Args:
+            permission (Permission): permission checked
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+            duration (float): number of seconds the check took
+        """
+        self._add(duration)
+        budget = self.budget
+        key = (
+            permission,
+            tuple(_get_key(arg) for arg in args),
+            frozenset((name, _get_key(value)) for name, value in kwargs.items()),
+        )
+        count = self._calls[key] = self._calls[key] + 1
+        if budget.max_repeats is not None and count > budget.max_repeats:
+            self._exceed(
+                ("repeats", permission),
+                f"{permission.name} checked {count} times with the same arguments"
+                f" (budget: {budget.max_repeats}), reuse the decision",
+            )
+
+        if args:
+            objects = self._objects.get(permission)
+            if objects is None:
+                objects = self._objects[permission] = set()
+            objects.add(_get_key(args[0]))
+            if (
+                budget.batch_threshold is not None
+                and len(objects) > budget.batch_threshold
+            ):
+                self._exceed(
+                    ("batch", permission),
+                    f"{permission.name} checked one by one for {len(objects)}"
+                    f" objects (budget: {budget.batch_threshold}), check them"
+                    " with Ability.can_many() and an @authorize_batch() method",
+                )
+
+    def record_batch(self, permission: Permission, duration: float) -> None:
+        """Counts a batch check.
+
+        Args:
+            permission (Permission): permission checked
+            duration (float): number of seconds the check took
+        """
+        self._add(duration)
+
+    def repeated(self) -> Dict[Tuple[Permission, Tuple[Hashable, ...]], int]:
+        """
+        Returns:
+            Dict[Tuple[Permission, Tuple[Hashable, ...]], int]: number of checks
+                of the permissions checked several times with the same arguments
+                (the arguments that are not hashable being an UnhashableKey)
+        """
+        return {
+            (permission, args): count
+            for (permission, args, _), count in self._calls.items()
+            if count > 1
+        }
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: human readable summary of the checks
+        """
+        lines = [f"{self.checks} checks in {self.time * 1000:.3f}ms"]
+        lines.extend(self.violations)
+        return "\n".join(lines)
+
+    def _add(self, duration: float) -> None:
+        self.checks += 1
+        self.time += duration
+        budget = self.budget
+        if budget.max_checks is not None and self.checks > budget.max_checks:
+            self._exceed(
+                "checks", f"{self.checks} checks (budget: {budget.max_checks})"
+            )
+        if budget.max_time is not None and self.time > budget.max_time:
+            self._exceed(
+                "time",
+                f"{self.time * 1000:.3f}ms spent in access methods"
+                f" (budget: {budget.max_time * 1000:.3f}ms)",
+            )
+
+    def _exceed(self, limit: Hashable, message: str) -> None:
+        if limit in self._exceeded:
+            return
+        self._exceeded.add(limit)
+        self.violations.append(message)
+        action = self.budget.action
+        if action == BudgetAction.RAISE:
+            raise CheckBudgetExceeded(message)
+        if action == BudgetAction.WARN:
+            warnings.warn(message, CheckBudgetWarning, stacklevel=4)
+        else:
+            logger.warning("Check budget exceeded: %s", message)
+
+
+def set_default_budget(budget: Optional[CheckBudget]) -> None:
+    """Sets the budget of the abilities created without one
+    (ex: in the development settings).
+
+    Args:
+        budget (Optional[CheckBudget]): a budget, None to disable it
+    """
+    global _default_budget
+    _default_budget = budget
+
+
+def open_account(budget: Optional[CheckBudget]) -> Optional[CheckAccount]:
+    """Returns the account of a new ability.
+
+    Args:
+        budget (Optional[CheckBudget]): budget given to the ability
+
+    Returns:
+        Optional[CheckAccount]: account of the ability, None without any budget
+    """
+    if budget is None:
+        budget = _default_budget
+        if budget is None:
+            return None
+    account = CheckAccount(budget)
+    for accounts in _trackers:
+        accounts.append(account)
+    return account
+
+
+@contextmanager
+def track_checks(budget: Optional[CheckBudget] = None) -> Iterator[List[CheckAccount]]:
+    """Collects the accounts of the abilities created in the block,
+    in any thread, usually one per request.
+
+    Args:
+        budget (Optional[CheckBudget]): budget of the abilities created
+            without one, by default a budget without limits
+
+    Returns:
+        Iterator[List[CheckAccount]]: accounts, filled until the block exits
+    """
+    global _default_budget
+    previous_budget = _default_budget
+    _default_budget = budget or CheckBudget()
+    accounts: List[CheckAccount] = []
+    _trackers.append(accounts)
+    try:
+        yield accounts
+    finally:
+        _trackers.remove(accounts)
+        _default_budget = previous_budget
+
+
+@contextmanager
+def assert_checks(
+    max_checks: Optional[int] = None,
+    max_repeats: Optional[int] = None,
+    max_time: Optional[float] = None,
+    batch_threshold: Optional[int] = None,
+) -> Iterator[List[CheckAccount]]:
+    """Raises an AssertionError if an ability created in the block
+    exceeded the limits, once the block exits (so the requests made
+    in the block are not interrupted).
+
+    Args:
+        max_checks (Optional[int]): maximum number of checks per ability
+        max_repeats (Optional[int]): maximum number of times the same
+            permission is checked with the same arguments
+        max_time (Optional[float]): maximum number of seconds spent
+            in the access methods
+        batch_threshold (Optional[int]): number of distinct objects a
+            permission can be checked for one by one
+
+    Returns:
+        Iterator[List[CheckAccount]]: accounts of the abilities
+    """
+    budget = CheckBudget(max_checks, max_repeats, max_time, batch_threshold)
+    with track_checks(budget) as accounts:
+        yield accounts
+    reports = [account.report() for account in accounts if account.violations]
+    if reports:
+        raise AssertionError("Check budget exceeded:\n" + "\n".join(reports))
+
+
+def _get_key(value: Any) -> Hashable:
+    try:
+        hash(value)
+    except TypeError:
+        return UnhashableKey(type(value), repr(value))
+    return value
@@ -0,0 +1,171 @@
+import keyword
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Tuple
+
+from deny.action import Action
+from deny.errors import UndefinedPermission
+from deny.permission import Permission
+
+# specialized version of Ability.can() generated for a policy class,
+# it receives the policy, the permission, and the arguments of the access method.
+CompiledCan = Callable[
+    [Any, Permission, Tuple[Any, ...], Dict[str, Any]], Awaitable[bool]
+]
+SyncCompiledCan = Callable[[Any, Permission, Tuple[Any, ...], Dict[str, Any]], bool]
+
+# number of permissions compared one after the other,
+# the next ones are looked up in a dictionary
+MAX_INLINED_PERMISSIONS = 8
+
+# how the default action is inlined in the generated code
+_DEFAULT_ACTION_SOURCES = {
+    Action.ALLOW: "return True",
+    Action.DENY: "return False",
+    Action.RAISE: "raise UndefinedPermission(permission)",
+}
+
+
+def _compile_function(source: str, name: str, namespace: Dict[str, Any]) -> Any:
+    """Executes the source of a function and returns it.
+
+    Args:
+        source (str): source code defining the function
+        name (str): name of the function
+        namespace (Dict[str, Any]): globals of the function
+
+    Returns:
+        Any: the function
+    """
+    code = compile(source, f"<deny generated {name}>", "exec")
+    exec(code, namespace)
+    return namespace[name]
+
+
+def _get_method_source(method_name: str) -> str:
+    """Returns the expression getting an access method from the policy,
+    the method is looked up on the instance so it can still be patched.
+
+    Args:
+        method_name (str): name of the access method
+
+    Returns:
+        str: source of the expression
+    """
+    if method_name.isidentifier() and not keyword.iskeyword(method_name):
+        return f"policy.{method_name}"
+    return f"getattr(policy, {method_name!r})"
+
+
+def _compile_can(
+    access_methods: Dict[Permission, str],
+    awaited_permissions: FrozenSet[Permission],
+    default_action: Action,
+    is_async: bool,
+) -> Any:
+    """Generates the specialized check of a policy class.
+
+    Args:
+        access_methods (Dict[Permission, str]): access method name
+            of each permission
+        awaited_permissions (FrozenSet[Permission]): permissions whose access
+            method result must be awaited
+        default_action (Action): action used when the permission
+            was not set on policy
+        is_async (bool): generate a coroutine function
+
+    Returns:
+        Any: the generated function
+    """
+    namespace: Dict[str, Any] = {"UndefinedPermission": UndefinedPermission}
+    lines: List[str] = [
+        f"{'async ' if is_async else ''}def can(policy, permission, args, kwargs):"
+    ]
+    others: Dict[Permission, Tuple[Callable[..., Any], bool]] = {}
+    for index, (permission, method_name) in enumerate(access_methods.items()):
+        awaited = permission in awaited_permissions
+        method = _get_method_source(method_name)
+        if index < MAX_INLINED_PERMISSIONS:
+            namespace[f"permission_{index}"] = permission
+            lines.append(f"    if permission is permission_{index}:")
+            lines.append(
+                f"        return {'await ' if awaited else ''}{method}(*args, **kwargs)"
+            )
+        else:
+            check = _compile_function(
+                f"def check(policy, args, kwargs):\n"
+                f"    return {method}(*args, **kwargs)\n",
+                "check",
+                {},
+            )
+            others[permission] = (check, awaited)
+
+    if others:
+        namespace["get_other"] = others.get
+        lines.append("    other = get_other(permission)")
+        lines.append("    if other is not None:")
+        lines.append("        check, awaited = other")
+        if is_async:
+            lines.append("        result = check(policy, args, kwargs)")
+            lines.append("        return (await result) if awaited else result")
+        else:
+            lines.append("        return check(policy, args, kwargs)")
+    lines.append(f"    {_DEFAULT_ACTION_SOURCES[default_action]}")
+    return _compile_function("\n".join(lines) + "\n", "can", namespace)
+
+
+class AsyncCompiler:
+    """Generates the specialized checks of asynchronous policies."""
+
+    @staticmethod
+    def compile_can(
+        access_methods: Dict[Permission, str],
+        sync_access_methods: FrozenSet[Permission],
+        default_action: Action,
+    ) -> CompiledCan:
+        """Returns a coroutine function checking the permissions of a policy class
+        without looking the access methods up by name nor handling errors:
+        the permissions are compared one after the other, each one calling
+        its access method directly, and the default action is inlined.
+
+        Args:
+            access_methods (Dict[Permission, str]): access method name
+                of each permission
+            sync_access_methods (FrozenSet[Permission]): permissions whose access
+                method is not a coroutine function
+            default_action (Action): action used when the permission
+                was not set on policy
+
+        Returns:
+            CompiledCan: specialized check
+        """
+        awaited_permissions = frozenset(access_methods) - sync_access_methods
+        return _compile_can(
+            access_methods, awaited_permissions, default_action, is_async=True
+        )
+
+
+class SyncCompiler:
+    """Generates the specialized checks of synchronous policies."""
+
+    @staticmethod
+    def compile_can(
+        access_methods: Dict[Permission, str],
+        sync_access_methods: FrozenSet[Permission],
+        default_action: Action,
+    ) -> SyncCompiledCan:
+        """Returns a function checking the permissions of a policy class
+        without looking the access methods up by name nor handling errors:
+        the permissions are compared one after the other, each one calling
+        its access method directly, and the default action is inlined.
+
+        Args:
+            access_methods (Dict[Permission, str]): access method name
+                of each permission
+            sync_access_methods (FrozenSet[Permission]): not used, the access
+                methods of synchronous policies are always called directly
+            default_action (Action): action used when the permission
+                was not set on policy
+
+        Returns:
+            SyncCompiledCan: specialized check
+        """
+        return _compile_can(access_methods, frozenset(), default_action, is_async=False)
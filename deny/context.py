@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Iterator, Optional
+
+from deny.errors import AbilityNotFound
+
+# Ability (from `deny` or `deny.sync`) of the current request
+_current_ability: ContextVar[Optional[Any]] = ContextVar(
+    "deny_current_ability", default=None
+)
+
+
+def set_current_ability(ability: Any) -> "Token[Optional[Any]]":
+    """Sets the ability of the current context, usually by a middleware
+    at the beginning of the request.
+    The context variable is copied to the tasks created in the context,
+    setting another ability in a task does not change the one of its parent.
+
+    Args:
+        ability (Any): an Ability
+
+    Returns:
+        Token[Optional[Any]]: token to pass to reset_current_ability()
+    """
+    return _current_ability.set(ability)
+
+
+def reset_current_ability(token: "Token[Optional[Any]]") -> None:
+    """Restores the ability that was set before set_current_ability()
+    (ex: at the end of the request).
+
+    Args:
+        token (Token[Optional[Any]]): token returned by set_current_ability()
+    """
+    _current_ability.reset(token)
+
+
+@contextmanager
+def use_ability(ability: Any) -> Iterator[None]:
+    """Sets the ability of the current context within the block.
+
+    Example:
+
+        with use_ability(Ability(policy=UserPolicy(user))):
+            await handle(request)
+
+    Args:
+        ability (Any): an Ability
+    """
+    token = _current_ability.set(ability)
+    try:
+        yield
+    finally:
+        _current_ability.reset(token)
+
+
+def get_current_ability() -> Optional[Any]:
+    """Returns the ability of the current context.
+
+    Returns:
+        Optional[Any]: the Ability, None if not set
+    """
+    return _current_ability.get()
+
+
+def current_ability() -> Any:
+    """Returns the ability of the current context, so the code deep
+    in the stack (services, background tasks) can check permissions without
+    receiving the request.
+    An AbilityNotFound is raised if it was not set.
+
+    Returns:
+        Any: the Ability
+    """
+    ability = _current_ability.get()
+    if ability is None:
+        raise AbilityNotFound("Ability could not be found in the current context")
+    return ability
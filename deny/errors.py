@@ -11,9 +11,14 @@ class UndefinedPermission(Exception):
         Args:
             permission (Permission): a permission
         """
-        super().__init__(f"Permission {permission.name} was not set in this policy")
+        super().__init__(permission)
         self.permission = permission
 
+    def __str__(self) -> str:
+        # built only when the error is displayed, the default action
+        # handles most of these errors without reading the message
+        return f"Permission {self.permission.name} was not set in this policy"
+
 
 class UnauthorizedError(Exception):
     """Error raised by an Ability when the policy did not allow access
@@ -25,9 +30,14 @@ class UnauthorizedError(Exception):
         Args:
             permission (Permission): a permission
         """
-        super().__init__(f"Access denied for permission {permission.name}")
+        super().__init__(permission)
         self.permission = permission
 
+    def __str__(self) -> str:
+        # built only when the error is displayed, the frameworks usually
+        # turn it into a response without reading the message
+        return f"Access denied for permission {self.permission.name}"
+
 
 class PermissionAlreadyDefined(Exception):
     """Error raised while using the @authorize() decorator with the same Permission
@@ -41,3 +51,94 @@ class PermissionAlreadyDefined(Exception):
         """
         super().__init__(f"Permission {permission.name} already defined")
         self.permission = permission
+
+
+class AccessMethodNotSync(Exception):
+    """Error raised by Ability.can_now() when the access method registered
+    for the permission is a coroutine function and must be awaited.
+    """
+
+    def __init__(self, permission: Permission) -> None:
+        """
+        Args:
+            permission (Permission): a permission
+        """
+        super().__init__(
+            f"Access method for permission {permission.name} must be awaited"
+        )
+        self.permission = permission
+
+
+class AccessMethodTimeout(Exception):
+    """Error raised by an Ability when the access method did not return
+    before the timeout (or the deadline) and timeout_action is RAISE.
+    """
+
+    def __init__(self, permission: Permission) -> None:
+        """
+        Args:
+            permission (Permission): a permission
+        """
+        super().__init__(f"Access method for permission {permission.name} timed out")
+        self.permission = permission
+
+
+class CircuitBreakerOpen(Exception):
+    """Error raised by an Ability when the circuit breaker is open for the
+    permission and timeout_action is RAISE.
+    """
+
+    def __init__(self, permission: Permission) -> None:
+        """
+        Args:
+            permission (Permission): a permission
+        """
+        super().__init__(f"Circuit breaker is open for permission {permission.name}")
+        self.permission = permission
+
+
+class UndefinedLoader(Exception):
+    """Error raised when an access method depends on a loader
+    that is not set in the policy.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name (str): loader name
+        """
+        super().__init__(f"Loader {name} was not set in this policy")
+        self.name = name
+
+
+class LoaderAlreadyDefined(Exception):
+    """Error raised while using the @loader() decorator with the same name
+    twice in the same Policy object.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name (str): loader name
+        """
+        super().__init__(f"Loader {name} already defined")
+        self.name = name
+
+
+class SidecarError(Exception):
+    """Error raised by the sidecar clients when the connection to the server
+    failed, or when the server could not check a permission.
+    """
+
+
+class CheckBudgetExceeded(Exception):
+    """Error raised by an Ability when its checks exceeded a limit
+    of its CheckBudget and the budget action is RAISE.
+    """
+
+
+class AbilityNotFound(Exception):
+    """Error raised when the ability could not be found
+    while executing one of the extensions @authorize() decorator,
+    or in the current context (see deny.context).
+    """
@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Optional, TypeVar
+
+from deny._async.policy import Policy
+from deny._sync.policy import Policy as SyncPolicy
+from deny.errors import UndefinedPermission
+from deny.loader import BatchLoadFunction
+from deny.permission import Permission
+from deny.utils import AccessMethod, BatchAccessMethod, SyncAccessMethod
+
+_T = TypeVar("_T")
+
+
+class ExecutorPolicy(Policy):
+    """Policy running the access methods of a synchronous policy (from `deny.sync`)
+    in an executor, so it can be used by an asynchronous Ability without
+    blocking the event loop.
+    The context variables of the caller are visible from the access methods.
+
+    Example:
+
+        ability = Ability(policy=ExecutorPolicy(SyncUserPolicy(), max_workers=4))
+        await ability.can(ProjectPermissions.view, project)
+    """
+
+    def __init__(
+        self,
+        policy: SyncPolicy,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            policy (SyncPolicy): synchronous policy whose access methods are run
+                in the executor
+            executor (Optional[Executor]): executor running the access methods,
+                by default a ThreadPoolExecutor is created
+            max_workers (Optional[int]): maximum number of threads of the
+                ThreadPoolExecutor created when no executor is given
+        """
+        self._policy = policy
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="deny"
+        )
+        self._access_methods = policy._access_methods
+        self._batch_access_methods = policy._batch_access_methods
+        self._loaders = policy._loaders
+        self._dependencies = policy._dependencies
+        # all the access methods returned by this policy must be awaited
+        self._sync_access_methods = frozenset()
+
+    def get_access_method(self, permission: Permission) -> AccessMethod:
+        """Returns a coroutine function running the access method
+        of the synchronous policy in the executor.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            AccessMethod: access method registered for permission
+        """
+        access_method = self._policy.get_access_method(permission)
+        return partial(self._run, access_method)
+
+    def get_batch_access_method(
+        self, permission: Permission
+    ) -> Optional[BatchAccessMethod]:
+        """Returns a coroutine function checking all the objects
+        in a single executor job.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            Optional[BatchAccessMethod]: batch access method for permission,
+                None if the permission is not set in the policy
+        """
+        batch_access_method = self._policy.get_batch_access_method(permission)
+        if batch_access_method is not None:
+            return partial(self._run, batch_access_method)
+        # the data dependencies are loaded by the ability for each object
+        if permission in self._dependencies:
+            return None
+
+        try:
+            access_method = self._policy.get_access_method(permission)
+        except UndefinedPermission:
+            return None
+        return partial(self._run, _call_for_each, access_method)
+
+    def get_loader_function(self, name: str) -> BatchLoadFunction:
+        """Returns a coroutine function running the loader
+        of the synchronous policy in the executor.
+
+        Args:
+            name (str): loader name
+
+        Returns:
+            BatchLoadFunction: method loading the values
+        """
+        return partial(self._run, self._policy.get_loader_function(name))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down the executor if it was created by this policy.
+
+        Args:
+            wait (bool): wait for the pending jobs to be done
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+
+    async def _run(self, func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        """Runs the function in the executor within a copy of the current context.
+
+        Args:
+            func (Callable[..., _T]): function to run
+            args (Any): arguments passed to the function
+            kwargs (Any): keyword arguments passed to the function
+
+        Returns:
+            _T: value returned by the function
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, partial(context.run, func, *args, **kwargs)
+        )
+
+
+def _call_for_each(
+    access_method: SyncAccessMethod, objects: List[Any], *args: Any, **kwargs: Any
+) -> List[bool]:
+    return [access_method(obj, *args, **kwargs) for obj in objects]
@@ -0,0 +1,320 @@
+import asyncio
+import math
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from deny.permission import Permission
+
+_KeyT = TypeVar("_KeyT", bound=Hashable)
+
+# key of a grant: subject, permission and resource (None for any resource)
+GrantKey = Tuple[Hashable, Permission, Optional[Hashable]]
+
+# called with the key of each grant that expired or was revoked
+ExpiryListener = Callable[[GrantKey], Any]
+
+
+class TimingWheel(Generic[_KeyT]):
+    """Hierarchical timing wheel scheduling the expiry of keys
+    in amortized constant time: the keys are stored in the slot of their
+    deadline on the first level whose range covers it, and moved down
+    a level each time the wheel reaches their slot.
+    Rescheduling or cancelling a key does not remove it from its slot,
+    the stale entries are skipped when their slot is reached.
+    """
+
+    def __init__(self, slots: int = 64, levels: int = 4) -> None:
+        """
+        Args:
+            slots (int): number of slots of each level
+            levels (int): number of levels, the wheel covers slots ** levels
+                ticks and the later deadlines wait in an overflow list
+        """
+        self._slots = slots
+        self._levels = levels
+        self._wheels: List[List[List[Tuple[_KeyT, int]]]] = [
+            [[] for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: List[Tuple[_KeyT, int]] = []
+        self._deadlines: Dict[_KeyT, int] = {}
+        self._tick = 0
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    @property
+    def tick(self) -> int:
+        return self._tick
+
+    def schedule(self, key: _KeyT, deadline: int) -> None:
+        """Schedules the expiry of a key, replacing its previous deadline.
+
+        Args:
+            key (_KeyT): a key
+            deadline (int): tick at which the key expires
+        """
+        self._deadlines[key] = deadline
+        # the slot of the current tick was already processed
+        self._insert(key, deadline, self._tick + 1)
+
+    def cancel(self, key: _KeyT) -> None:
+        """Cancels the expiry of a key.
+
+        Args:
+            key (_KeyT): a key
+        """
+        self._deadlines.pop(key, None)
+
+    def advance(self, tick: int) -> List[_KeyT]:
+        """Moves the wheel forward and returns the keys that expired.
+
+        Args:
+            tick (int): current tick
+
+        Returns:
+            List[_KeyT]: keys whose deadline is reached
+        """
+        expired: List[_KeyT] = []
+        while self._tick < tick:
+            if not self._deadlines:
+                # nothing to expire on the way
+                self._tick = tick
+                break
+            self._tick += 1
+            self._cascade()
+            bucket = self._wheels[0][self._tick % self._slots]
+            self._wheels[0][self._tick % self._slots] = []
+            for key, deadline in bucket:
+                if self._deadlines.get(key) == deadline:
+                    del self._deadlines[key]
+                    expired.append(key)
+        return expired
+
+    def _cascade(self) -> None:
+        span = 1
+        for level in range(1, self._levels):
+            span *= self._slots
+            if self._tick % span:
+                return
+            index = (self._tick // span) % self._slots
+            bucket = self._wheels[level][index]
+            self._wheels[level][index] = []
+            self._reinsert(bucket)
+        if self._tick % (span * self._slots) == 0:
+            overflow, self._overflow = self._overflow, []
+            self._reinsert(overflow)
+
+    def _reinsert(self, entries: List[Tuple[_KeyT, int]]) -> None:
+        for key, deadline in entries:
+            if self._deadlines.get(key) == deadline:
+                # the slot of the current tick is processed after the cascade
+                self._insert(key, deadline, self._tick)
+
+    def _insert(self, key: _KeyT, deadline: int, earliest: int) -> None:
+        # keys whose deadline is past expire at the earliest tick
+        slot_tick = max(deadline, earliest)
+        delta = slot_tick - self._tick
+        span = 1
+        for level in range(self._levels):
+            if delta < span * self._slots:
+                index = (slot_tick // span) % self._slots
+                self._wheels[level][index].append((key, deadline))
+                return
+            span *= self._slots
+        self._overflow.append((key, deadline))
+
+
+class ExpiringGrants:
+    """Temporary grants (ex: support sessions, share links) given to subjects,
+    expired by a timing wheel instead of being compared to the current time
+    in every access method over lists that keep growing.
+    The grants are checked in constant time and purged by purge(), called
+    periodically by purge_periodically() (asyncio) or a background thread
+    (start_purge_thread()). The listeners are called for each grant that
+    expired or was revoked, so the decisions cached from it can be invalidated.
+    It can be shared by threads and coroutines.
+
+    Example:
+
+        grants = ExpiringGrants()
+        grants.grant(user.id, ProjectPermissions.view, project.id, ttl=24 * 3600)
+
+        class UserPolicy(Policy):
+            @authorize(ProjectPermissions.view)
+            def can_view_project(self, project: Project) -> bool:
+                return grants.has(self.user.id, ProjectPermissions.view, project.id)
+    """
+
+    def __init__(
+        self,
+        tick: float = 1.0,
+        slots: int = 64,
+        levels: int = 4,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            tick (float): number of seconds between two positions of the wheel,
+                the grants are purged at most a tick after they expired
+            slots (int): number of slots of each level of the wheel
+            levels (int): number of levels of the wheel
+            clock (Callable[[], float]): function returning the current time
+                (timestamp in seconds)
+        """
+        self._tick = tick
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wheel: TimingWheel[GrantKey] = TimingWheel(slots, levels)
+        self._expires_at: Dict[GrantKey, float] = {}
+        self._listeners: List[ExpiryListener] = []
+        self._stop = threading.Event()
+        # the wheel starts at the current time
+        self._wheel.advance(self._get_tick(clock()))
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+    def grant(
+        self,
+        subject: Hashable,
+        permission: Permission,
+        resource: Optional[Hashable] = None,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Grants a permission until it expires, replacing the previous grant
+        of the same permission for the subject and the resource.
+
+        Args:
+            subject (Hashable): a subject (ex: user id)
+            permission (Permission): a permission
+            resource (Optional[Hashable]): a resource (ex: project id),
+                None for any resource
+            ttl (Optional[float]): number of seconds the grant lasts
+            expires_at (Optional[float]): timestamp at which the grant expires,
+                if ttl is not given
+        """
+        if ttl is not None:
+            expires_at = self._clock() + ttl
+        if expires_at is None:
+            raise ValueError("ttl or expires_at is required")
+        key = (subject, permission, resource)
+        with self._lock:
+            self._expires_at[key] = expires_at
+            self._wheel.schedule(key, math.ceil(expires_at / self._tick))
+
+    def revoke(
+        self,
+        subject: Hashable,
+        permission: Permission,
+        resource: Optional[Hashable] = None,
+    ) -> None:
+        """Revokes a grant before it expires.
+
+        Args:
+            subject (Hashable): a subject
+            permission (Permission): a permission
+            resource (Optional[Hashable]): a resource, None for any resource
+        """
+        key = (subject, permission, resource)
+        with self._lock:
+            if self._expires_at.pop(key, None) is None:
+                return
+            self._wheel.cancel(key)
+        self._notify([key])
+
+    def has(
+        self,
+        subject: Hashable,
+        permission: Permission,
+        resource: Optional[Hashable] = None,
+    ) -> bool:
+        """Returns True if the permission is granted to the subject
+        for the resource (or for any resource) and did not expire.
+
+        Args:
+            subject (Hashable): a subject
+            permission (Permission): a permission
+            resource (Optional[Hashable]): a resource
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+        """
+        now = self._clock()
+        expires_at = self._expires_at.get((subject, permission, resource))
+        if expires_at is not None and expires_at > now:
+            return True
+        if resource is None:
+            return False
+        expires_at = self._expires_at.get((subject, permission, None))
+        return expires_at is not None and expires_at > now
+
+    def add_listener(self, listener: ExpiryListener) -> None:
+        """Adds a function called with the key (subject, permission, resource)
+        of each grant that expired or was revoked.
+
+        Args:
+            listener (ExpiryListener): a function
+        """
+        self._listeners.append(listener)
+
+    def purge(self) -> List[GrantKey]:
+        """Removes the grants that expired and notifies the listeners.
+
+        Returns:
+            List[GrantKey]: keys of the grants removed
+        """
+        with self._lock:
+            expired = self._wheel.advance(self._get_tick(self._clock()))
+            for key in expired:
+                del self._expires_at[key]
+        self._notify(expired)
+        return expired
+
+    async def purge_periodically(self) -> None:
+        """Purges the grants every tick until cancelled, run it in a task."""
+        while True:
+            self.purge()
+            await asyncio.sleep(self._tick)
+
+    def start_purge_thread(self) -> threading.Thread:
+        """Starts a daemon thread purging the grants every tick
+        until stop_purge_thread() is called.
+
+        Returns:
+            threading.Thread: the thread
+        """
+        self._stop.clear()
+        thread = threading.Thread(
+            target=self._purge_until_stopped, name="deny-expiry", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop_purge_thread(self) -> None:
+        """Stops the thread started by start_purge_thread()."""
+        self._stop.set()
+
+    def _purge_until_stopped(self) -> None:
+        while not self._stop.wait(self._tick):
+            self.purge()
+
+    def _get_tick(self, now: float) -> int:
+        # the grants expiring during a tick are purged at its end
+        return math.floor(now / self._tick)
+
+    def _notify(self, keys: List[GrantKey]) -> None:
+        for listener in self._listeners:
+            for key in keys:
+                listener(key)
@@ -0,0 +1,112 @@
+from typing import Any, Awaitable, Callable, Dict, MutableMapping, Optional, Tuple
+
+from deny import Ability
+from deny.context import get_current_ability, use_ability
+from deny.errors import AbilityNotFound, UnauthorizedError
+from deny.ext.routes import RouteIndex
+from deny.ext.spec import (  # noqa: F401
+    PermissionSpec,
+    SpecLike,
+    all_of,
+    any_of,
+    authorize_spec,
+)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class AuthorizationMiddleware:
+    """ASGI middleware checking the permissions of the requests before
+    the application is called, whatever the framework.
+    The spec of each (HTTP method, path template) is indexed at startup
+    (see deny.ext.routes.RouteIndex), and the path params are passed
+    to the access methods according to the `params` of the spec.
+    The requests that are denied receive a 403 response.
+    The ability is built by `ability_factory` if given, otherwise the one
+    of the current context (see deny.context) is used. It is then stored in
+    the state of the scope and set in the context of the application.
+
+    Example:
+
+        app = AuthorizationMiddleware(
+            app,
+            {("GET", "/projects/{id:int}"): all_of(
+                ProjectPermissions.view, params={"id": "project_id"}
+            )},
+            ability_factory=lambda scope: Ability(policy=UserPolicy(scope["user"])),
+        )
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Dict[Tuple[str, str], SpecLike],
+        ability_factory: Optional[Callable[[Scope], Ability]] = None,
+        ability_key: str = "ability",
+    ) -> None:
+        """
+        Args:
+            app (ASGIApp): the ASGI application
+            routes (Dict[Tuple[str, str], SpecLike]): spec of each HTTP method
+                (or "*") and path template
+            ability_factory (Optional[Callable[[Scope], Ability]]): function
+                building the ability of a request from its scope
+            ability_key (str): key storing the ability object in scope["state"]
+        """
+        self._app = app
+        self._index = RouteIndex(routes)
+        self._ability_factory = ability_factory
+        self._ability_key = ability_key
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+
+        match = self._index.match(scope["method"], scope["path"])
+        if match is None or not match[0].permissions:
+            await self._app(scope, receive, send)
+            return
+
+        spec, params = match
+        ability = self._get_ability(scope)
+        try:
+            await authorize_spec(ability, spec, spec.get_kwargs(params, scope))
+        except UnauthorizedError:
+            await _send_forbidden(send)
+            return
+
+        scope.setdefault("state", {})[self._ability_key] = ability
+        with use_ability(ability):
+            await self._app(scope, receive, send)
+
+    def _get_ability(self, scope: Scope) -> Ability:
+        # a variable left set in a reused thread or task never overrides
+        # the ability built for the request
+        if self._ability_factory is not None:
+            return self._ability_factory(scope)
+        ability: Optional[Ability] = get_current_ability()
+        if ability is None:
+            raise AbilityNotFound(
+                "Ability could not be found in the current context "
+                "and no ability_factory was given"
+            )
+        return ability
+
+
+async def _send_forbidden(send: Send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 403,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", b"9"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"Forbidden"})
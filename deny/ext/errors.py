@@ -1,4 +1 @@
-class AbilityNotFound(Exception):
-    """Error raised when the ability could not be found
-    while executing one of the extensions @authorize() decorator.
-    """
+from deny.errors import AbilityNotFound  # noqa: F401
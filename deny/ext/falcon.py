@@ -1,14 +1,32 @@
+import logging
 from functools import wraps
-from typing import Any, Awaitable, Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 
-from falcon import Request
+from falcon import App, Request
 from falcon.response import Response
+from falcon.routing import CompiledRouter
 
 from deny import Ability
-from deny.ext.errors import AbilityNotFound
+from deny.context import get_current_ability
+from deny.errors import AbilityNotFound, UnauthorizedError
+from deny.ext.spec import (  # noqa: F401
+    PermissionSpec,
+    SpecLike,
+    all_of,
+    any_of,
+    authorize_spec,
+    get_spec,
+    public,
+    requires,
+    to_spec,
+)
 from deny.permission import Permission
 
+logger = logging.getLogger(__name__)
+
 ResourceMethod = Callable[..., Awaitable[None]]
+# resource class, HTTP method and URI template of a route
+RouteKey = Tuple[type, str, Optional[str]]
 
 
 def authorize(
@@ -17,6 +35,8 @@ def authorize(
     """Falcon's decorator for checking endpoints' permissions.
     The policy's access methods will be called with the request and
     all the other arguments and keyword arguments sent to the endpoint.
+    The ability stored in the request.context is used if set, otherwise
+    the one of the current context (see deny.context).
 
     Args:
         permission (Permission): a permission
@@ -29,6 +49,8 @@ def authorize(
             resource: Any, req: Request, resp: Response, *args: Any, **kwargs: Any
         ) -> None:
             ability: Optional[Ability] = req.context.get(ability_key)
+            if ability is None:
+                ability = get_current_ability()
             if ability:
                 await ability.authorize(permission, request=req, *args, **kwargs)
                 await func(resource, req, resp, *args, **kwargs)
@@ -41,3 +63,140 @@ def authorize(
         return wrapper
 
     return decorator
+
+
+class AuthorizationMiddleware:
+    """Falcon middleware checking the permissions of the responders
+    before they are called.
+    The spec of each (resource class, HTTP method, URI template) is found in the
+    routes given at startup, or with the @requires() decorator of the responder,
+    when the routes are indexed with build_index(), then it's found with a single
+    lookup. The routes that are not indexed are resolved when first requested,
+    except the ones whose resource has several responders for the method
+    (ex: `on_get()` and `on_get_list()` for a route added with a suffix),
+    which are denied until the routes are indexed.
+    The ability stored in the request.context is used if set, otherwise
+    the one of the current context (see deny.context).
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[Tuple[type, str], SpecLike]] = None,
+        ability_key: str = "ability",
+    ) -> None:
+        """
+        Args:
+            routes (Optional[Dict[Tuple[type, str], SpecLike]]): spec of
+                each resource class and HTTP method, overriding @requires()
+            ability_key (str): key storing the ability object in the request.context
+        """
+        self._ability_key = ability_key
+        self._routes: Dict[Tuple[type, str], PermissionSpec] = {
+            (resource_class, method.upper()): to_spec(spec)
+            for (resource_class, method), spec in (routes or {}).items()
+        }
+        self._index: Dict[RouteKey, Optional[PermissionSpec]] = {}
+
+    def build_index(self, app: App) -> None:
+        """Resolves the spec of each route of the application from the responder
+        it calls, so the responders selected by a suffix are checked.
+        It must be called once all the routes are added.
+        Raises a ValueError if a spec of `routes` matches none of them.
+
+        Args:
+            app (App): application
+        """
+        index: Dict[RouteKey, Optional[PermissionSpec]] = {}
+        for resource, uri_template, method_map in _iter_routes(app):
+            resource_class = type(resource)
+            for method, responder in method_map.items():
+                spec = self._routes.get((resource_class, method))
+                if spec is None:
+                    spec = get_spec(responder)
+                index[resource_class, method, uri_template] = spec
+
+        routed = {(resource_class, method) for resource_class, method, _ in index}
+        unknown = [key for key in self._routes if key not in routed]
+        if unknown:
+            raise ValueError(
+                "No route of the application for "
+                + ", ".join(f"{cls.__name__} {method}" for cls, method in unknown)
+            )
+        self._index = index
+
+    async def process_resource(
+        self, req: Request, resp: Response, resource: Any, params: Dict[str, Any]
+    ) -> None:
+        if resource is None:
+            return
+
+        key = (type(resource), req.method, req.uri_template)
+        try:
+            spec = self._index[key]
+        except KeyError:
+            spec = self._index[key] = self._find_spec(
+                resource, req.method, req.uri_template
+            )
+        if spec is None or not spec.permissions:
+            return
+        if spec is _UNRESOLVED:
+            raise UnauthorizedError(spec.permissions[0])
+
+        ability: Optional[Ability] = req.context.get(self._ability_key)
+        if ability is None:
+            ability = get_current_ability()
+            if ability is None:
+                raise AbilityNotFound(
+                    "Ability could not be found in "
+                    f"request.context (ability_key={self._ability_key})"
+                )
+
+        await authorize_spec(ability, spec, spec.get_kwargs(params, req))
+
+    def _find_spec(
+        self, resource: Any, method: str, uri_template: Optional[str]
+    ) -> Optional[PermissionSpec]:
+        resource_class = type(resource)
+        spec = self._routes.get((resource_class, method))
+        if spec is not None:
+            return spec
+
+        # the route may use a responder with a suffix, it can't be
+        # told apart from the other ones until the routes are indexed
+        name = f"on_{method.lower()}"
+        specs = {
+            attr: get_spec(getattr(resource_class, attr))
+            for attr in dir(resource_class)
+            if attr == name or attr.startswith(f"{name}_")
+        }
+        if len(specs) > 1 and any(spec is not None for spec in specs.values()):
+            logger.error(
+                "The responder of %s %s could not be found among %s, its requests"
+                " are denied until build_index(app) is called once the routes"
+                " are added",
+                method,
+                uri_template,
+                ", ".join(sorted(specs)),
+            )
+            return _UNRESOLVED
+        return specs.get(name)
+
+
+# spec of the routes whose responder is unknown until they are indexed,
+# the requests are denied rather than checked against the wrong responder
+_UNRESOLVED = PermissionSpec((Permission("unresolved responder"),))
+
+
+def _iter_routes(app: App) -> Iterator[Tuple[Any, str, Dict[str, Any]]]:
+    """Yields the resource, URI template and responder of each HTTP method
+    of the routes of an application using the default router.
+    """
+    router = app._router
+    if not isinstance(router, CompiledRouter):
+        raise TypeError("build_index() only supports the default CompiledRouter")
+    nodes: List[Any] = list(router._roots)
+    while nodes:
+        node = nodes.pop()
+        if node.resource is not None and node.method_map:
+            yield node.resource, node.uri_template, node.method_map
+        nodes.extend(node.children or ())
@@ -5,6 +5,15 @@ from typing import Any, Awaitable, Callable
 from fastapi import Depends, Request
 
 from deny import Ability, Permission
+from deny.context import current_ability
+from deny.ext.spec import (  # noqa: F401
+    PermissionSpec,
+    SpecLike,
+    all_of,
+    any_of,
+    authorize_spec,
+    to_spec,
+)
 
 EndpointFunction = Callable[..., Awaitable[Any]]
 
@@ -74,3 +83,63 @@ def authorize_factory(ability_dependency: Callable[..., Ability]):
         return decorator
 
     return authorize
+
+
+async def _get_current_ability() -> Ability:
+    # async so FastAPI does not run it in a thread
+    return current_ability()
+
+
+def Authorize(
+    *specs: SpecLike,
+    ability_dependency: Callable[..., Any] = _get_current_ability,
+) -> Any:
+    """Returns a dependency checking permissions, usable in the `dependencies`
+    of an APIRouter or of a path operation.
+    All the specs are checked, in a single dependency.
+    The ability is returned by ability_dependency, which FastAPI resolves once
+    per request: all the Authorize() dependencies of a request share the same
+    ability. By default it's the ability of the current context
+    (see deny.context).
+    The URI params mapped by the specs are read from request.path_params,
+    they are not converted unless the path uses a convertor (ex: {id:int}).
+
+    Example:
+
+        router = APIRouter(
+            dependencies=[
+                Authorize(ProjectPermissions.view, ability_dependency=get_ability)
+            ]
+        )
+
+        @router.put(
+            "/projects/{id:int}",
+            dependencies=[
+                Authorize(
+                    all_of(ProjectPermissions.edit, params={"id": "project_id"}),
+                    ability_dependency=get_ability,
+                )
+            ],
+        )
+        async def edit_project(id: int):
+            pass
+
+    Args:
+        specs (SpecLike): permissions or specs
+        ability_dependency (Callable[..., Any]): dependency returning
+            the Ability object
+
+    Returns:
+        Any: the dependency
+    """
+    permission_specs = [to_spec(spec) for spec in specs]
+
+    async def authorize(
+        request: Request, ability: Ability = Depends(ability_dependency)
+    ) -> None:
+        for spec in permission_specs:
+            await authorize_spec(
+                ability, spec, spec.get_kwargs(request.path_params, request)
+            )
+
+    return Depends(authorize)
@@ -1,9 +1,21 @@
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Optional, Union
 
-from flask import g, request
+from flask import Blueprint, Flask, current_app, g, request
 
-from deny.ext.errors import AbilityNotFound
+from deny.context import get_current_ability
+from deny.errors import AbilityNotFound
+from deny.ext.spec import (  # noqa: F401
+    PermissionSpec,
+    SpecLike,
+    all_of,
+    any_of,
+    authorize_spec_sync,
+    get_spec,
+    public,
+    requires,
+    to_spec,
+)
 from deny.sync import Ability, Permission
 
 EndpointMethod = Callable[..., Any]
@@ -13,6 +25,8 @@ def authorize(permission: Permission, ability_key: str = "ability") -> EndpointM
     """Flask's decorator for checking endpoints' permissions.
     The policy's access methods will be called with the request and
     all the other arguments and keyword arguments sent to the endpoint.
+    The ability stored in g is used if set, otherwise the one
+    of the current context (see deny.context).
 
     Args:
         permission (Permission): a permission
@@ -23,6 +37,8 @@ def authorize(permission: Permission, ability_key: str = "ability") -> EndpointM
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> None:
             ability: Optional[Ability] = g.get(ability_key)
+            if ability is None:
+                ability = get_current_ability()
             if ability:
                 ability.authorize(permission, request=request, *args, **kwargs)
                 return func(*args, **kwargs)
@@ -34,3 +50,130 @@ def authorize(permission: Permission, ability_key: str = "ability") -> EndpointM
         return wrapper
 
     return decorator
+
+
+class Deny:
+    """Flask extension checking the permissions of the endpoints
+    before the requests are dispatched (async views included).
+    The spec of each endpoint is found in the endpoints protected with protect(),
+    with the @requires() decorator of the view, or in the default spec of its
+    blueprint, the first time the endpoint is requested.
+    The Ability is only built for the endpoints requiring permissions.
+
+    Example:
+
+        deny = Deny(app, ability_factory=lambda: Ability(policy=UserPolicy()))
+
+        @app.get("/projects/<int:id>")
+        @requires(all_of(ProjectPermissions.view, params={"id": "project_id"}))
+        def get_project(id: int) -> Response:
+            ...
+    """
+
+    def __init__(
+        self,
+        app: Optional[Flask] = None,
+        ability_factory: Optional[Callable[[], Ability]] = None,
+        ability_key: str = "ability",
+    ) -> None:
+        """
+        Args:
+            app (Optional[Flask]): application, see init_app()
+            ability_factory (Optional[Callable[[], Ability]]): function building
+                the ability of the request, if not set the ability must be
+                stored in g
+            ability_key (str): key storing the ability object in g
+        """
+        self._ability_factory = ability_factory
+        self._ability_key = ability_key
+        self._endpoints: Dict[str, PermissionSpec] = {}
+        self._blueprints: Dict[str, PermissionSpec] = {}
+        self._index: Dict[str, Optional[PermissionSpec]] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Registers the extension on the application.
+
+        Args:
+            app (Flask): application
+        """
+        app.extensions["deny"] = self
+        app.before_request(self._authorize)
+
+    def protect(self, endpoint: str, spec: SpecLike) -> None:
+        """Sets the permissions required by an endpoint.
+
+        Args:
+            endpoint (str): endpoint name
+            spec (SpecLike): a permission or a spec
+        """
+        self._endpoints[endpoint] = to_spec(spec)
+        self._index.clear()
+
+    def protect_blueprint(
+        self, blueprint: Union[Blueprint, str], spec: SpecLike
+    ) -> None:
+        """Sets the permissions required by default by the endpoints of a blueprint
+        (and of its nested blueprints), use @public() to exclude some of them.
+
+        Args:
+            blueprint (Union[Blueprint, str]): blueprint or its name
+            spec (SpecLike): a permission or a spec
+        """
+        name = blueprint if isinstance(blueprint, str) else blueprint.name
+        self._blueprints[name] = to_spec(spec)
+        self._index.clear()
+
+    def get_ability(self) -> Ability:
+        """Returns the ability of the current request, building it if needed.
+
+        Returns:
+            Ability: the ability
+        """
+        ability: Optional[Ability] = g.get(self._ability_key)
+        if ability is None:
+            ability = get_current_ability()
+        if ability is None:
+            if self._ability_factory is None:
+                raise AbilityNotFound(
+                    f"Ability could not be found in g (ability_key={self._ability_key})"
+                )
+            ability = self._ability_factory()
+            setattr(g, self._ability_key, ability)
+        return ability
+
+    def _authorize(self) -> None:
+        endpoint = request.endpoint
+        if endpoint is None:
+            return
+
+        try:
+            spec = self._index[endpoint]
+        except KeyError:
+            spec = self._index[endpoint] = self._find_spec(endpoint)
+        if spec is None or not spec.permissions:
+            return
+
+        authorize_spec_sync(
+            self.get_ability(), spec, spec.get_kwargs(request.view_args or {}, request)
+        )
+
+    def _find_spec(self, endpoint: str) -> Optional[PermissionSpec]:
+        spec = self._endpoints.get(endpoint)
+        if spec is not None:
+            return spec
+        spec = get_spec(current_app.view_functions.get(endpoint))
+        if spec is not None:
+            return spec
+
+        blueprint, _, name = endpoint.rpartition(".")
+        if name == "static":
+            return None
+        # nested blueprints are named "parent.child"
+        while blueprint:
+            spec = self._blueprints.get(blueprint)
+            if spec is not None:
+                return spec
+            blueprint = blueprint.rpartition(".")[0]
+        return None
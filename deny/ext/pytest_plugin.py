@@ -0,0 +1,24 @@
+from typing import Callable, ContextManager, List
+
+import pytest
+
+from deny.budget import CheckAccount, assert_checks
+
+
+@pytest.fixture
+def check_budget() -> Callable[..., ContextManager[List[CheckAccount]]]:
+    """Fixture returning deny.budget.assert_checks(), to assert the requests
+    made with the test client of a framework stay under a number of checks.
+    Enable it with `pytest_plugins = ["deny.ext.pytest_plugin"]` in the root
+    conftest.py.
+
+    Example:
+
+        def test_list_projects(client: FlaskClient, check_budget) -> None:
+            with check_budget(max_checks=5, batch_threshold=3):
+                client.get("/projects")
+
+    Returns:
+        Callable[..., ContextManager[List[CheckAccount]]]: assert_checks()
+    """
+    return assert_checks
@@ -0,0 +1,161 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from deny.ext.spec import PermissionSpec, SpecLike, to_spec
+
+# converts the value of a path param, raises a ValueError if it does not match
+Convertor = Callable[[str], Any]
+
+_INT_PATTERN = re.compile(r"[0-9]+")
+_FLOAT_PATTERN = re.compile(r"[0-9]+(\.[0-9]+)?")
+
+
+def _to_int(value: str) -> int:
+    # int() would also accept signs, spaces and non ASCII digits
+    if _INT_PATTERN.fullmatch(value) is None:
+        raise ValueError(f"Invalid int: {value!r}")
+    return int(value)
+
+
+def _to_float(value: str) -> float:
+    # float() would also accept signs, exponents, "nan" and "inf"
+    if _FLOAT_PATTERN.fullmatch(value) is None:
+        raise ValueError(f"Invalid float: {value!r}")
+    return float(value)
+
+
+CONVERTORS: Dict[str, Convertor] = {"str": str, "int": _to_int, "float": _to_float}
+
+# method matching any method of a route
+ANY_METHOD = "*"
+
+
+# spec of a route and the names of its path params
+_Route = Tuple[PermissionSpec, Tuple[str, ...]]
+
+
+class _Node:
+    __slots__ = ("static", "param_convertor", "param_node", "routes")
+
+    def __init__(self) -> None:
+        self.static: Dict[str, "_Node"] = {}
+        self.param_convertor: Convertor = str
+        self.param_node: Optional["_Node"] = None
+        # the routes may name differently the params at the same position
+        self.routes: Dict[str, _Route] = {}
+
+
+class RouteIndex:
+    """Finds the spec of a request from its method and path, using a tree
+    of the path segments built once: the cost of a lookup depends on the
+    number of segments of the path, not on the number of routes.
+    The path templates use the `{name}` or `{name:convertor}` syntax for the
+    params (convertors: str, int, float), static segments being preferred
+    unless they have no spec for the method.
+    HEAD requests use the spec of GET if the route has no spec for HEAD.
+
+    Example:
+
+        index = RouteIndex({
+            ("GET", "/projects/{id:int}"): ProjectPermissions.view,
+            ("*", "/admin/{path}"): ProjectPermissions.delete,
+        })
+        index.match("GET", "/projects/1")  # (PermissionSpec(...), {"id": 1})
+    """
+
+    def __init__(self, routes: Dict[Tuple[str, str], SpecLike]) -> None:
+        """
+        Args:
+            routes (Dict[Tuple[str, str], SpecLike]): spec of each method
+                (or "*") and path template
+        """
+        self._root = _Node()
+        for (method, template), spec in routes.items():
+            self._add(method.upper(), template, to_spec(spec))
+
+    def match(
+        self, method: str, path: str
+    ) -> Optional[Tuple[PermissionSpec, Dict[str, Any]]]:
+        """Returns the spec of a request and its path params.
+
+        Args:
+            method (str): HTTP method
+            path (str): path of the request
+
+        Returns:
+            Optional[Tuple[PermissionSpec, Dict[str, Any]]]: spec and path params,
+                None if no route matches
+        """
+        values: List[Any] = []
+        route = self._match(self._root, method.upper(), _split(path), 0, values)
+        if route is None:
+            return None
+        spec, names = route
+        return spec, dict(zip(names, values))
+
+    def _add(self, method: str, template: str, spec: PermissionSpec) -> None:
+        node = self._root
+        names: List[str] = []
+        for segment in _split(template):
+            if segment.startswith("{") and segment.endswith("}"):
+                name, _, convertor_name = segment[1:-1].partition(":")
+                convertor = CONVERTORS[convertor_name or "str"]
+                if node.param_node is None:
+                    node.param_convertor = convertor
+                    node.param_node = _Node()
+                elif node.param_convertor is not convertor:
+                    raise ValueError(
+                        f"Path param {segment} of {template} conflicts with "
+                        "the convertor of another param at the same position"
+                    )
+                names.append(name)
+                node = node.param_node
+            else:
+                node = node.static.setdefault(segment, _Node())
+        node.routes[method] = (spec, tuple(names))
+
+    def _match(
+        self,
+        node: _Node,
+        method: str,
+        segments: List[str],
+        index: int,
+        values: List[Any],
+    ) -> Optional[_Route]:
+        if index == len(segments):
+            return _get_route(node, method)
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            # a static route without a spec for the method falls back
+            # to the param routes (ex: POST /projects/new, GET /projects/{id})
+            found = self._match(child, method, segments, index + 1, values)
+            if found is not None:
+                return found
+
+        if node.param_node is not None and segment:
+            try:
+                value = node.param_convertor(segment)
+            except ValueError:
+                return None
+            values.append(value)
+            found = self._match(node.param_node, method, segments, index + 1, values)
+            if found is not None:
+                return found
+            values.pop()
+        return None
+
+
+def _get_route(node: _Node, method: str) -> Optional[_Route]:
+    route = node.routes.get(method)
+    if route is None and method == "HEAD":
+        route = node.routes.get("GET")
+    if route is None:
+        route = node.routes.get(ANY_METHOD)
+    return route
+
+
+def _split(path: str) -> List[str]:
+    # "/projects/1/" and "/projects/1" are the same path
+    return path.strip("/").split("/")
@@ -1,12 +1,26 @@
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Optional, Union
 
+from sanic import Blueprint, Sanic
 from sanic.models.handler_types import RouteHandler
 from sanic.request import Request
 from sanic.response import HTTPResponse
+from sanic_routing import Route
 
 from deny import Ability, Permission
-from deny.ext.errors import AbilityNotFound
+from deny.context import get_current_ability
+from deny.errors import AbilityNotFound
+from deny.ext.spec import (  # noqa: F401
+    PermissionSpec,
+    SpecLike,
+    all_of,
+    any_of,
+    authorize_spec,
+    get_spec,
+    public,
+    requires,
+    to_spec,
+)
 
 
 def authorize(
@@ -15,6 +29,8 @@ def authorize(
     """Sanic's decorator for checking endpoints' permissions.
     The policy's access methods will be called with the request and
     all the other arguments and keyword arguments sent to the endpoint.
+    The ability stored in the request.ctx is used if set, otherwise
+    the one of the current context (see deny.context).
 
     Args:
         permission (Permission): a permission
@@ -27,6 +43,8 @@ def authorize(
             request: Request, *args: Any, **kwargs: Any
         ) -> Optional[HTTPResponse]:
             ability: Optional[Ability] = getattr(request.ctx, ability_key, None)
+            if ability is None:
+                ability = get_current_ability()
             if ability:
                 await ability.authorize(permission, request=request, *args, **kwargs)
                 return await func(request, *args, **kwargs)
@@ -39,3 +57,138 @@ def authorize(
         return wrapper
 
     return decorator
+
+
+class Deny:
+    """Sanic integration checking the permissions of the routes in a request
+    middleware.
+    The spec of each route is set in its context (`ctx_deny=...` in the route
+    decorator), with the @requires() decorator of the handler, or by default for
+    the routes of a blueprint. The specs are indexed by route name once
+    per application, by the first request of each worker (the workers being
+    separate processes), so a request costs a single lookup.
+    The Ability is only built for the routes requiring permissions.
+
+    Example:
+
+        deny = Deny(app, ability_factory=lambda request: Ability(policy=UserPolicy()))
+
+        @app.get("/projects/<id:int>", ctx_deny=all_of(ProjectPermissions.view))
+        async def get_project(request: Request, id: int) -> HTTPResponse:
+            ...
+    """
+
+    def __init__(
+        self,
+        app: Optional[Sanic] = None,
+        ability_factory: Optional[Callable[[Request], Ability]] = None,
+        ability_key: str = "ability",
+    ) -> None:
+        """
+        Args:
+            app (Optional[Sanic]): application, see init_app()
+            ability_factory (Optional[Callable[[Request], Ability]]): function
+                building the ability of the request, if not set the ability
+                must be stored in request.ctx
+            ability_key (str): key storing the ability object in the request.ctx
+        """
+        self._ability_factory = ability_factory
+        self._ability_key = ability_key
+        self._blueprints: Dict[str, PermissionSpec] = {}
+        # indexes of the applications, by application name
+        self._indexes: Dict[str, Dict[str, PermissionSpec]] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Sanic) -> None:
+        """Registers the middleware checking the permissions.
+
+        Args:
+            app (Sanic): application
+        """
+        app.ctx.deny = self
+        app.register_middleware(self._authorize, "request")
+
+    def protect_blueprint(
+        self, blueprint: Union[Blueprint, str], spec: SpecLike
+    ) -> None:
+        """Sets the permissions required by default by the routes of a blueprint,
+        use @public() to exclude some of them.
+
+        Args:
+            blueprint (Union[Blueprint, str]): blueprint or its name
+            spec (SpecLike): a permission or a spec
+        """
+        name = blueprint if isinstance(blueprint, str) else blueprint.name
+        self._blueprints[name] = to_spec(spec)
+
+    def get_ability(self, request: Request) -> Ability:
+        """Returns the ability of the request, building it if needed.
+
+        Args:
+            request (Request): the request
+
+        Returns:
+            Ability: the ability
+        """
+        ability: Optional[Ability] = getattr(request.ctx, self._ability_key, None)
+        if ability is None:
+            ability = get_current_ability()
+        if ability is None:
+            if self._ability_factory is None:
+                raise AbilityNotFound(
+                    "Ability could not be found in "
+                    f"request.ctx (ability_key={self._ability_key})"
+                )
+            ability = self._ability_factory(request)
+            setattr(request.ctx, self._ability_key, ability)
+        return ability
+
+    def build_index(self, app: Sanic) -> Dict[str, PermissionSpec]:
+        """Indexes the specs of the routes by route name, the index being
+        cached for the application.
+
+        Args:
+            app (Sanic): application
+
+        Returns:
+            Dict[str, PermissionSpec]: specs requiring permissions, by route name
+        """
+        index: Dict[str, PermissionSpec] = {}
+        for route in app.router.routes:
+            spec = self._find_spec(app, route)
+            if spec is not None and spec.permissions:
+                index[route.name] = spec
+        self._indexes[app.name] = index
+        return index
+
+    async def _authorize(self, request: Request) -> None:
+        route = request.route
+        if route is None:
+            return
+        index = self._indexes.get(request.app.name)
+        if index is None:
+            index = self.build_index(request.app)
+        spec = index.get(route.name)
+        if spec is None:
+            return
+        await authorize_spec(
+            self.get_ability(request),
+            spec,
+            spec.get_kwargs(request.match_info, request),
+        )
+
+    def _find_spec(self, app: Sanic, route: Route) -> Optional[PermissionSpec]:
+        if route.extra.static:
+            return None
+        spec: Optional[SpecLike] = getattr(route.ctx, "deny", None)
+        if spec is not None:
+            return to_spec(spec)
+        handler_spec = get_spec(route.handler)
+        if handler_spec is not None:
+            return handler_spec
+
+        # the routes of a blueprint are named "app.blueprint.handler"
+        name = route.name[len(app.name) + 1 :]
+        blueprint = name.rpartition(".")[0]
+        return self._blueprints.get(blueprint)
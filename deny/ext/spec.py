@@ -0,0 +1,189 @@
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, TypeVar, Union
+
+from deny.errors import UnauthorizedError
+from deny.permission import Permission
+
+_HandlerT = TypeVar("_HandlerT", bound=Callable[..., Any])
+
+_SPEC_ATTR = "_deny_permission_spec"
+
+
+class PermissionSpec(NamedTuple):
+    """Permissions required by a handler, checked by the middlewares
+    and extensions of the web frameworks.
+    """
+
+    permissions: Tuple[Permission, ...]
+    # all the permissions must be granted, otherwise any of them
+    require_all: bool = True
+    # (URI param, keyword argument of the access methods) pairs,
+    # a tuple so the spec is hashable (ex: stored in the Sanic route context)
+    params: Optional[Tuple[Tuple[str, str], ...]] = None
+    # pass the request to the access methods as `request`
+    pass_request: bool = False
+
+    def get_kwargs(self, params: Dict[str, Any], request: Any) -> Dict[str, Any]:
+        """Returns the keyword arguments passed to the access methods.
+
+        Args:
+            params (Dict[str, Any]): URI params of the request
+            request (Any): the request
+
+        Returns:
+            Dict[str, Any]: keyword arguments
+        """
+        kwargs: Dict[str, Any] = {}
+        if self.params is not None:
+            kwargs = {name: params[param] for param, name in self.params}
+        if self.pass_request:
+            kwargs["request"] = request
+        return kwargs
+
+
+SpecLike = Union[Permission, PermissionSpec]
+
+# spec of the handlers that do not require any permission
+PUBLIC = PermissionSpec(())
+
+
+def all_of(
+    *permissions: Permission,
+    params: Optional[Dict[str, str]] = None,
+    pass_request: bool = False,
+) -> PermissionSpec:
+    """Returns a spec requiring all the permissions.
+
+    Args:
+        permissions (Permission): permissions
+        params (Optional[Dict[str, str]]): keyword argument of the access methods
+            for each URI param (ex: {"id": "project_id"}), by default the access
+            methods do not receive the URI params
+        pass_request (bool): pass the request to the access methods
+
+    Returns:
+        PermissionSpec: spec
+    """
+    return PermissionSpec(permissions, True, _to_pairs(params), pass_request)
+
+
+def any_of(
+    *permissions: Permission,
+    params: Optional[Dict[str, str]] = None,
+    pass_request: bool = False,
+) -> PermissionSpec:
+    """Returns a spec requiring any of the permissions.
+
+    Args:
+        permissions (Permission): permissions
+        params (Optional[Dict[str, str]]): keyword argument of the access methods
+            for each URI param (ex: {"id": "project_id"}), by default the access
+            methods do not receive the URI params
+        pass_request (bool): pass the request to the access methods
+
+    Returns:
+        PermissionSpec: spec
+    """
+    return PermissionSpec(permissions, False, _to_pairs(params), pass_request)
+
+
+def _to_pairs(
+    params: Optional[Dict[str, str]]
+) -> Optional[Tuple[Tuple[str, str], ...]]:
+    return None if params is None else tuple(params.items())
+
+
+def to_spec(spec: SpecLike) -> PermissionSpec:
+    """
+    Args:
+        spec (SpecLike): a permission or a spec
+
+    Returns:
+        PermissionSpec: spec requiring the permission, or the spec itself
+    """
+    if isinstance(spec, PermissionSpec):
+        return spec
+    return PermissionSpec((spec,))
+
+
+def requires(spec: SpecLike) -> Callable[[_HandlerT], _HandlerT]:
+    """Declares the permissions required by a handler, checked by
+    the middleware of the web framework. The handler is not wrapped.
+
+    Args:
+        spec (SpecLike): a permission or a spec
+    """
+
+    def decorator(func: _HandlerT) -> _HandlerT:
+        setattr(func, _SPEC_ATTR, to_spec(spec))
+        return func
+
+    return decorator
+
+
+def public(func: _HandlerT) -> _HandlerT:
+    """Declares a handler that does not require any permission,
+    even if a default spec applies to it (ex: health checks).
+
+    Args:
+        func (_HandlerT): a handler
+
+    Returns:
+        _HandlerT: handler received as input
+    """
+    setattr(func, _SPEC_ATTR, PUBLIC)
+    return func
+
+
+def get_spec(func: Any) -> Optional[PermissionSpec]:
+    """Returns the spec declared with @requires() or @public().
+
+    Args:
+        func (Any): a handler
+
+    Returns:
+        Optional[PermissionSpec]: spec, None if not declared
+    """
+    return getattr(func, _SPEC_ATTR, None)
+
+
+async def authorize_spec(
+    ability: Any, spec: PermissionSpec, kwargs: Dict[str, Any]
+) -> None:
+    """Raises an UnauthorizedError if the ability does not grant the permissions
+    of the spec.
+
+    Args:
+        ability (Any): an Ability (from `deny`)
+        spec (PermissionSpec): spec to check
+        kwargs (Dict[str, Any]): keyword arguments passed to the access methods
+    """
+    if spec.require_all:
+        for permission in spec.permissions:
+            await ability.authorize(permission, **kwargs)
+        return
+
+    for permission in spec.permissions:
+        if await ability.can(permission, **kwargs):
+            return
+    raise UnauthorizedError(spec.permissions[0])
+
+
+def authorize_spec_sync(
+    ability: Any, spec: PermissionSpec, kwargs: Dict[str, Any]
+) -> None:
+    """Synchronous version of authorize_spec().
+
+    Args:
+        ability (Any): an Ability (from `deny.sync`)
+        spec (PermissionSpec): spec to check
+        kwargs (Dict[str, Any]): keyword arguments passed to the access methods
+    """
+    if spec.require_all:
+        for permission in spec.permissions:
+            ability.authorize(permission, **kwargs)
+        return
+
+    for permission in spec.permissions:
+        if ability.can(permission, **kwargs):
+            return
+    raise UnauthorizedError(spec.permissions[0])
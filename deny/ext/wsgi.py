@@ -0,0 +1,103 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from deny.context import get_current_ability, use_ability
+from deny.errors import AbilityNotFound, UnauthorizedError
+from deny.ext.routes import RouteIndex
+from deny.ext.spec import (  # noqa: F401
+    PermissionSpec,
+    SpecLike,
+    all_of,
+    any_of,
+    authorize_spec_sync,
+)
+from deny.sync import Ability
+
+Environ = Dict[str, Any]
+StartResponse = Callable[..., Any]
+WSGIApp = Callable[[Environ, StartResponse], Iterable[bytes]]
+
+
+class AuthorizationMiddleware:
+    """WSGI middleware checking the permissions of the requests before
+    the application is called, whatever the framework.
+    The spec of each (HTTP method, path template) is indexed at startup
+    (see deny.ext.routes.RouteIndex), and the path params are passed
+    to the access methods according to the `params` of the spec.
+    The requests that are denied receive a 403 response.
+    The ability is built by `ability_factory` if given, otherwise the one
+    of the current context (see deny.context) is used. It is then stored in
+    the environ and set in the context while the application is called.
+
+    Example:
+
+        app.wsgi_app = AuthorizationMiddleware(
+            app.wsgi_app,
+            {("GET", "/projects/{id:int}"): all_of(
+                ProjectPermissions.view, params={"id": "project_id"}
+            )},
+            ability_factory=lambda environ: Ability(policy=UserPolicy()),
+        )
+    """
+
+    def __init__(
+        self,
+        app: WSGIApp,
+        routes: Dict[Tuple[str, str], SpecLike],
+        ability_factory: Optional[Callable[[Environ], Ability]] = None,
+        ability_key: str = "deny.ability",
+    ) -> None:
+        """
+        Args:
+            app (WSGIApp): the WSGI application
+            routes (Dict[Tuple[str, str], SpecLike]): spec of each HTTP method
+                (or "*") and path template
+            ability_factory (Optional[Callable[[Environ], Ability]]): function
+                building the ability of a request from its environ
+            ability_key (str): key storing the ability object in the environ
+        """
+        self._app = app
+        self._index = RouteIndex(routes)
+        self._ability_factory = ability_factory
+        self._ability_key = ability_key
+
+    def __call__(
+        self, environ: Environ, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        match = self._index.match(
+            environ["REQUEST_METHOD"], environ.get("PATH_INFO", "")
+        )
+        if match is None or not match[0].permissions:
+            return self._app(environ, start_response)
+
+        spec, params = match
+        ability = self._get_ability(environ)
+        try:
+            authorize_spec_sync(ability, spec, spec.get_kwargs(params, environ))
+        except UnauthorizedError:
+            start_response(
+                "403 Forbidden",
+                [
+                    ("Content-Type", "text/plain; charset=utf-8"),
+                    ("Content-Length", "9"),
+                ],
+            )
+            return [b"Forbidden"]
+
+        environ[self._ability_key] = ability
+        # the response may be generated lazily, after the context is reset:
+        # the application should use the ability of the environ in that case
+        with use_ability(ability):
+            return self._app(environ, start_response)
+
+    def _get_ability(self, environ: Environ) -> Ability:
+        # a variable left set in a reused thread or task never overrides
+        # the ability built for the request
+        if self._ability_factory is not None:
+            return self._ability_factory(environ)
+        ability: Optional[Ability] = get_current_ability()
+        if ability is None:
+            raise AbilityNotFound(
+                "Ability could not be found in the current context "
+                "and no ability_factory was given"
+            )
+        return ability
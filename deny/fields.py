@@ -0,0 +1,167 @@
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from deny.matrix import PermissionMatrix
+from deny.permission import Permission
+
+# permission(s) required to see a field, all of them if several are given,
+# None for a public field
+FieldRequirement = Union[None, Permission, Sequence[Permission]]
+
+
+class FieldProjection:
+    """Fields visible for a list of rows, stored as a bitmask per row:
+    the bit `i` of a mask is set if `fields[i]` is visible.
+    It is applied to the serialized rows without checking any permission.
+    """
+
+    def __init__(self, fields: Sequence[str], masks: List[int]) -> None:
+        """
+        Args:
+            fields (Sequence[str]): fields, in the order of the bits
+            masks (List[int]): bitmask of each row
+        """
+        self.fields = list(fields)
+        self.masks = masks
+        self._bits = {field: 1 << bit for bit, field in enumerate(fields)}
+        # visible fields of each distinct mask, rows usually sharing a few masks
+        self._visible: Dict[int, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def is_visible(self, index: int, field: str) -> bool:
+        """Returns True if a field is visible for a row.
+
+        Args:
+            index (int): index of the row
+            field (str): a field
+
+        Returns:
+            bool: True if the field is visible, False otherwise
+        """
+        return bool(self.masks[index] & self._bits.get(field, 0))
+
+    def visible(self, index: int) -> Tuple[str, ...]:
+        """Returns the fields visible for a row.
+
+        Args:
+            index (int): index of the row
+
+        Returns:
+            Tuple[str, ...]: visible fields, in the order of the schema
+        """
+        mask = self.masks[index]
+        fields = self._visible.get(mask)
+        if fields is None:
+            fields = self._visible[mask] = tuple(
+                field for bit, field in enumerate(self.fields) if mask & (1 << bit)
+            )
+        return fields
+
+    def apply(self, index: int, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """Returns the visible fields of a serialized row, the fields
+        that are not in the schema are removed.
+
+        Args:
+            index (int): index of the row
+            data (Mapping[str, Any]): serialized row
+
+        Returns:
+            Dict[str, Any]: visible fields and their value
+        """
+        return {field: data[field] for field in self.visible(index) if field in data}
+
+    def apply_all(self, rows: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """Applies the projection to all the serialized rows, in order.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): serialized rows
+
+        Returns:
+            List[Dict[str, Any]]: visible fields of each row
+        """
+        return [self.apply(index, data) for index, data in enumerate(rows)]
+
+
+class FieldSchema:
+    """Permissions required to see the fields of a serializer.
+    The permissions shared by several fields are checked once per row,
+    see Ability.visible_fields().
+
+    Example:
+
+        schema = FieldSchema({
+            "id": None,
+            "name": ProjectPermissions.view,
+            "budget": ProjectPermissions.view_billing,
+            "invoices": [ProjectPermissions.view_billing, ProjectPermissions.edit],
+        })
+    """
+
+    def __init__(self, fields: Mapping[str, FieldRequirement]) -> None:
+        """
+        Args:
+            fields (Mapping[str, FieldRequirement]): permissions required
+                by each field
+        """
+        self.fields = list(fields)
+        # distinct permissions, in the order of their first field
+        self.permissions: List[Permission] = []
+        bits: Dict[Permission, int] = {}
+        # bitmask of the permissions required by each field
+        self._required: List[int] = []
+        for requirement in fields.values():
+            required = 0
+            for permission in _to_permissions(requirement):
+                bit = bits.get(permission)
+                if bit is None:
+                    bit = bits[permission] = 1 << len(self.permissions)
+                    self.permissions.append(permission)
+                required |= bit
+            self._required.append(required)
+
+    def project(self, matrix: PermissionMatrix) -> FieldProjection:
+        """Returns the fields visible for each row, from the permissions
+        granted for the rows.
+
+        Args:
+            matrix (PermissionMatrix): permissions granted for each row,
+                checked for the permissions of the schema in the same order
+
+        Returns:
+            FieldProjection: visible fields of each row
+        """
+        field_masks: Dict[int, int] = {}
+        masks = []
+        for permission_mask in matrix.masks:
+            field_mask = field_masks.get(permission_mask)
+            if field_mask is None:
+                field_mask = field_masks[permission_mask] = self._get_field_mask(
+                    permission_mask
+                )
+            masks.append(field_mask)
+        return FieldProjection(self.fields, masks)
+
+    def _get_field_mask(self, permission_mask: int) -> int:
+        field_mask = 0
+        for bit, required in enumerate(self._required):
+            if (permission_mask & required) == required:
+                field_mask |= 1 << bit
+        return field_mask
+
+
+def _to_permissions(requirement: FieldRequirement) -> Sequence[Permission]:
+    if requirement is None:
+        return ()
+    if isinstance(requirement, Permission):
+        return (requirement,)
+    return requirement
@@ -0,0 +1,341 @@
+"""Read-only grant tables built once (ex: by the master process of a prefork
+server) and shared by the worker processes without being copied.
+
+A table is a flat binary file, mapped in memory by each worker: the pages
+are shared through the page cache, so placing the file on a tmpfs (ex: /dev/shm)
+keeps it in shared memory. It contains:
+
+    header: magic, version, counts, size of the names
+    names: the permission names then the role names, separated by newlines
+    role grants: a bitset of the permissions of each role
+    subject ids: sorted ids (unsigned 64 bits integers) of the subjects
+    subject grants: a bitset of the permissions of each subject
+
+The bitsets are arrays of native unsigned 64 bits words, read through
+memoryviews. New versions are published by replacing the file atomically,
+the tables already opened remaining valid.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from deny.permission import Permission
+
+MAGIC = b"DENYGT01"
+
+# magic, version, number of permissions, roles and subjects,
+# number of words of the bitsets, size of the names
+_HEADER = struct.Struct("=8sQIIIII4x")
+
+_WORD_SIZE = 8
+_WORD_BITS = 64
+_WORD_MASK = (1 << _WORD_BITS) - 1
+
+
+def build_grant_table(
+    permissions: Sequence[Permission],
+    roles: Mapping[str, Iterable[Permission]],
+    subjects: Mapping[int, Iterable[str]],
+    grants: Optional[Mapping[int, Iterable[Permission]]] = None,
+    version: int = 0,
+) -> bytes:
+    """Builds the binary content of a grant table.
+
+    Example:
+
+        data = build_grant_table(
+            [ProjectPermissions.view, ProjectPermissions.edit],
+            roles={"reader": [ProjectPermissions.view]},
+            subjects={1: ["reader"]},
+            grants={2: [ProjectPermissions.edit]},
+        )
+
+    Args:
+        permissions (Sequence[Permission]): permissions of the table
+        roles (Mapping[str, Iterable[Permission]]): permissions of each role
+        subjects (Mapping[int, Iterable[str]]): roles of each subject
+        grants (Optional[Mapping[int, Iterable[Permission]]]): permissions
+            granted directly to some subjects
+        version (int): version of the table
+
+    Returns:
+        bytes: content of the table
+    """
+    bits = {permission.name: bit for bit, permission in enumerate(permissions)}
+    words = max(1, -(-len(permissions) // _WORD_BITS))
+
+    role_masks: Dict[str, int] = {
+        role: _to_mask(bits, role_permissions)
+        for role, role_permissions in roles.items()
+    }
+    subject_masks: Dict[int, int] = {}
+    for subject_id, subject_roles in subjects.items():
+        mask = 0
+        for role in subject_roles:
+            mask |= role_masks[role]
+        subject_masks[subject_id] = mask
+    for subject_id, subject_permissions in (grants or {}).items():
+        subject_masks[subject_id] = subject_masks.get(subject_id, 0) | _to_mask(
+            bits, subject_permissions
+        )
+
+    names = [permission.name for permission in permissions] + list(role_masks)
+    if any("\n" in name for name in names):
+        raise ValueError("The permission and role names cannot contain newlines")
+    encoded_names = "\n".join(names).encode()
+
+    subject_ids = sorted(subject_masks)
+    role_words = array("Q")
+    for mask in role_masks.values():
+        role_words.extend(_to_words(mask, words))
+    subject_words = array("Q")
+    for subject_id in subject_ids:
+        subject_words.extend(_to_words(subject_masks[subject_id], words))
+
+    header = _HEADER.pack(
+        MAGIC,
+        version,
+        len(permissions),
+        len(role_masks),
+        len(subject_ids),
+        words,
+        len(encoded_names),
+    )
+    return b"".join(
+        [
+            header,
+            encoded_names,
+            _get_padding(len(encoded_names)),
+            role_words.tobytes(),
+            array("Q", subject_ids).tobytes(),
+            subject_words.tobytes(),
+        ]
+    )
+
+
+def publish_grant_table(data: bytes, path: str) -> None:
+    """Writes a grant table to a temporary file then replaces the file
+    atomically: the workers never read a partially written table.
+
+    Args:
+        data (bytes): content of the table (see build_grant_table())
+        path (str): path of the table
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class GrantTable:
+    """Reads a grant table from a buffer without copying it,
+    the names being the only values decoded when the table is opened.
+    """
+
+    __slots__ = (
+        "version",
+        "_mmap",
+        "_words",
+        "_permission_bits",
+        "_role_indexes",
+        "_role_grants",
+        "_subject_ids",
+        "_subject_grants",
+    )
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> None:
+        """
+        Args:
+            buffer (Union[bytes, bytearray, memoryview, mmap.mmap]): content
+                of the table (see build_grant_table())
+        """
+        view = memoryview(buffer).cast("B")
+        if len(view) < _HEADER.size:
+            raise ValueError("Invalid grant table")
+        (
+            magic,
+            version,
+            permissions_count,
+            roles_count,
+            subjects_count,
+            words,
+            names_size,
+        ) = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Invalid grant table")
+
+        offset = _HEADER.size
+        names_end = offset + names_size
+        words_offset = names_end + len(_get_padding(names_size))
+        words_count = (roles_count + subjects_count) * words + subjects_count
+        if words_offset + words_count * _WORD_SIZE > len(view):
+            raise ValueError("Invalid grant table")
+        names = bytes(view[offset:names_end]).decode().split("\n")
+        role_grants, offset = _cast_words(view, words_offset, roles_count * words)
+        subject_ids, offset = _cast_words(view, offset, subjects_count)
+        subject_grants, _ = _cast_words(view, offset, subjects_count * words)
+
+        self.version: int = version
+        self._mmap = buffer if isinstance(buffer, mmap.mmap) else None
+        self._words = words
+        self._permission_bits = {
+            name: bit for bit, name in enumerate(names[:permissions_count])
+        }
+        self._role_indexes = {
+            name: index
+            for index, name in enumerate(
+                names[permissions_count : permissions_count + roles_count]
+            )
+        }
+        self._role_grants = role_grants
+        self._subject_ids = subject_ids
+        self._subject_grants = subject_grants
+
+    @classmethod
+    def open(cls, path: str) -> "GrantTable":
+        """Maps a grant table file in memory, read-only.
+
+        Args:
+            path (str): path of the table
+
+        Returns:
+            GrantTable: the table
+        """
+        with open(path, "rb") as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def has(self, subject_id: int, permission: Permission) -> bool:
+        """Returns True if the permission is granted to the subject.
+
+        Args:
+            subject_id (int): id of the subject
+            permission (Permission): a permission
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+                (or if the subject or the permission is not in the table)
+        """
+        bit = self._permission_bits.get(permission.name)
+        if bit is None:
+            return False
+        subject_ids = self._subject_ids
+        index = bisect_left(subject_ids, subject_id)  # type: ignore
+        if index == len(subject_ids) or subject_ids[index] != subject_id:
+            return False
+        word = self._subject_grants[index * self._words + bit // _WORD_BITS]
+        return bool(word >> (bit % _WORD_BITS) & 1)
+
+    def role_has(self, role: str, permission: Permission) -> bool:
+        """Returns True if the permission is granted to the role.
+
+        Args:
+            role (str): name of the role
+            permission (Permission): a permission
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+                (or if the role or the permission is not in the table)
+        """
+        bit = self._permission_bits.get(permission.name)
+        index = self._role_indexes.get(role)
+        if bit is None or index is None:
+            return False
+        word = self._role_grants[index * self._words + bit // _WORD_BITS]
+        return bool(word >> (bit % _WORD_BITS) & 1)
+
+    def close(self) -> None:
+        """Releases the buffer of the table, it must not be used afterwards."""
+        self._role_grants.release()
+        self._subject_ids.release()
+        self._subject_grants.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+class GrantTableFile:
+    """Follows the versions of a grant table published to a file
+    (see publish_grant_table()).
+    The file is checked for a new version at most every check_interval seconds,
+    the previous table being released once it's no longer used.
+
+    Example:
+
+        grant_tables = GrantTableFile("/dev/shm/myapp-grants")
+
+        class UserPolicy(Policy):
+            @authorize(ProjectPermissions.edit)
+            def can_edit_project(self, project: Project) -> bool:
+                return grant_tables.get().has(self.user.id, ProjectPermissions.edit)
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0) -> None:
+        """
+        Args:
+            path (str): path of the table
+            check_interval (float): number of seconds between two checks
+                of the file
+        """
+        self._path = path
+        self._check_interval = check_interval
+        self._table: Optional[GrantTable] = None
+        self._file_id: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+
+    def get(self) -> GrantTable:
+        """Returns the latest version of the table, opened when needed.
+
+        Returns:
+            GrantTable: the table
+        """
+        now = time.monotonic()
+        if self._table is None or now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            stat = os.stat(self._path)
+            file_id = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+            if file_id != self._file_id or self._table is None:
+                self._table = GrantTable.open(self._path)
+                self._file_id = file_id
+        return self._table
+
+
+def _to_mask(bits: Dict[str, int], permissions: Iterable[Permission]) -> int:
+    mask = 0
+    for permission in permissions:
+        mask |= 1 << bits[permission.name]
+    return mask
+
+
+def _to_words(mask: int, words: int) -> List[int]:
+    return [(mask >> (index * _WORD_BITS)) & _WORD_MASK for index in range(words)]
+
+
+def _get_padding(size: int) -> bytes:
+    return bytes(-size % _WORD_SIZE)
+
+
+def _cast_words(view: memoryview, offset: int, count: int) -> Tuple[memoryview, int]:
+    end = offset + count * _WORD_SIZE
+    return view[offset:end].cast("Q"), end
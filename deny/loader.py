@@ -0,0 +1,207 @@
+import asyncio
+import inspect
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Sequence, Set, Union
+
+# function loading the values of a list of keys, returning
+# a list of values in the same order.
+BatchLoadFunction = Callable[
+    [List[Any]], Union[Awaitable[Sequence[Any]], Sequence[Any]]
+]
+SyncBatchLoadFunction = Callable[[List[Any]], Sequence[Any]]
+
+
+def _check_values(keys: List[Any], values: Sequence[Any]) -> None:
+    if len(values) != len(keys):
+        raise ValueError(
+            f"Batch load function returned {len(values)} values for {len(keys)} keys"
+        )
+
+
+class AsyncLoader:
+    """Loads values by key and keeps them for the lifetime of the loader
+    (the Ability, usually a request).
+    The keys requested during the same iteration of the event loop, for
+    example by checks running concurrently, are loaded with a single call
+    to the batch load function.
+    """
+
+    def __init__(self, batch_load: BatchLoadFunction) -> None:
+        """
+        Args:
+            batch_load (BatchLoadFunction): function loading a list of keys
+        """
+        self._batch_load = batch_load
+        self._values: Dict[Hashable, Any] = {}
+        self._pending: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._queue: List[Hashable] = []
+        self._tasks: Set["asyncio.Future[None]"] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """Returns the value of a key, loading it if needed.
+
+        Args:
+            key (Hashable): a key
+
+        Returns:
+            Any: value of the key
+        """
+        if key in self._values:
+            return self._values[key]
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                loop.call_soon(self._dispatch)
+        # a caller being cancelled must not cancel the load for the other ones
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Sequence[Hashable]) -> List[Any]:
+        """Returns the values of the keys, the missing ones being
+        loaded with a single call.
+
+        Args:
+            keys (Sequence[Hashable]): keys
+
+        Returns:
+            List[Any]: value of each key
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def load_now(self, key: Hashable) -> Any:
+        """Returns the value of a key that was already loaded (or primed).
+        Raises a KeyError if the value must be loaded.
+
+        Args:
+            key (Hashable): a key
+
+        Returns:
+            Any: value of the key
+        """
+        return self._values[key]
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Sets the value of a key, so it's not loaded
+        (ex: the handler already fetched it).
+
+        Args:
+            key (Hashable): a key
+            value (Any): value of the key
+        """
+        self._values[key] = value
+        future = self._pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(value)
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._load(keys))
+        # keep a reference on the task until it's done
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(partial(self._cancel_if_cancelled, keys))
+
+    def _cancel_if_cancelled(
+        self, keys: List[Hashable], task: "asyncio.Future[None]"
+    ) -> None:
+        # a task cancelled before it started does not run _load()
+        if task.cancelled():
+            self._cancel(keys)
+
+    def _cancel(self, keys: List[Hashable]) -> None:
+        # the load was cancelled (ex: the event loop is closing), the callers
+        # waiting for the keys are cancelled too and the keys loaded again later
+        for key in keys:
+            future = self._pending.pop(key, None)
+            if future is not None and not future.done():
+                future.cancel()
+
+    async def _load(self, keys: List[Hashable]) -> None:
+        try:
+            values = self._batch_load(keys)
+            if inspect.isawaitable(values):
+                values = await values
+            _check_values(keys, values)
+        except Exception as error:
+            for key in keys:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(error)
+            return
+        except BaseException:
+            self._cancel(keys)
+            raise
+
+        for key, value in zip(keys, values):
+            self._values.setdefault(key, value)
+            future = self._pending.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(self._values[key])
+
+
+class SyncLoader:
+    """Loads values by key and keeps them for the lifetime of the loader
+    (the Ability, usually a request).
+    """
+
+    def __init__(self, batch_load: SyncBatchLoadFunction) -> None:
+        """
+        Args:
+            batch_load (SyncBatchLoadFunction): function loading a list of keys
+        """
+        self._batch_load = batch_load
+        self._values: Dict[Hashable, Any] = {}
+
+    def load(self, key: Hashable) -> Any:
+        """Returns the value of a key, loading it if needed.
+
+        Args:
+            key (Hashable): a key
+
+        Returns:
+            Any: value of the key
+        """
+        if key not in self._values:
+            self.load_many([key])
+        return self._values[key]
+
+    def load_many(self, keys: Sequence[Hashable]) -> List[Any]:
+        """Returns the values of the keys, the missing ones being
+        loaded with a single call.
+
+        Args:
+            keys (Sequence[Hashable]): keys
+
+        Returns:
+            List[Any]: value of each key
+        """
+        missing = list(dict.fromkeys(key for key in keys if key not in self._values))
+        if missing:
+            values = self._batch_load(missing)
+            _check_values(missing, values)
+            self._values.update(zip(missing, values))
+        return [self._values[key] for key in keys]
+
+    def load_now(self, key: Hashable) -> Any:
+        """Same as load().
+
+        Args:
+            key (Hashable): a key
+
+        Returns:
+            Any: value of the key
+        """
+        return self.load(key)
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Sets the value of a key, so it's not loaded
+        (ex: the handler already fetched it).
+
+        Args:
+            key (Hashable): a key
+            value (Any): value of the key
+        """
+        self._values[key] = value
@@ -0,0 +1,103 @@
+import json
+from typing import Any, Dict, List, Sequence
+
+from deny.permission import Permission
+
+
+class PermissionMatrix:
+    """Permissions granted for a list of resources, stored as a bitmask
+    per resource: the bit `i` of a mask is set if `permissions[i]` is granted.
+    """
+
+    def __init__(self, permissions: Sequence[Permission], masks: List[int]) -> None:
+        """
+        Args:
+            permissions (Sequence[Permission]): permissions, in the order
+                of the bits
+            masks (List[int]): bitmask of each resource
+        """
+        self.permissions = list(permissions)
+        self.masks = masks
+        self._bits = {
+            permission: 1 << bit for bit, permission in enumerate(permissions)
+        }
+
+    def can(self, index: int, permission: Permission) -> bool:
+        """Returns True if the permission is granted for a resource.
+
+        Args:
+            index (int): index of the resource
+            permission (Permission): a permission
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+        """
+        return bool(self.masks[index] & self._bits.get(permission, 0))
+
+    def granted(self, index: int) -> List[Permission]:
+        """Returns the permissions granted for a resource.
+
+        Args:
+            index (int): index of the resource
+
+        Returns:
+            List[Permission]: granted permissions
+        """
+        mask = self.masks[index]
+        return [
+            permission
+            for bit, permission in enumerate(self.permissions)
+            if mask & (1 << bit)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: permission names and masks, ready to be sent as JSON
+        """
+        return {
+            "permissions": [permission.name for permission in self.permissions],
+            "masks": self.masks,
+        }
+
+    def to_json(self) -> str:
+        """
+        Returns:
+            str: compact JSON representation of to_dict()
+        """
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    def to_bytes(self) -> bytes:
+        """Packs the masks, each one using the same number of bytes
+        (little endian).
+
+        Returns:
+            bytes: packed masks
+        """
+        size = self._mask_size(len(self.permissions))
+        return b"".join(mask.to_bytes(size, "little") for mask in self.masks)
+
+    @classmethod
+    def from_bytes(
+        cls, permissions: Sequence[Permission], data: bytes
+    ) -> "PermissionMatrix":
+        """Unpacks masks packed by to_bytes().
+
+        Args:
+            permissions (Sequence[Permission]): permissions, in the order
+                of the bits
+            data (bytes): packed masks
+
+        Returns:
+            PermissionMatrix: matrix
+        """
+        size = cls._mask_size(len(permissions))
+        masks = [
+            int.from_bytes(data[start : start + size], "little")
+            for start in range(0, len(data), size)
+        ]
+        return cls(permissions, masks)
+
+    @staticmethod
+    def _mask_size(permissions_count: int) -> int:
+        return max(1, (permissions_count + 7) // 8)
@@ -0,0 +1,32 @@
+import math
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional, Sequence
+
+# function returning the rows of a paginated source,
+# it receives the offset and the maximum number of rows.
+FetchFunction = Callable[[int, int], Awaitable[Sequence[Any]]]
+SyncFetchFunction = Callable[[int, int], Sequence[Any]]
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    # offset of the next page, None once the source is exhausted
+    next_offset: Optional[int]
+
+
+def get_fetch_size(missing: int, seen: int, allowed: int, max_fetch_size: int) -> int:
+    """Returns the number of rows to fetch in order to get the missing items,
+    based on the ratio of allowed rows observed so far.
+
+    Args:
+        missing (int): number of items missing in the page
+        seen (int): number of rows checked so far
+        allowed (int): number of rows allowed so far
+        max_fetch_size (int): maximum number of rows fetched at once
+
+    Returns:
+        int: number of rows to fetch
+    """
+    # smoothed so a first chunk without any allowed row does not
+    # make the ratio null
+    allowed_ratio = (allowed + 1) / (seen + 1)
+    return max(1, min(max_fetch_size, math.ceil(missing / allowed_ratio)))
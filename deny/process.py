@@ -0,0 +1,162 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, repeat
+from multiprocessing.context import BaseContext
+from typing import Any, Dict, List, Optional, Tuple
+
+from deny._sync.ability import Ability
+from deny._sync.policy import Policy
+from deny.loader import SyncBatchLoadFunction
+from deny.permission import Permission
+from deny.utils import SyncAccessMethod, SyncBatchAccessMethod
+
+# policy unpickled once by each worker process, and its permissions by name
+_worker_policy: Optional[Policy] = None
+_worker_permissions: Dict[str, Permission] = {}
+
+
+class ProcessPolicy(Policy):
+    """Policy running the batch checks of a synchronous policy across
+    a pool of processes, for access methods doing CPU-bound work.
+    The policy is pickled once and sent to each worker when it starts,
+    the permissions are then sent by name and the objects by chunks.
+    The policy, the objects and the arguments of the access methods must be
+    picklable, and the policy class importable by the workers.
+    Single checks (`Ability.can()`) are still made in the current process.
+
+    Example:
+
+        policy = ProcessPolicy(UserPolicy(user), max_workers=8)
+        ability = Ability(policy=policy)
+        ability.can_many(ProjectPermissions.view, projects)
+    """
+
+    def __init__(
+        self,
+        policy: Policy,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 1000,
+        mp_context: Optional[BaseContext] = None,
+    ) -> None:
+        """
+        Args:
+            policy (Policy): synchronous policy whose batch checks are run
+                in the worker processes
+            max_workers (Optional[int]): number of worker processes,
+                by default the number of CPUs
+            chunk_size (int): maximum number of objects sent to a worker at once
+            mp_context (Optional[BaseContext]): multiprocessing context used
+                to start the workers
+        """
+        self._policy = policy
+        self._chunk_size = chunk_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(pickle.dumps(policy),),
+        )
+        self._access_methods = policy._access_methods
+        self._sync_access_methods = policy._sync_access_methods
+        self._batch_access_methods = policy._batch_access_methods
+        self._sync_batch_access_methods = policy._sync_batch_access_methods
+        self._loaders = policy._loaders
+        self._dependencies = policy._dependencies
+
+    def get_access_method(self, permission: Permission) -> SyncAccessMethod:
+        """Returns the access method of the wrapped policy.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            AccessMethod: access method registered for permission
+        """
+        return self._policy.get_access_method(permission)
+
+    def get_batch_access_method(
+        self, permission: Permission
+    ) -> Optional[SyncBatchAccessMethod]:
+        """Returns a function checking the objects by chunks
+        in the worker processes.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            Optional[SyncBatchAccessMethod]: batch access method for permission,
+                None if the permission is not set in the policy
+        """
+        if (
+            permission not in self._access_methods
+            and permission not in self._batch_access_methods
+        ):
+            return None
+        return partial(self._run, permission)
+
+    def get_loader_function(self, name: str) -> SyncBatchLoadFunction:
+        """Returns the loader of the wrapped policy.
+
+        Args:
+            name (str): loader name
+
+        Returns:
+            BatchLoadFunction: method loading the values
+        """
+        return self._policy.get_loader_function(name)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down the worker processes.
+
+        Args:
+            wait (bool): wait for the pending chunks to be checked
+        """
+        self._executor.shutdown(wait=wait)
+
+    def _run(
+        self, permission: Permission, objects: List[Any], *args: Any, **kwargs: Any
+    ) -> List[bool]:
+        """Checks the objects by chunks in the worker processes.
+
+        Args:
+            permission (Permission): a permission
+            objects (List[Any]): objects the permission is checked for
+            args (Any): arguments passed to the policy access method
+            kwargs (Any): keyword argumentss passed to the policy access method
+
+        Returns:
+            List[bool]: result of the check for each object
+        """
+        chunks = [
+            objects[start : start + self._chunk_size]
+            for start in range(0, len(objects), self._chunk_size)
+        ]
+        results = self._executor.map(
+            _check_chunk, repeat(permission.name), chunks, repeat(args), repeat(kwargs)
+        )
+        return list(chain.from_iterable(results))
+
+
+def _init_worker(pickled_policy: bytes) -> None:
+    global _worker_policy, _worker_permissions
+    _worker_policy = pickle.loads(pickled_policy)
+    _worker_permissions = {
+        permission.name: permission
+        for permission in chain(
+            _worker_policy._access_methods, _worker_policy._batch_access_methods
+        )
+    }
+
+
+def _check_chunk(
+    permission_name: str,
+    objects: List[Any],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> List[bool]:
+    # a new ability per chunk, so the loaded values do not pile up in the worker
+    ability = Ability(policy=_worker_policy)
+    return ability.can_many(
+        _worker_permissions[permission_name], objects, *args, **kwargs
+    )
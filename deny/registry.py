@@ -0,0 +1,350 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from deny._async.ability import Ability
+from deny._async.policy import Policy
+from deny._sync.ability import Ability as SyncAbility
+from deny._sync.policy import Policy as SyncPolicy
+from deny.singleflight import AsyncSingleFlight, SyncSingleFlight
+
+# returns the number of bytes used by a policy (ex: estimated from its rules)
+SizeFunction = Callable[[Any], int]
+
+
+class RegistryStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    # number of policies compiled and total number of seconds spent compiling
+    compilations: int
+    compile_time: float
+    # number of policies cached and their size (0 if not measured)
+    size: int
+    memory: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _PolicyCache:
+    """LRU of the compiled policies, bounded by the number of policies
+    and optionally by their total size.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_memory: Optional[int],
+        get_size: Optional[SizeFunction],
+    ) -> None:
+        if max_memory is not None and get_size is None:
+            raise ValueError("get_size is required to bound the memory")
+        self._max_size = max_size
+        self._max_memory = max_memory
+        self._get_size = get_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._memory = 0
+        # bumped when a policy is removed, so the compilations started
+        # before are not cached (the number of clears for all the keys),
+        # only kept while callers wait for a compilation of the key
+        self._generations: Dict[Hashable, int] = {}
+        self._waiting: Dict[Hashable, int] = {}
+        self._clears = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._compilations = 0
+        self._compile_time = 0.0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def begin_compilation(self, key: Hashable) -> Tuple[int, int]:
+        with self._lock:
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            return self._clears, self._generations.get(key, 0)
+
+    def end_compilation(self, key: Hashable) -> None:
+        with self._lock:
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+                self._generations.pop(key, None)
+
+    def put(
+        self,
+        key: Hashable,
+        policy: Any,
+        compile_time: float,
+        generation: Tuple[int, int],
+    ) -> None:
+        size = self._get_size(policy) if self._get_size is not None else 0
+        with self._lock:
+            self._compilations += 1
+            self._compile_time += compile_time
+            # removed while it was compiled, the policy may be stale
+            if generation != (self._clears, self._generations.get(key, 0)):
+                return
+            self._remove(key)
+            self._entries[key] = (policy, size)
+            self._memory += size
+            # the policy is still returned when it's too large to be cached
+            while self._entries and (
+                len(self._entries) > self._max_size
+                or (self._max_memory is not None and self._memory > self._max_memory)
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._memory -= evicted_size
+                self._evictions += 1
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            # no compilation of the key can be stale otherwise
+            if key in self._waiting:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clears += 1
+            self._generations.clear()
+            self._entries.clear()
+            self._memory = 0
+
+    def stats(self) -> RegistryStats:
+        with self._lock:
+            return RegistryStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                compilations=self._compilations,
+                compile_time=self._compile_time,
+                size=len(self._entries),
+                memory=self._memory,
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._memory -= entry[1]
+
+
+class AsyncPolicyRegistry:
+    """Registry of the policies of the tenants, each policy being compiled
+    the first time the tenant is seen (ex: by creating a Policy subclass
+    from the rules of the tenant) and kept in an LRU.
+    Concurrent requests of a tenant that is not cached wait for a single
+    compilation, and the policies of the cold tenants are evicted
+    so they can be garbage collected.
+    It must be shared by the requests running in the same event loop.
+
+    Example:
+
+        registry = AsyncPolicyRegistry(compile_tenant_policy, max_size=500)
+        ability = await registry.ability(request.tenant_id)
+    """
+
+    def __init__(
+        self,
+        compile_policy: Callable[[Hashable], Awaitable[Policy]],
+        max_size: int = 1024,
+        max_memory: Optional[int] = None,
+        get_size: Optional[SizeFunction] = None,
+    ) -> None:
+        """
+        Args:
+            compile_policy (Callable[[Hashable], Awaitable[Policy]]): coroutine
+                function returning the policy of a tenant
+            max_size (int): maximum number of policies cached
+            max_memory (Optional[int]): maximum number of bytes used by
+                the policies cached, measured with get_size
+            get_size (Optional[SizeFunction]): function returning the number
+                of bytes used by a policy
+        """
+        self._compile_policy = compile_policy
+        self._cache = _PolicyCache(max_size, max_memory, get_size)
+        self._single_flight = AsyncSingleFlight()
+
+    async def get(self, tenant: Hashable) -> Policy:
+        """Returns the policy of a tenant, compiled if not cached.
+
+        Args:
+            tenant (Hashable): key of the tenant
+
+        Returns:
+            Policy: policy of the tenant
+        """
+        policy: Optional[Policy] = self._cache.get(tenant)
+        if policy is not None:
+            return policy
+        # the callers arriving after an invalidation don't wait for
+        # the compilation started before
+        generation = self._cache.begin_compilation(tenant)
+        try:
+            return await self._single_flight.run(
+                (tenant, generation), partial(self._compile, tenant, generation)
+            )
+        finally:
+            self._cache.end_compilation(tenant)
+
+    async def ability(self, tenant: Hashable, **kwargs: Any) -> Ability:
+        """Returns an ability checking the policy of a tenant.
+
+        Args:
+            tenant (Hashable): key of the tenant
+            kwargs (Any): keyword arguments passed to the Ability
+
+        Returns:
+            Ability: the ability
+        """
+        return Ability(policy=await self.get(tenant), **kwargs)
+
+    def invalidate(self, tenant: Hashable) -> None:
+        """Removes the policy of a tenant, compiled again when needed
+        (ex: after the rules of the tenant changed).
+
+        Args:
+            tenant (Hashable): key of the tenant
+        """
+        self._cache.remove(tenant)
+
+    def clear(self) -> None:
+        """Removes all the policies."""
+        self._cache.clear()
+
+    def stats(self) -> RegistryStats:
+        """
+        Returns:
+            RegistryStats: metrics of the registry
+        """
+        return self._cache.stats()
+
+    async def _compile(self, tenant: Hashable, generation: Tuple[int, int]) -> Policy:
+        # compiled by a flight that ended since the lookup
+        policy = self._cache.peek(tenant)
+        if policy is not None:
+            return policy
+        start = time.perf_counter()
+        policy = await self._compile_policy(tenant)
+        self._cache.put(tenant, policy, time.perf_counter() - start, generation)
+        return policy
+
+
+class SyncPolicyRegistry:
+    """Synchronous version of AsyncPolicyRegistry, it can be shared
+    by several threads.
+
+    Example:
+
+        registry = SyncPolicyRegistry(compile_tenant_policy, max_size=500)
+        ability = registry.ability(request.tenant_id)
+    """
+
+    def __init__(
+        self,
+        compile_policy: Callable[[Hashable], SyncPolicy],
+        max_size: int = 1024,
+        max_memory: Optional[int] = None,
+        get_size: Optional[SizeFunction] = None,
+    ) -> None:
+        """
+        Args:
+            compile_policy (Callable[[Hashable], SyncPolicy]): function
+                returning the policy of a tenant
+            max_size (int): maximum number of policies cached
+            max_memory (Optional[int]): maximum number of bytes used by
+                the policies cached, measured with get_size
+            get_size (Optional[SizeFunction]): function returning the number
+                of bytes used by a policy
+        """
+        self._compile_policy = compile_policy
+        self._cache = _PolicyCache(max_size, max_memory, get_size)
+        self._single_flight = SyncSingleFlight()
+
+    def get(self, tenant: Hashable) -> SyncPolicy:
+        """Returns the policy of a tenant, compiled if not cached.
+
+        Args:
+            tenant (Hashable): key of the tenant
+
+        Returns:
+            SyncPolicy: policy of the tenant
+        """
+        policy: Optional[SyncPolicy] = self._cache.get(tenant)
+        if policy is not None:
+            return policy
+        generation = self._cache.begin_compilation(tenant)
+        try:
+            return self._single_flight.run(
+                (tenant, generation), partial(self._compile, tenant, generation)
+            )
+        finally:
+            self._cache.end_compilation(tenant)
+
+    def ability(self, tenant: Hashable, **kwargs: Any) -> SyncAbility:
+        """Returns an ability checking the policy of a tenant.
+
+        Args:
+            tenant (Hashable): key of the tenant
+            kwargs (Any): keyword arguments passed to the Ability
+
+        Returns:
+            SyncAbility: the ability
+        """
+        return SyncAbility(policy=self.get(tenant), **kwargs)
+
+    def invalidate(self, tenant: Hashable) -> None:
+        """Removes the policy of a tenant, compiled again when needed
+        (ex: after the rules of the tenant changed).
+
+        Args:
+            tenant (Hashable): key of the tenant
+        """
+        self._cache.remove(tenant)
+
+    def clear(self) -> None:
+        """Removes all the policies."""
+        self._cache.clear()
+
+    def stats(self) -> RegistryStats:
+        """
+        Returns:
+            RegistryStats: metrics of the registry
+        """
+        return self._cache.stats()
+
+    def _compile(self, tenant: Hashable, generation: Tuple[int, int]) -> SyncPolicy:
+        policy = self._cache.peek(tenant)
+        if policy is not None:
+            return policy
+        start = time.perf_counter()
+        policy = self._compile_policy(tenant)
+        self._cache.put(tenant, policy, time.perf_counter() - start, generation)
+        return policy
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import importlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from multiprocessing.context import BaseContext
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from deny._async.ability import Ability
+from deny._sync.ability import Ability as SyncAbility
+from deny._sync.policy import Policy as SyncPolicy
+from deny.action import Action
+from deny.permission import Permission
+from deny.trace import TraceRecord, read_trace
+
+# returns the policy (asynchronous or synchronous) of a recorded context
+PolicyFactory = Callable[[Hashable], Any]
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+# function building the policies and default action of the abilities,
+# set once in each worker process
+_worker_build_policy: Optional[PolicyFactory] = None
+_worker_default_action = Action.DENY
+
+
+class ChangedDecision(NamedTuple):
+    # index of the record in the trace
+    position: int
+    record: TraceRecord
+    allowed: bool
+
+
+class ReplayReport(NamedTuple):
+    checks: int
+    # number of seconds the replay took
+    seconds: float
+    # sorted durations of the checks, replayed and recorded
+    latencies: List[float]
+    recorded_latencies: List[float]
+    changed: List[ChangedDecision]
+
+    @property
+    def throughput(self) -> float:
+        return self.checks / self.seconds if self.seconds else 0.0
+
+    def percentile(self, ratio: float, recorded: bool = False) -> float:
+        """
+        Args:
+            ratio (float): ratio of the checks faster than the percentile
+            recorded (bool): use the durations of the trace
+
+        Returns:
+            float: duration in seconds, 0 if there are no checks
+        """
+        latencies = self.recorded_latencies if recorded else self.latencies
+        if not latencies:
+            return 0.0
+        return latencies[min(int(ratio * len(latencies)), len(latencies) - 1)]
+
+
+def replay_trace(
+    path: str,
+    build_policy: PolicyFactory,
+    workers: int = 1,
+    chunk_size: int = 1000,
+    mp_context: Optional[BaseContext] = None,
+    default_action: Action = Action.DENY,
+) -> ReplayReport:
+    """Checks again the decisions of a trace with the policies built by
+    build_policy (ex: the next version of the policies), measuring their
+    latency and comparing their decisions with the recorded ones.
+    Each decision is checked by a new ability, and the policy of each
+    context is built once (by each worker). The permissions only set with
+    a batch access method are checked with can_many() for the recorded object.
+    With several workers, the records are checked by chunks in a pool
+    of processes, build_policy must then be importable by the workers.
+    It must be called outside of an event loop.
+
+    Args:
+        path (str): path of the trace file
+        build_policy (PolicyFactory): function returning the policy
+            of a context recorded in the trace
+        workers (int): number of worker processes, 1 checks the records
+            in the current process
+        chunk_size (int): number of records sent to a worker at once
+        mp_context (Optional[BaseContext]): multiprocessing context used
+            to start the workers
+        default_action (Action): default action of the abilities, the same
+            as the abilities that recorded the trace
+
+    Returns:
+        ReplayReport: latencies and changed decisions
+    """
+    records = list(read_trace(path))
+    start = time.perf_counter()
+    if workers <= 1:
+        results = asyncio.run(_replay_records(build_policy, default_action, records))
+    else:
+        chunks = [
+            records[index : index + chunk_size]
+            for index in range(0, len(records), chunk_size)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(build_policy, default_action),
+        ) as executor:
+            results = list(chain.from_iterable(executor.map(_replay_chunk, chunks)))
+    seconds = time.perf_counter() - start
+
+    return ReplayReport(
+        checks=len(records),
+        seconds=seconds,
+        latencies=sorted(duration for _, duration in results),
+        recorded_latencies=sorted(record.duration for record in records),
+        changed=[
+            ChangedDecision(index, record, allowed)
+            for index, (record, (allowed, _)) in enumerate(zip(records, results))
+            if allowed != record.allowed
+        ],
+    )
+
+
+def format_report(report: ReplayReport, max_changes: int = 20) -> str:
+    """
+    Args:
+        report (ReplayReport): a report
+        max_changes (int): maximum number of changed decisions listed
+
+    Returns:
+        str: human readable report
+    """
+    lines = [
+        f"checks: {report.checks} in {report.seconds:.3f}s"
+        f" ({report.throughput:.0f} checks/s)",
+        "latency (µs): replayed / recorded",
+    ]
+    for ratio in PERCENTILES:
+        lines.append(
+            f"  p{ratio * 100:g}: {report.percentile(ratio) * 1e6:.1f}"
+            f" / {report.percentile(ratio, recorded=True) * 1e6:.1f}"
+        )
+    lines.append(f"changed decisions: {len(report.changed)}")
+    for change in report.changed[:max_changes]:
+        record = change.record
+        lines.append(
+            f"  #{change.position} {record.permission} context={record.context!r}"
+            f" args={record.args!r} kwargs={record.kwargs!r}:"
+            f" {_format_decision(record.allowed)} -> {_format_decision(change.allowed)}"
+        )
+    if len(report.changed) > max_changes:
+        lines.append(f"  ... {len(report.changed) - max_changes} more")
+    return "\n".join(lines)
+
+
+async def _replay_records(
+    build_policy: PolicyFactory,
+    default_action: Action,
+    records: Sequence[TraceRecord],
+) -> List[Tuple[bool, float]]:
+    # policy of each context and its permissions by name
+    policies: Dict[Hashable, Tuple[Any, Dict[str, Permission]]] = {}
+    results: List[Tuple[bool, float]] = []
+    for record in records:
+        entry = policies.get(record.context)
+        if entry is None:
+            policy = build_policy(record.context)
+            entry = policies[record.context] = (
+                policy,
+                {
+                    permission.name: permission
+                    for permission in chain(
+                        policy._access_methods, policy._batch_access_methods
+                    )
+                },
+            )
+        policy, permissions = entry
+        # permissions not set on the policy are checked with the default action
+        permission = permissions.get(record.permission) or Permission(record.permission)
+        # recorded by can_many() (ex: in permissions_for()), the object being
+        # the first argument
+        is_batch = (
+            bool(record.args)
+            and permission in policy._batch_access_methods
+            and permission not in policy._access_methods
+        )
+        args, kwargs = record.args, record.kwargs
+
+        if isinstance(policy, SyncPolicy):
+            sync_ability = SyncAbility(policy=policy, default_action=default_action)
+            start = time.perf_counter()
+            if is_batch:
+                allowed = sync_ability.can_many(
+                    permission, [args[0]], *args[1:], **kwargs
+                )[0]
+            else:
+                allowed = sync_ability.can(permission, *args, **kwargs)
+        else:
+            ability = Ability(policy=policy, default_action=default_action)
+            start = time.perf_counter()
+            if is_batch:
+                allowed = (
+                    await ability.can_many(permission, [args[0]], *args[1:], **kwargs)
+                )[0]
+            else:
+                allowed = await ability.can(permission, *args, **kwargs)
+        results.append((allowed, time.perf_counter() - start))
+    return results
+
+
+def _init_worker(build_policy: PolicyFactory, default_action: Action) -> None:
+    global _worker_build_policy, _worker_default_action
+    _worker_build_policy = build_policy
+    _worker_default_action = default_action
+
+
+def _replay_chunk(records: List[TraceRecord]) -> List[Tuple[bool, float]]:
+    assert _worker_build_policy is not None
+    return asyncio.run(
+        _replay_records(_worker_build_policy, _worker_default_action, records)
+    )
+
+
+def _format_decision(allowed: bool) -> str:
+    return "allowed" if allowed else "denied"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m deny.replay",
+        description="Replays a trace of decisions against policies.",
+    )
+    parser.add_argument("trace", help="path of the trace file")
+    parser.add_argument(
+        "build_policy",
+        help="module:attribute of the function building the policy of a context",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--max-changes", type=int, default=20)
+    parser.add_argument(
+        "--default-action",
+        choices=[Action.DENY.value, Action.ALLOW.value],
+        default=Action.DENY.value,
+        help="default action of the abilities that recorded the trace",
+    )
+    args = parser.parse_args(argv)
+
+    module_name, _, attribute = args.build_policy.partition(":")
+    build_policy = getattr(importlib.import_module(module_name), attribute)
+    report = replay_trace(
+        args.trace,
+        build_policy,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        default_action=Action(args.default_action),
+    )
+    print(format_report(report, max_changes=args.max_changes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,836 @@
+"""Serves the checks of policies loaded once per host over a Unix domain socket,
+so the worker processes do not hold their own copy of the policies and caches.
+
+Each frame is a header (request id, operation or status, payload size)
+followed by the payload encoded with marshal: the arguments of the access
+methods must be builtin values (ex: ids), the policies being shared by all
+the clients. The requests are sent by name: the policy as registered in the
+server, the permission as Permission.name.
+
+Run a server with : `python -m deny.sidecar /run/deny.sock myapp.policies:POLICIES`
+"""
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import marshal
+import os
+import socket
+import struct
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+
+from deny._async.ability import Ability
+from deny._async.policy import Policy
+from deny._sync.policy import Policy as SyncPolicy
+from deny.errors import SidecarError, UndefinedPermission
+from deny.permission import Permission
+from deny.utils import (
+    AccessMethod,
+    BatchAccessMethod,
+    SyncAccessMethod,
+    SyncBatchAccessMethod,
+)
+
+_HEADER = struct.Struct("!IBI")
+
+# operations of the requests
+CHECK = 1
+CHECK_MANY = 2
+
+# statuses of the responses, the payload of an error is its message
+OK = 0
+ERROR = 1
+
+# frames announcing a larger payload close the connection
+MAX_PAYLOAD_SIZE = 16 * 1024 * 1024
+
+_REQUEST_IDS_MODULO = 2**32
+
+
+def _encode_frame(request_id: int, code: int, payload: bytes) -> bytes:
+    return _HEADER.pack(request_id, code, len(payload)) + payload
+
+
+class _Request(NamedTuple):
+    writer: asyncio.StreamWriter
+    request_id: int
+    operation: int
+    policy_name: str
+    permission_name: str
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+
+
+class SidecarServer:
+    """Server checking the permissions of the policies it holds for the
+    clients connected to its Unix domain socket.
+    The single checks received within the batch window are coalesced: the ones
+    made with the same permission and the same arguments but the first one
+    are evaluated together with Ability.can_many(), using the batch access
+    method of the policy when it is defined.
+
+    Example:
+
+        server = SidecarServer({"UserPolicy": UserPolicy()})
+        await server.start("/run/deny.sock")
+        await server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        policies: Dict[str, Policy],
+        batch_window: float = 0.0,
+        max_batch_size: int = 1024,
+    ) -> None:
+        """
+        Args:
+            policies (Dict[str, Policy]): policies served by name
+            batch_window (float): number of seconds the requests are collected
+                before being evaluated, by default the requests received in the
+                same iteration of the event loop are evaluated together
+            max_batch_size (int): number of requests evaluated without waiting
+                for the end of the batch window
+        """
+        self._policies = policies
+        self._permissions: Dict[str, Dict[str, Permission]] = {
+            name: {
+                permission.name: permission
+                for permission in itertools.chain(
+                    policy._access_methods, policy._batch_access_methods
+                )
+            }
+            for name, policy in policies.items()
+        }
+        self._batch_window = batch_window
+        self._max_batch_size = max_batch_size
+        self._pending: List[_Request] = []
+        # set when the pending requests reach max_batch_size
+        self._batch_full: Optional["asyncio.Future[None]"] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, "asyncio.Task[None]"] = {}
+        self._batches: Set["asyncio.Task[None]"] = set()
+
+    async def start(self, path: str) -> None:
+        """Starts listening on the socket, only the current user can connect to it.
+
+        Args:
+            path (str): path of the Unix domain socket
+        """
+        # the socket is created without access for the other users, instead of
+        # being restricted once another user could already have connected
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path
+            )
+        finally:
+            os.umask(umask)
+
+    async def serve_forever(self) -> None:
+        """Serves the requests until the server is closed."""
+        if self._server is None:
+            raise RuntimeError("The server must be started first")
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stops listening, waits for the pending requests to be evaluated,
+        then closes the connections.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await asyncio.gather(*self._batches, return_exceptions=True)
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._connections[writer] = asyncio.current_task()  # type: ignore
+        try:
+            while True:
+                request_id, operation, size = _HEADER.unpack(
+                    await reader.readexactly(_HEADER.size)
+                )
+                if size > MAX_PAYLOAD_SIZE:
+                    break
+                payload = await reader.readexactly(size)
+                try:
+                    policy_name, permission_name, args, kwargs = marshal.loads(payload)
+                except (EOFError, ValueError, TypeError):
+                    break
+                request = _Request(
+                    writer,
+                    request_id,
+                    operation,
+                    policy_name,
+                    permission_name,
+                    args,
+                    kwargs,
+                )
+                if _is_valid(request):
+                    self._enqueue(request)
+                else:
+                    _respond(request, ERROR, "ValueError: Invalid request")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self._connections[writer]
+            writer.close()
+
+    def _enqueue(self, request: _Request) -> None:
+        self._pending.append(request)
+        if self._batch_full is None:
+            # the batch is evaluated by a task starting after the requests
+            # already received are enqueued (at the next loop iteration)
+            self._batch_full = asyncio.get_running_loop().create_future()
+            batch = asyncio.ensure_future(self._evaluate_pending(self._batch_full))
+            self._batches.add(batch)
+            batch.add_done_callback(self._batches.discard)
+        elif len(self._pending) >= self._max_batch_size and not self._batch_full.done():
+            self._batch_full.set_result(None)
+
+    async def _evaluate_pending(self, batch_full: "asyncio.Future[None]") -> None:
+        if self._batch_window > 0 and not batch_full.done():
+            await asyncio.wait([batch_full], timeout=self._batch_window)
+        requests, self._pending = self._pending, []
+        self._batch_full = None
+        await self._evaluate(requests)
+
+    async def _evaluate(self, requests: List[_Request]) -> None:
+        # an ability per policy, so the loaded values are shared by the batch
+        abilities: Dict[str, Ability] = {}
+        groups: Dict[Hashable, List[_Request]] = {}
+        evaluations: List[Awaitable[None]] = []
+        for request in requests:
+            if request.operation == CHECK and request.args:
+                try:
+                    key = (
+                        request.policy_name,
+                        request.permission_name,
+                        marshal.dumps((request.args[1:], request.kwargs)),
+                    )
+                except Exception as error:
+                    _respond(request, ERROR, _get_message(error))
+                    continue
+                groups.setdefault(key, []).append(request)
+            else:
+                evaluations.append(self._evaluate_request(abilities, request))
+        evaluations.extend(
+            self._evaluate_group(abilities, group) for group in groups.values()
+        )
+        if len(evaluations) == 1:
+            await evaluations[0]
+        else:
+            await asyncio.gather(*evaluations)
+
+        for writer in {request.writer for request in requests}:
+            if not writer.is_closing():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+    async def _evaluate_group(
+        self, abilities: Dict[str, Ability], requests: List[_Request]
+    ) -> None:
+        first = requests[0]
+        try:
+            ability, permission = self._resolve(abilities, first)
+            results = await ability.can_many(
+                permission,
+                [request.args[0] for request in requests],
+                *first.args[1:],
+                **first.kwargs,
+            )
+        except Exception as error:
+            for request in requests:
+                _respond(request, ERROR, _get_message(error))
+            return
+        for index, request in enumerate(requests):
+            if index < len(results):
+                _respond(request, OK, bool(results[index]))
+            else:
+                # every request is answered, even if the batch access method
+                # returned too few results
+                _respond(
+                    request,
+                    ERROR,
+                    f"ValueError: {len(results)} results for {len(requests)} objects",
+                )
+
+    async def _evaluate_request(
+        self, abilities: Dict[str, Ability], request: _Request
+    ) -> None:
+        try:
+            ability, permission = self._resolve(abilities, request)
+            if request.operation == CHECK:
+                result: Any = bool(
+                    await ability.can(permission, *request.args, **request.kwargs)
+                )
+            elif request.operation == CHECK_MANY:
+                results = await ability.can_many(
+                    permission, *request.args, **request.kwargs
+                )
+                result = [bool(result) for result in results]
+            else:
+                raise ValueError(f"Unknown operation {request.operation}")
+        except Exception as error:
+            _respond(request, ERROR, _get_message(error))
+        else:
+            _respond(request, OK, result)
+
+    def _resolve(
+        self, abilities: Dict[str, Ability], request: _Request
+    ) -> Tuple[Ability, Permission]:
+        permissions = self._permissions.get(request.policy_name)
+        if permissions is None:
+            raise SidecarError(f"Policy {request.policy_name} is not served")
+        permission = permissions.get(request.permission_name)
+        if permission is None:
+            raise UndefinedPermission(Permission(request.permission_name))
+        ability = abilities.get(request.policy_name)
+        if ability is None:
+            ability = abilities[request.policy_name] = Ability(
+                policy=self._policies[request.policy_name]
+            )
+        return ability, permission
+
+
+def _respond(request: _Request, status: int, value: Any) -> None:
+    if not request.writer.is_closing():
+        request.writer.write(
+            _encode_frame(request.request_id, status, marshal.dumps(value))
+        )
+
+
+def _is_valid(request: _Request) -> bool:
+    return (
+        isinstance(request.policy_name, str)
+        and isinstance(request.permission_name, str)
+        and isinstance(request.args, (tuple, list))
+        and isinstance(request.kwargs, dict)
+        and all(isinstance(name, str) for name in request.kwargs)
+    )
+
+
+def _get_message(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+class _AsyncConnection:
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writer = writer
+        self._request_ids = itertools.count()
+        self._futures: Dict[int, "asyncio.Future[Any]"] = {}
+        # frames of the current loop iteration, written at once
+        self._frames: List[bytes] = []
+        self._reader_task = asyncio.ensure_future(self._read_responses(reader))
+
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+
+    async def request(self, operation: int, payload: bytes) -> Any:
+        # the requests are pipelined, the responses are matched by request id
+        if self.closed:
+            raise SidecarError("Connection to the sidecar was closed")
+        request_id = next(self._request_ids) % _REQUEST_IDS_MODULO
+        future = asyncio.get_running_loop().create_future()
+        self._futures[request_id] = future
+        if not self._frames:
+            asyncio.get_running_loop().call_soon(self._write_frames)
+        self._frames.append(_encode_frame(request_id, operation, payload))
+        try:
+            return await future
+        finally:
+            self._futures.pop(request_id, None)
+
+    def close(self) -> None:
+        self._reader_task.cancel()
+        self._writer.close()
+
+    def _write_frames(self) -> None:
+        frames, self._frames = self._frames, []
+        if not self._writer.is_closing():
+            self._writer.write(b"".join(frames))
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                request_id, status, size = _HEADER.unpack(
+                    await reader.readexactly(_HEADER.size)
+                )
+                value = marshal.loads(await reader.readexactly(size))
+                future = self._futures.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == OK:
+                    future.set_result(value)
+                else:
+                    future.set_exception(SidecarError(value))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(
+                        SidecarError("Connection to the sidecar was closed")
+                    )
+            self._futures.clear()
+            self._writer.close()
+
+
+class AsyncSidecarClient:
+    """Client of a SidecarServer, it can be shared by the coroutines
+    running in the same event loop.
+    The requests are spread over a pool of connections opened when needed,
+    several requests being sent on a connection without waiting
+    for the previous responses.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4) -> None:
+        """
+        Args:
+            path (str): path of the Unix domain socket of the server
+            pool_size (int): number of connections to the server
+        """
+        self._path = path
+        self._connections: List[Optional["asyncio.Future[_AsyncConnection]"]] = [
+            None
+        ] * pool_size
+        self._next_slot = 0
+
+    async def check(
+        self,
+        policy_name: str,
+        permission_name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> bool:
+        """Checks a permission in the server.
+
+        Args:
+            policy_name (str): name of the policy in the server
+            permission_name (str): name of the permission
+            args (Tuple[Any, ...]): arguments passed to the policy access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the policy
+                access method
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+        """
+        payload = marshal.dumps((policy_name, permission_name, args, kwargs))
+        connection = await self._get_connection()
+        return await connection.request(CHECK, payload)
+
+    async def check_many(
+        self,
+        policy_name: str,
+        permission_name: str,
+        objects: List[Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> List[bool]:
+        """Checks a permission for each object in the server.
+
+        Args:
+            policy_name (str): name of the policy in the server
+            permission_name (str): name of the permission
+            objects (List[Any]): objects the permission is checked for
+            args (Tuple[Any, ...]): arguments passed to the policy access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the policy
+                access method
+
+        Returns:
+            List[bool]: result of the check for each object
+        """
+        payload = marshal.dumps(
+            (policy_name, permission_name, (list(objects), *args), kwargs)
+        )
+        connection = await self._get_connection()
+        return await connection.request(CHECK_MANY, payload)
+
+    async def close(self) -> None:
+        """Closes the connections."""
+        for future in self._connections:
+            if future is None:
+                continue
+            if future.done() and not future.cancelled() and not future.exception():
+                future.result().close()
+            else:
+                future.cancel()
+        self._connections = [None] * len(self._connections)
+
+    async def _get_connection(self) -> _AsyncConnection:
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % len(self._connections)
+        future = self._connections[slot]
+        if future is None or (
+            future.done()
+            and (
+                future.cancelled()
+                or future.exception() is not None
+                or future.result().closed
+            )
+        ):
+            future = self._connections[slot] = asyncio.ensure_future(self._connect())
+        # a caller being cancelled does not cancel the connection of the others
+        return await asyncio.shield(future)
+
+    async def _connect(self) -> _AsyncConnection:
+        try:
+            reader, writer = await asyncio.open_unix_connection(self._path)
+        except OSError as error:
+            raise SidecarError(
+                f"Could not connect to the sidecar at {self._path}"
+            ) from error
+        return _AsyncConnection(reader, writer)
+
+
+class _SyncConnection:
+    def __init__(self, sock: socket.socket) -> None:
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+        self._request_ids = itertools.count()
+
+    def request(self, operation: int, payload: bytes) -> Tuple[int, Any]:
+        request_id = next(self._request_ids) % _REQUEST_IDS_MODULO
+        self._socket.sendall(_encode_frame(request_id, operation, payload))
+        header = self._reader.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise SidecarError("Connection to the sidecar was closed")
+        response_id, status, size = _HEADER.unpack(header)
+        data = self._reader.read(size)
+        if response_id != request_id or len(data) < size:
+            raise SidecarError("Invalid response from the sidecar")
+        return status, marshal.loads(data)
+
+    def close(self) -> None:
+        self._reader.close()
+        self._socket.close()
+
+
+class SyncSidecarClient:
+    """Client of a SidecarServer, it can be shared by several threads.
+    Each thread borrows a connection from a pool for the time of a request,
+    the requests of the threads being coalesced by the server.
+    """
+
+    def __init__(
+        self, path: str, pool_size: int = 4, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Args:
+            path (str): path of the Unix domain socket of the server
+            pool_size (int): maximum number of connections to the server,
+                the threads wait for a connection when they are all in use
+            timeout (Optional[float]): number of seconds the server has
+                to respond, no timeout by default
+        """
+        self._path = path
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle_connections: List[_SyncConnection] = []
+
+    def check(
+        self,
+        policy_name: str,
+        permission_name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> bool:
+        """Checks a permission in the server.
+
+        Args:
+            policy_name (str): name of the policy in the server
+            permission_name (str): name of the permission
+            args (Tuple[Any, ...]): arguments passed to the policy access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the policy
+                access method
+
+        Returns:
+            bool: True if permission is granted, False otherwise
+        """
+        payload = marshal.dumps((policy_name, permission_name, args, kwargs))
+        return self._request(CHECK, payload)
+
+    def check_many(
+        self,
+        policy_name: str,
+        permission_name: str,
+        objects: List[Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> List[bool]:
+        """Checks a permission for each object in the server.
+
+        Args:
+            policy_name (str): name of the policy in the server
+            permission_name (str): name of the permission
+            objects (List[Any]): objects the permission is checked for
+            args (Tuple[Any, ...]): arguments passed to the policy access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the policy
+                access method
+
+        Returns:
+            List[bool]: result of the check for each object
+        """
+        payload = marshal.dumps(
+            (policy_name, permission_name, (list(objects), *args), kwargs)
+        )
+        return self._request(CHECK_MANY, payload)
+
+    def close(self) -> None:
+        """Closes the idle connections."""
+        with self._lock:
+            connections, self._idle_connections = self._idle_connections, []
+        for connection in connections:
+            connection.close()
+
+    def _request(self, operation: int, payload: bytes) -> Any:
+        with self._borrow_connection() as connection:
+            try:
+                status, value = connection.request(operation, payload)
+            except OSError as error:
+                raise SidecarError("Request to the sidecar failed") from error
+        if status != OK:
+            raise SidecarError(value)
+        return value
+
+    @contextmanager
+    def _borrow_connection(self) -> Iterator[_SyncConnection]:
+        with self._slots:
+            with self._lock:
+                connection = (
+                    self._idle_connections.pop() if self._idle_connections else None
+                )
+            if connection is None:
+                connection = self._connect()
+            try:
+                yield connection
+            except BaseException:
+                # the state of the connection is unknown after an error
+                connection.close()
+                raise
+            with self._lock:
+                self._idle_connections.append(connection)
+
+    def _connect(self) -> _SyncConnection:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self._path)
+        except OSError as error:
+            sock.close()
+            raise SidecarError(
+                f"Could not connect to the sidecar at {self._path}"
+            ) from error
+        return _SyncConnection(sock)
+
+
+class SidecarPolicy(Policy):
+    """Policy checking the permissions in a SidecarServer, in place of
+    a policy held by the current process.
+    The permissions are known from the class of the policy served, so the
+    default action of the Ability still applies to the other ones.
+    The data dependencies of the access methods are loaded by the server.
+
+    Example:
+
+        policy = SidecarPolicy(client, UserPolicy)
+        ability = Ability(policy=policy)
+        await ability.can(ProjectPermissions.view, project.id, user_id=user.id)
+    """
+
+    def __init__(
+        self,
+        client: AsyncSidecarClient,
+        policy_class: Type[Policy],
+        name: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            client (AsyncSidecarClient): client of the server
+            policy_class (Type[Policy]): class of the policy served
+            name (Optional[str]): name of the policy in the server,
+                by default the name of its class
+        """
+        self._client = client
+        self._name = name or policy_class.__name__
+        self._access_methods = policy_class._access_methods
+        self._batch_access_methods = policy_class._batch_access_methods
+        # all the access methods returned by this policy must be awaited
+        self._sync_access_methods = frozenset()
+        self._sync_batch_access_methods = frozenset()
+
+    def get_access_method(self, permission: Permission) -> AccessMethod:
+        """Returns a coroutine function checking the permission in the server.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            AccessMethod: access method checking the permission
+        """
+        if permission not in self._access_methods:
+            raise UndefinedPermission(permission)
+        return partial(self._check, permission.name)
+
+    def get_batch_access_method(
+        self, permission: Permission
+    ) -> Optional[BatchAccessMethod]:
+        """Returns a coroutine function checking all the objects
+        in a single request.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            Optional[BatchAccessMethod]: batch access method for permission,
+                None if the permission is not set in the policy
+        """
+        if (
+            permission not in self._access_methods
+            and permission not in self._batch_access_methods
+        ):
+            return None
+        return partial(self._check_many, permission.name)
+
+    async def _check(self, permission_name: str, *args: Any, **kwargs: Any) -> bool:
+        return await self._client.check(self._name, permission_name, args, kwargs)
+
+    async def _check_many(
+        self, permission_name: str, objects: List[Any], *args: Any, **kwargs: Any
+    ) -> List[bool]:
+        return await self._client.check_many(
+            self._name, permission_name, objects, args, kwargs
+        )
+
+
+class SyncSidecarPolicy(SyncPolicy):
+    """Synchronous version of SidecarPolicy, for an Ability from `deny.sync`.
+
+    Example:
+
+        policy = SyncSidecarPolicy(client, UserPolicy)
+        ability = Ability(policy=policy)
+        ability.can(ProjectPermissions.view, project.id, user_id=user.id)
+    """
+
+    def __init__(
+        self,
+        client: SyncSidecarClient,
+        policy_class: Type[Policy],
+        name: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            client (SyncSidecarClient): client of the server
+            policy_class (Type[Policy]): class of the policy served
+            name (Optional[str]): name of the policy in the server,
+                by default the name of its class
+        """
+        self._client = client
+        self._name = name or policy_class.__name__
+        self._access_methods = policy_class._access_methods
+        self._batch_access_methods = policy_class._batch_access_methods
+
+    def get_access_method(self, permission: Permission) -> SyncAccessMethod:
+        """Returns a function checking the permission in the server.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            SyncAccessMethod: access method checking the permission
+        """
+        if permission not in self._access_methods:
+            raise UndefinedPermission(permission)
+        return partial(self._check, permission.name)
+
+    def get_batch_access_method(
+        self, permission: Permission
+    ) -> Optional[SyncBatchAccessMethod]:
+        """Returns a function checking all the objects in a single request.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            Optional[SyncBatchAccessMethod]: batch access method for permission,
+                None if the permission is not set in the policy
+        """
+        if (
+            permission not in self._access_methods
+            and permission not in self._batch_access_methods
+        ):
+            return None
+        return partial(self._check_many, permission.name)
+
+    def _check(self, permission_name: str, *args: Any, **kwargs: Any) -> bool:
+        return self._client.check(self._name, permission_name, args, kwargs)
+
+    def _check_many(
+        self, permission_name: str, objects: List[Any], *args: Any, **kwargs: Any
+    ) -> List[bool]:
+        return self._client.check_many(
+            self._name, permission_name, objects, args, kwargs
+        )
+
+
+async def _serve(server: SidecarServer, path: str) -> None:
+    await server.start(path)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m deny.sidecar",
+        description="Serves the checks of policies over a Unix domain socket.",
+    )
+    parser.add_argument("path", help="path of the Unix domain socket")
+    parser.add_argument(
+        "policies",
+        help="module:attribute of the dictionary of the policies served by name",
+    )
+    parser.add_argument("--batch-window", type=float, default=0.0)
+    parser.add_argument("--max-batch-size", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    module_name, _, attribute = args.policies.partition(":")
+    policies = getattr(importlib.import_module(module_name), attribute)
+    server = SidecarServer(
+        policies, batch_window=args.batch_window, max_batch_size=args.max_batch_size
+    )
+    try:
+        asyncio.run(_serve(server, args.path))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from deny.permission import Permission
+
+_T = TypeVar("_T")
+
+
+def get_call_key(
+    policy: Any, permission: Permission, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> Optional[Hashable]:
+    """Returns the key identifying a call to an access method.
+    Policies are compared by identity unless they define __eq__ and __hash__.
+
+    Args:
+        policy (Any): policy whose access method is called
+        permission (Permission): a permission
+        args (Tuple[Any, ...]): arguments passed to the access method
+        kwargs (Dict[str, Any]): keyword arguments passed to the access method
+
+    Returns:
+        Optional[Hashable]: key of the call, None if an argument is not hashable
+    """
+    key = (policy, permission, args, frozenset(kwargs.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class _AsyncCall(Generic[_T]):
+    def __init__(self, task: "asyncio.Future[_T]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """Deduplicates concurrent calls sharing the same key: the first caller
+    runs the function and the other ones wait for its result (or its exception).
+    A caller being cancelled does not cancel the call unless it was
+    the last one waiting for it.
+    It must be shared by the abilities running in the same event loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _AsyncCall[Any]] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[_T]]) -> _T:
+        """Runs func, or waits for the pending call made with the same key.
+
+        Args:
+            key (Hashable): key identifying the call
+            func (Callable[[], Awaitable[_T]]): function to call
+
+        Returns:
+            _T: value returned by func
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _AsyncCall(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(partial(self._forget, key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # the next callers start a new call instead of waiting for
+                # the cancelled one
+                self._forget_call(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(
+        self, key: Hashable, call: _AsyncCall[Any], task: "asyncio.Future[Any]"
+    ) -> None:
+        self._forget_call(key, call)
+        # mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _forget_call(self, key: Hashable, call: _AsyncCall[Any]) -> None:
+        # a new call may have been made with the same key
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+class _SyncCall(Generic[_T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[_T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SyncSingleFlight:
+    """Deduplicates concurrent calls sharing the same key: the first thread
+    runs the function and the other ones wait for its result (or its exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _SyncCall[Any]] = {}
+
+    def run(self, key: Hashable, func: Callable[[], _T]) -> _T:
+        """Runs func, or waits for the pending call made with the same key.
+
+        Args:
+            key (Hashable): key identifying the call
+            func (Callable[[], _T]): function to call
+
+        Returns:
+            _T: value returned by func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _SyncCall()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -1,6 +1,16 @@
 from ._sync.ability import Ability
-from ._sync.policy import Policy, authorize
+from ._sync.policy import Policy, authorize, authorize_batch, depends_on, loader
 from .action import Action
 from .permission import AutoPermission, Permission
 
-__all__ = ["Ability", "Action", "Policy", "authorize", "Permission", "AutoPermission"]
+__all__ = [
+    "Ability",
+    "Action",
+    "Policy",
+    "authorize",
+    "authorize_batch",
+    "depends_on",
+    "loader",
+    "Permission",
+    "AutoPermission",
+]
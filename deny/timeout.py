@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from deny.errors import AccessMethodTimeout
+from deny.permission import Permission
+from deny.utils import AccessMethod, SyncAccessMethod
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deny_deadline", default=None)
+
+
+@contextmanager
+def deadline(timeout: float) -> Iterator[None]:
+    """Sets a deadline for all the checks made within the context
+    (ex: in a middleware, for the whole request).
+    The context variable is copied to the tasks created in the context.
+    Nested deadlines can only shorten the current one.
+
+    Args:
+        timeout (float): number of seconds before the deadline
+    """
+    value = time.monotonic() + timeout
+    current = _deadline.get()
+    if current is not None:
+        value = min(value, current)
+    token = _deadline.set(value)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_deadline() -> Optional[float]:
+    """Returns the current deadline, as a time.monotonic() value.
+
+    Returns:
+        Optional[float]: current deadline, None if not set
+    """
+    return _deadline.get()
+
+
+def get_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Returns the time left for a call, based on the timeout and the deadline.
+
+    Args:
+        timeout (Optional[float]): timeout of the call, in seconds
+
+    Returns:
+        Optional[float]: number of seconds left, None if there is no limit
+    """
+    current = _deadline.get()
+    if current is None:
+        return timeout
+    remaining = current - time.monotonic()
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+class AsyncTimeout:
+    """Calls coroutine access methods with a timeout."""
+
+    @staticmethod
+    async def call(
+        permission: Permission,
+        access_method: AccessMethod,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        timeout: Optional[float],
+    ) -> bool:
+        """Calls the access method, an AccessMethodTimeout is raised if it
+        did not return within the timeout.
+
+        Args:
+            permission (Permission): permission being checked
+            access_method (AccessMethod): access method to call
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+            timeout (Optional[float]): timeout in seconds
+
+        Returns:
+            bool: result of the access method
+        """
+        if timeout is not None and timeout <= 0:
+            raise AccessMethodTimeout(permission)
+        try:
+            return await asyncio.wait_for(access_method(*args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            raise AccessMethodTimeout(permission) from None
+
+
+class SyncTimeout:
+    """Calls synchronous access methods with a timeout.
+    Those calls can not be interrupted: the access method is not called
+    if the deadline already passed, and an AccessMethodTimeout is raised
+    once it returns if it exceeded the timeout.
+    """
+
+    @staticmethod
+    def call(
+        permission: Permission,
+        access_method: SyncAccessMethod,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        timeout: Optional[float],
+    ) -> bool:
+        """Calls the access method, an AccessMethodTimeout is raised if it
+        did not return within the timeout.
+
+        Args:
+            permission (Permission): permission being checked
+            access_method (SyncAccessMethod): access method to call
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+            timeout (Optional[float]): timeout in seconds
+
+        Returns:
+            bool: result of the access method
+        """
+        if timeout is None:
+            return access_method(*args, **kwargs)
+        if timeout <= 0:
+            raise AccessMethodTimeout(permission)
+        start = time.monotonic()
+        result = access_method(*args, **kwargs)
+        if time.monotonic() - start > timeout:
+            raise AccessMethodTimeout(permission)
+        return result
+
+
+class CircuitBreaker:
+    """Stops calling the access method of a permission after a number of
+    consecutive failures (timeouts or errors).
+    Once `reset_timeout` seconds have passed a single call is let through,
+    the circuit is closed again if it succeeds.
+    It must be shared by the abilities to be useful.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): number of consecutive failures
+                opening the circuit
+            reset_timeout (float): number of seconds before a call is
+                tried again once the circuit is open
+        """
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures: Dict[Permission, int] = {}
+        self._opened_at: Dict[Permission, float] = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, permission: Permission) -> bool:
+        """Returns True if the access method of the permission must not be called.
+
+        Args:
+            permission (Permission): a permission
+
+        Returns:
+            bool: True if the circuit is open
+        """
+        if permission not in self._opened_at:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            opened_at = self._opened_at.get(permission)
+            if opened_at is None:
+                return False
+            if now - opened_at < self._reset_timeout:
+                return True
+            # let this call through, the other ones wait for its outcome
+            self._opened_at[permission] = now
+            return False
+
+    def record_success(self, permission: Permission) -> None:
+        """Closes the circuit of the permission.
+
+        Args:
+            permission (Permission): a permission
+        """
+        if permission in self._failures:
+            with self._lock:
+                self._failures.pop(permission, None)
+                self._opened_at.pop(permission, None)
+
+    def record_failure(self, permission: Permission) -> None:
+        """Counts a failure, the circuit is opened once the threshold is reached.
+
+        Args:
+            permission (Permission): a permission
+        """
+        with self._lock:
+            failures = self._failures.get(permission, 0) + 1
+            self._failures[permission] = failures
+            if failures >= self._failure_threshold:
+                self._opened_at[permission] = time.monotonic()
@@ -0,0 +1,219 @@
+import atexit
+import os
+import pickle
+import random
+import struct
+import threading
+import weakref
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from deny.permission import Permission
+
+# size of the pickled record following it
+_FRAME_HEADER = struct.Struct("!I")
+
+# returns what identifies the policy of a decision (ex: the id of its user),
+# passed to the function building the policy when the trace is replayed
+ContextFunction = Callable[[Any], Hashable]
+
+
+class TraceRecord(NamedTuple):
+    permission: str
+    allowed: bool
+    # number of seconds the check took
+    duration: float
+    context: Hashable
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+
+
+class TraceRecorder:
+    """Records a sample of the decisions made by the abilities, with the
+    time taken to make them, in an append-only trace file which can be
+    replayed against another version of the policies (see deny.replay).
+    Each record is a frame holding the pickled permission name, decision,
+    duration, context and arguments, so the arguments must be picklable
+    (the records that are not are counted in `dropped`).
+    The frames are buffered and appended by whole buffers from a background
+    thread, so no I/O is made while checking permissions and several
+    processes can record in the same file. The remaining frames are written
+    when the recorder is closed, or when the interpreter exits.
+
+    Example:
+
+        recorder = TraceRecorder(
+            "/var/log/myapp/decisions.trace",
+            sample_rate=0.01,
+            get_context=lambda policy: policy.user.id,
+        )
+        ability = Ability(policy=UserPolicy(user), trace_recorder=recorder)
+    """
+
+    # set by _start, in the process and in each process forked from it
+    _buffer: bytearray
+    _lock: threading.Lock
+    _write_lock: threading.Lock
+    _wake_up: threading.Event
+    _thread: threading.Thread
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 1.0,
+        get_context: Optional[ContextFunction] = None,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            path (str): path of the trace file, created if needed
+            sample_rate (float): ratio of decisions recorded
+            get_context (Optional[ContextFunction]): function returning
+                the context of the policy making a decision, by default None
+            buffer_size (int): number of bytes buffered before the background
+                thread is woken up to write them
+            flush_interval (float): maximum number of seconds a record waits
+                before being written
+        """
+        self._sample_rate = sample_rate
+        self._get_context = get_context
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._closed = False
+        self.dropped = 0
+        self._start()
+        atexit.register(self.close)
+        # the processes forked from this one (ex: prefork workers) don't
+        # inherit the background thread, a new one is started in each of them
+        recorder = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: _restart_after_fork(recorder))
+
+    def record(
+        self,
+        policy: Any,
+        permission: Permission,
+        allowed: bool,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        duration: float,
+    ) -> None:
+        """Adds a decision to the trace, if it's sampled.
+
+        Args:
+            policy (Any): policy that made the decision
+            permission (Permission): permission checked
+            allowed (bool): result of the check
+            args (Tuple[Any, ...]): arguments passed to the access method
+            kwargs (Dict[str, Any]): keyword arguments passed to the access method
+            duration (float): number of seconds the check took
+        """
+        if self._sample_rate < 1.0 and random.random() >= self._sample_rate:
+            return
+
+        context = self._get_context(policy) if self._get_context is not None else None
+        try:
+            data = pickle.dumps(
+                (permission.name, allowed, duration, context, args, kwargs),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception:
+            with self._lock:
+                self.dropped += 1
+            return
+
+        with self._lock:
+            self._buffer += _FRAME_HEADER.pack(len(data))
+            self._buffer += data
+            is_full = len(self._buffer) >= self._buffer_size
+        if is_full and not self._wake_up.is_set():
+            self._wake_up.set()
+
+    def flush(self) -> None:
+        """Writes the buffered records, from the calling thread."""
+        with self._write_lock:
+            with self._lock:
+                buffer, self._buffer = self._buffer, bytearray()
+            if buffer:
+                _write_all(self._fd, buffer)
+
+    def close(self) -> None:
+        """Stops the background thread, writes the remaining records
+        and closes the file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._wake_up.set()
+        self._thread.join()
+        self.flush()
+        os.close(self._fd)
+
+    def _start(self) -> None:
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        # held while writing, so the buffers are written in order
+        self._write_lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="deny-trace", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake_up.wait(self._flush_interval)
+            self._wake_up.clear()
+            self.flush()
+
+
+def _restart_after_fork(recorder: "weakref.ref[TraceRecorder]") -> None:
+    # the frames buffered by the parent process are written by the parent
+    instance = recorder()
+    if instance is not None and not instance._closed:
+        instance._start()
+
+
+def _write_all(fd: int, data: bytearray) -> None:
+    # a single write per buffer (unless it's partial, ex: a full disk),
+    # so frames of other processes appending to the file are not
+    # interleaved with these
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Reads the records of a trace file, a frame being written
+    when the file is read is ignored.
+    The records are unpickled: reading a trace file runs the code it
+    refers to, so only the trace files written by trusted recorders
+    must be read (or replayed).
+
+    Args:
+        path (str): path of the trace file
+
+    Returns:
+        Iterator[TraceRecord]: records in the order they were written
+    """
+    with open(path, "rb") as file:
+        while True:
+            header = file.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            (size,) = _FRAME_HEADER.unpack(header)
+            data = file.read(size)
+            if len(data) < size:
+                return
+            yield TraceRecord(*pickle.loads(data))
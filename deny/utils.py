@@ -1,7 +1,21 @@
-from typing import Awaitable, Callable
+from typing import Awaitable, Callable, Hashable, List, Union
 
 # unasync does not handle Awaitable so we define
 # both types here and AccessMethod will be translated
 # to SyncAccessMethod by unasync in the _sync folder.
 AccessMethod = Callable[..., Awaitable[bool]]
 SyncAccessMethod = Callable[..., bool]
+
+# async policies also accept plain functions as access methods,
+# AnyAccessMethod is translated to SyncAccessMethod as well.
+AnyAccessMethod = Union[AccessMethod, SyncAccessMethod]
+
+# check a permission for a list of objects at once, the objects
+# are passed as first argument and a result is returned for each one.
+BatchAccessMethod = Callable[..., Awaitable[List[bool]]]
+SyncBatchAccessMethod = Callable[..., List[bool]]
+AnyBatchAccessMethod = Union[BatchAccessMethod, SyncBatchAccessMethod]
+
+# returns the key of a data dependency, it receives
+# the arguments passed to the access method.
+KeyFunction = Callable[..., Hashable]
@@ -1,7 +1,13 @@
+from typing import AsyncIterator, List, Tuple
+
 import pytest
+from pytest_mock import MockerFixture
 
-from deny import Ability, Action, Policy, authorize
+from deny import Ability, Action, Policy, authorize, authorize_batch, depends_on, loader
+from deny.audit import AuditLog
 from deny.errors import UnauthorizedError, UndefinedPermission
+from deny.fields import FieldSchema
+from tests.utils.audit import MemorySink
 from tests.utils.models import Project, User
 from tests.utils.permissions import ProjectPermissions
 
@@ -15,6 +21,63 @@ class UserPolicy(Policy):
         return self._user.id == project.owner_id
 
 
+class BatchUserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+        self.calls: List[str] = []
+
+    @authorize(ProjectPermissions.view)
+    async def can_view_project(self, project: Project) -> bool:
+        self.calls.append("can_view_project")
+        return True
+
+    @authorize(ProjectPermissions.edit)
+    @authorize(ProjectPermissions.delete)
+    async def can_edit_project(self, project: Project) -> bool:
+        self.calls.append("can_edit_project")
+        return self._user.id == project.owner_id
+
+    @authorize_batch(ProjectPermissions.edit)
+    @authorize_batch(ProjectPermissions.delete)
+    async def can_edit_projects(self, projects: List[Project]) -> List[bool]:
+        self.calls.append("can_edit_projects")
+        return [self._user.id == project.owner_id for project in projects]
+
+
+class BatchOnlyUserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    @authorize_batch(ProjectPermissions.edit)
+    async def can_edit_projects(self, projects: List[Project]) -> List[bool]:
+        return [self._user.id == project.owner_id for project in projects]
+
+
+class MembersPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+        self.loaded: List[List[int]] = []
+
+    @loader("members")
+    async def load_members(self, owner_ids: List[int]) -> List[List[int]]:
+        self.loaded.append(owner_ids)
+        return [[owner_id] for owner_id in owner_ids]
+
+    @authorize(ProjectPermissions.edit)
+    @depends_on(members=lambda project: project.owner_id)
+    async def can_edit_project(self, project: Project, members: List[int]) -> bool:
+        return self._user.id in members
+
+
+class SyncUserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    @authorize(ProjectPermissions.edit)
+    def can_edit_project(self, project: Project) -> bool:
+        return self._user.id == project.owner_id
+
+
 @pytest.fixture
 def user() -> User:
     return User(id=1)
@@ -82,3 +145,263 @@ class TestCan:
     ):
         ability = Ability(default_action=Action.DENY)
         assert await ability.can(ProjectPermissions.edit) is False
+
+
+class TestCanNow:
+    def test_returns_true_if_authorized(self, authorized_project: Project) -> None:
+        ability = Ability(policy=SyncUserPolicy(user=User(id=1)))
+        assert ability.can_now(ProjectPermissions.edit, authorized_project) is True
+
+    def test_returns_false_if_not_authorized(
+        self, unauthorized_project: Project
+    ) -> None:
+        ability = Ability(policy=SyncUserPolicy(user=User(id=1)))
+        assert ability.can_now(ProjectPermissions.edit, unauthorized_project) is False
+
+    def test_uses_default_action_if_permission_not_defined(self) -> None:
+        ability = Ability(default_action=Action.ALLOW)
+        assert ability.can_now(ProjectPermissions.edit) is True
+
+
+class TestAuthorizeNow:
+    def test_raise_error_if_not_authorized(self, unauthorized_project: Project) -> None:
+        ability = Ability(policy=SyncUserPolicy(user=User(id=1)))
+        with pytest.raises(UnauthorizedError):
+            ability.authorize_now(ProjectPermissions.edit, unauthorized_project)
+
+
+class TestCanMany:
+    async def test_returns_result_for_each_object(
+        self,
+        ability: Ability,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        assert await ability.can_many(
+            ProjectPermissions.view, [authorized_project, unauthorized_project]
+        ) == [True, False]
+
+
+class TestAuditLog:
+    async def test_records_decisions(
+        self,
+        policy: UserPolicy,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        sink = MemorySink()
+        audit_log = AuditLog(sink, flush_interval=60)
+        ability = Ability(policy=policy, audit_log=audit_log)
+        await ability.can(ProjectPermissions.view, authorized_project)
+        with pytest.raises(UnauthorizedError):
+            await ability.authorize(ProjectPermissions.view, unauthorized_project)
+        audit_log.close()
+        assert [
+            (record.permission, record.allowed, record.args) for record in sink.records
+        ] == [
+            (ProjectPermissions.view.name, True, (repr(authorized_project),)),
+            (ProjectPermissions.view.name, False, (repr(unauthorized_project),)),
+        ]
+
+
+class TestCanManyWithBatchAccessMethod:
+    async def test_calls_batch_access_method_once(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = BatchUserPolicy(user)
+        ability = Ability(policy=policy)
+        assert await ability.can_many(
+            ProjectPermissions.edit, [authorized_project, unauthorized_project]
+        ) == [True, False]
+        assert policy.calls == ["can_edit_projects"]
+
+
+class TestPermissionsFor:
+    async def test_returns_permissions_granted_for_each_resource(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = BatchUserPolicy(user)
+        ability = Ability(policy=policy)
+        matrix = await ability.permissions_for(
+            [authorized_project, unauthorized_project]
+        )
+        assert set(matrix.granted(0)) == {
+            ProjectPermissions.view,
+            ProjectPermissions.edit,
+            ProjectPermissions.delete,
+        }
+        assert matrix.granted(1) == [ProjectPermissions.view]
+        assert policy.calls == [
+            "can_view_project",
+            "can_view_project",
+            "can_edit_projects",
+        ]
+
+    async def test_checks_given_permissions(
+        self, ability: Ability, authorized_project: Project
+    ) -> None:
+        matrix = await ability.permissions_for(
+            [authorized_project], [ProjectPermissions.edit, ProjectPermissions.view]
+        )
+        assert matrix.masks == [0b10]
+
+    async def test_checks_permissions_with_only_a_batch_access_method(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        ability = Ability(policy=BatchOnlyUserPolicy(user))
+        matrix = await ability.permissions_for(
+            [authorized_project, unauthorized_project]
+        )
+        assert matrix.granted(0) == [ProjectPermissions.edit]
+        assert matrix.granted(1) == []
+
+    async def test_records_decisions_of_shared_access_methods(
+        self, user: User, authorized_project: Project
+    ) -> None:
+        sink = MemorySink()
+        audit_log = AuditLog(sink, flush_interval=60)
+        ability = Ability(policy=BatchUserPolicy(user), audit_log=audit_log)
+        await ability.permissions_for(
+            [authorized_project], [ProjectPermissions.edit, ProjectPermissions.delete]
+        )
+        audit_log.close()
+        assert [(record.permission, record.allowed) for record in sink.records] == [
+            (ProjectPermissions.edit.name, True),
+            (ProjectPermissions.delete.name, True),
+        ]
+
+
+class TestVisibleFields:
+    async def test_returns_fields_visible_for_each_object(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = BatchUserPolicy(user)
+        ability = Ability(policy=policy)
+        schema = FieldSchema(
+            {
+                "id": None,
+                "name": ProjectPermissions.view,
+                "budget": ProjectPermissions.edit,
+                "invoices": [ProjectPermissions.edit, ProjectPermissions.delete],
+            }
+        )
+        projection = await ability.visible_fields(
+            schema, [authorized_project, unauthorized_project]
+        )
+        assert projection.visible(0) == ("id", "name", "budget", "invoices")
+        assert projection.visible(1) == ("id", "name")
+        # edit and delete share the same batch access method
+        assert policy.calls == [
+            "can_view_project",
+            "can_view_project",
+            "can_edit_projects",
+        ]
+
+
+class TestLoaders:
+    async def test_passes_dependencies_to_access_method(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        ability = Ability(policy=MembersPolicy(user))
+        assert await ability.can(ProjectPermissions.edit, authorized_project) is True
+        assert await ability.can(ProjectPermissions.edit, unauthorized_project) is False
+
+    async def test_memoizes_values(
+        self, user: User, authorized_project: Project
+    ) -> None:
+        policy = MembersPolicy(user)
+        ability = Ability(policy=policy)
+        await ability.can(ProjectPermissions.edit, authorized_project)
+        await ability.can(ProjectPermissions.edit, authorized_project)
+        assert policy.loaded == [[authorized_project.owner_id]]
+
+    async def test_can_many_loads_dependencies_at_once(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = MembersPolicy(user)
+        ability = Ability(policy=policy)
+        assert await ability.can_many(
+            ProjectPermissions.edit, [authorized_project, unauthorized_project]
+        ) == [True, False]
+        assert policy.loaded == [
+            [authorized_project.owner_id, unauthorized_project.owner_id]
+        ]
+
+    async def test_does_not_load_primed_values(
+        self, user: User, unauthorized_project: Project
+    ) -> None:
+        policy = MembersPolicy(user)
+        ability = Ability(policy=policy)
+        ability.prime("members", unauthorized_project.owner_id, [user.id])
+        assert await ability.can(ProjectPermissions.edit, unauthorized_project) is True
+        assert policy.loaded == []
+
+
+async def iterate(objects: List[Project]) -> AsyncIterator[Project]:
+    for obj in objects:
+        yield obj
+
+
+class TestStreamFilter:
+    async def test_yields_allowed_objects(self, ability: Ability) -> None:
+        projects = [Project(owner_id=index % 2) for index in range(7)]
+        allowed = [
+            project
+            async for project in ability.stream_filter(
+                ProjectPermissions.view, iterate(projects), chunk_size=3
+            )
+        ]
+        assert allowed == [projects[1], projects[3], projects[5]]
+
+    async def test_checks_objects_by_chunks(
+        self, ability: Ability, mocker: MockerFixture
+    ) -> None:
+        can_many = mocker.spy(Ability, "can_many")
+        projects = [Project(owner_id=1) for _ in range(7)]
+        async for _ in ability.stream_filter(
+            ProjectPermissions.view, iterate(projects), chunk_size=3
+        ):
+            pass
+        sizes = [len(call.args[2]) for call in can_many.call_args_list]
+        assert sizes == [3, 3, 1]
+
+
+class TestFillPage:
+    async def test_returns_page_of_allowed_objects(self, ability: Ability) -> None:
+        projects = [Project(owner_id=1 if index % 3 == 0 else 2) for index in range(20)]
+        calls: List[Tuple[int, int]] = []
+
+        async def fetch(offset: int, limit: int) -> List[Project]:
+            calls.append((offset, limit))
+            return projects[offset : offset + limit]
+
+        page = await ability.fill_page(ProjectPermissions.view, fetch, 3)
+        assert page.items == [projects[0], projects[3], projects[6]]
+        assert page.next_offset == 7
+        # the fetch size grows with the ratio of denied objects
+        assert calls[0] == (0, 3)
+        assert calls[1][1] > 2
+
+        page = await ability.fill_page(
+            ProjectPermissions.view, fetch, 10, offset=page.next_offset
+        )
+        assert page.items == [projects[9], projects[12], projects[15], projects[18]]
+        assert page.next_offset is None
@@ -1,7 +1,15 @@
+from typing import List, cast
+
 import pytest
 
-from deny import Policy, authorize
-from deny.errors import PermissionAlreadyDefined, UndefinedPermission
+from deny import Policy, authorize, authorize_batch, loader
+from deny.errors import (
+    LoaderAlreadyDefined,
+    PermissionAlreadyDefined,
+    UndefinedLoader,
+    UndefinedPermission,
+)
+from deny.utils import AccessMethod, BatchAccessMethod
 from tests.utils.models import Project, User
 from tests.utils.permissions import ProjectPermissions, SessionPermissions
 
@@ -39,25 +47,63 @@ class TestGetAccessMethod:
             policy.get_access_method(ProjectPermissions.view)
 
     async def test_return_access_method_if_defined(self, policy: UserPolicy) -> None:
-        access_method = policy.get_access_method(ProjectPermissions.edit)
+        access_method = cast(
+            AccessMethod, policy.get_access_method(ProjectPermissions.edit)
+        )
         assert access_method is not None
         assert await access_method(Project(1)) is True
 
     async def test_return_access_method_if_multiple_permissions_defined(
         self, policy: UserPolicy
     ) -> None:
-        access_method = policy.get_access_method(ProjectPermissions.edit)
+        access_method = cast(
+            AccessMethod, policy.get_access_method(ProjectPermissions.edit)
+        )
         assert access_method is not None
         assert await access_method(Project(1)) is True
 
     async def test_return_access_method_defined_in_base_class(
         self, policy: UserPolicy
     ) -> None:
-        access_method = policy.get_access_method(SessionPermissions.delete)
+        access_method = cast(
+            AccessMethod, policy.get_access_method(SessionPermissions.delete)
+        )
         assert access_method is not None
         assert await access_method() is True
 
 
+class TestGetBatchAccessMethod:
+    def test_returns_none_if_not_defined(self, policy: UserPolicy) -> None:
+        assert policy.get_batch_access_method(ProjectPermissions.edit) is None
+
+    async def test_return_batch_access_method_if_defined(self) -> None:
+        class BatchPolicy(Policy):
+            @authorize_batch(ProjectPermissions.edit)
+            async def can_edit_projects(self, projects: List[Project]) -> List[bool]:
+                return [project.owner_id == 1 for project in projects]
+
+        batch_access_method = cast(
+            BatchAccessMethod,
+            BatchPolicy().get_batch_access_method(ProjectPermissions.edit),
+        )
+        assert await batch_access_method([Project(1), Project(2)]) == [True, False]
+
+
+class TestGetLoaderFunction:
+    def test_raise_exception_if_not_defined(self, policy: UserPolicy) -> None:
+        with pytest.raises(UndefinedLoader):
+            policy.get_loader_function("members")
+
+    def test_return_loader_function_if_defined(self) -> None:
+        class LoaderPolicy(Policy):
+            @loader("members")
+            async def load_members(self, ids: List[int]) -> List[int]:
+                return ids
+
+        policy = LoaderPolicy()
+        assert policy.get_loader_function("members") == policy.load_members
+
+
 class TestMetaclass:
     def test_raise_error_if_permission_already_defined(self):
         with pytest.raises(PermissionAlreadyDefined):
@@ -70,3 +116,27 @@ class TestMetaclass:
                 @authorize(ProjectPermissions.edit)
                 async def can_view_project(self) -> bool:
                     return False
+
+    def test_raise_error_if_batch_permission_already_defined(self):
+        with pytest.raises(PermissionAlreadyDefined):
+
+            class _(Policy):
+                @authorize_batch(ProjectPermissions.edit)
+                async def can_edit_projects(self) -> List[bool]:
+                    return []
+
+                @authorize_batch(ProjectPermissions.edit)
+                async def can_view_projects(self) -> List[bool]:
+                    return []
+
+    def test_raise_error_if_loader_already_defined(self):
+        with pytest.raises(LoaderAlreadyDefined):
+
+            class _(Policy):
+                @loader("members")
+                async def load_members(self, ids: List[int]) -> List[int]:
+                    return ids
+
+                @loader("members")
+                async def load_other_members(self, ids: List[int]) -> List[int]:
+                    return ids
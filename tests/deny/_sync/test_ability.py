@@ -1,7 +1,21 @@
+from typing import Iterator, List, Tuple
+
 import pytest
+from pytest_mock import MockerFixture
 
+from deny.audit import AuditLog
 from deny.errors import UnauthorizedError, UndefinedPermission
-from deny.sync import Ability, Action, Policy, authorize
+from deny.fields import FieldSchema
+from deny.sync import (
+    Ability,
+    Action,
+    Policy,
+    authorize,
+    authorize_batch,
+    depends_on,
+    loader,
+)
+from tests.utils.audit import MemorySink
 from tests.utils.models import Project, User
 from tests.utils.permissions import ProjectPermissions
 
@@ -15,6 +29,63 @@ class UserPolicy(Policy):
         return self._user.id == project.owner_id
 
 
+class BatchUserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+        self.calls: List[str] = []
+
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, project: Project) -> bool:
+        self.calls.append("can_view_project")
+        return True
+
+    @authorize(ProjectPermissions.edit)
+    @authorize(ProjectPermissions.delete)
+    def can_edit_project(self, project: Project) -> bool:
+        self.calls.append("can_edit_project")
+        return self._user.id == project.owner_id
+
+    @authorize_batch(ProjectPermissions.edit)
+    @authorize_batch(ProjectPermissions.delete)
+    def can_edit_projects(self, projects: List[Project]) -> List[bool]:
+        self.calls.append("can_edit_projects")
+        return [self._user.id == project.owner_id for project in projects]
+
+
+class BatchOnlyUserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    @authorize_batch(ProjectPermissions.edit)
+    def can_edit_projects(self, projects: List[Project]) -> List[bool]:
+        return [self._user.id == project.owner_id for project in projects]
+
+
+class MembersPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+        self.loaded: List[List[int]] = []
+
+    @loader("members")
+    def load_members(self, owner_ids: List[int]) -> List[List[int]]:
+        self.loaded.append(owner_ids)
+        return [[owner_id] for owner_id in owner_ids]
+
+    @authorize(ProjectPermissions.edit)
+    @depends_on(members=lambda project: project.owner_id)
+    def can_edit_project(self, project: Project, members: List[int]) -> bool:
+        return self._user.id in members
+
+
+class SyncUserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    @authorize(ProjectPermissions.edit)
+    def can_edit_project(self, project: Project) -> bool:
+        return self._user.id == project.owner_id
+
+
 @pytest.fixture
 def user() -> User:
     return User(id=1)
@@ -82,3 +153,257 @@ class TestCan:
     ):
         ability = Ability(default_action=Action.DENY)
         assert ability.can(ProjectPermissions.edit) is False
+
+
+class TestCanNow:
+    def test_returns_true_if_authorized(self, authorized_project: Project) -> None:
+        ability = Ability(policy=SyncUserPolicy(user=User(id=1)))
+        assert ability.can_now(ProjectPermissions.edit, authorized_project) is True
+
+    def test_returns_false_if_not_authorized(
+        self, unauthorized_project: Project
+    ) -> None:
+        ability = Ability(policy=SyncUserPolicy(user=User(id=1)))
+        assert ability.can_now(ProjectPermissions.edit, unauthorized_project) is False
+
+    def test_uses_default_action_if_permission_not_defined(self) -> None:
+        ability = Ability(default_action=Action.ALLOW)
+        assert ability.can_now(ProjectPermissions.edit) is True
+
+
+class TestAuthorizeNow:
+    def test_raise_error_if_not_authorized(self, unauthorized_project: Project) -> None:
+        ability = Ability(policy=SyncUserPolicy(user=User(id=1)))
+        with pytest.raises(UnauthorizedError):
+            ability.authorize_now(ProjectPermissions.edit, unauthorized_project)
+
+
+class TestCanMany:
+    def test_returns_result_for_each_object(
+        self,
+        ability: Ability,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        assert ability.can_many(
+            ProjectPermissions.view, [authorized_project, unauthorized_project]
+        ) == [True, False]
+
+
+class TestAuditLog:
+    def test_records_decisions(
+        self,
+        policy: UserPolicy,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        sink = MemorySink()
+        audit_log = AuditLog(sink, flush_interval=60)
+        ability = Ability(policy=policy, audit_log=audit_log)
+        ability.can(ProjectPermissions.view, authorized_project)
+        with pytest.raises(UnauthorizedError):
+            ability.authorize(ProjectPermissions.view, unauthorized_project)
+        audit_log.close()
+        assert [
+            (record.permission, record.allowed, record.args) for record in sink.records
+        ] == [
+            (ProjectPermissions.view.name, True, (repr(authorized_project),)),
+            (ProjectPermissions.view.name, False, (repr(unauthorized_project),)),
+        ]
+
+
+class TestCanManyWithBatchAccessMethod:
+    def test_calls_batch_access_method_once(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = BatchUserPolicy(user)
+        ability = Ability(policy=policy)
+        assert ability.can_many(
+            ProjectPermissions.edit, [authorized_project, unauthorized_project]
+        ) == [True, False]
+        assert policy.calls == ["can_edit_projects"]
+
+
+class TestPermissionsFor:
+    def test_returns_permissions_granted_for_each_resource(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = BatchUserPolicy(user)
+        ability = Ability(policy=policy)
+        matrix = ability.permissions_for([authorized_project, unauthorized_project])
+        assert set(matrix.granted(0)) == {
+            ProjectPermissions.view,
+            ProjectPermissions.edit,
+            ProjectPermissions.delete,
+        }
+        assert matrix.granted(1) == [ProjectPermissions.view]
+        assert policy.calls == [
+            "can_view_project",
+            "can_view_project",
+            "can_edit_projects",
+        ]
+
+    def test_checks_given_permissions(
+        self, ability: Ability, authorized_project: Project
+    ) -> None:
+        matrix = ability.permissions_for(
+            [authorized_project], [ProjectPermissions.edit, ProjectPermissions.view]
+        )
+        assert matrix.masks == [0b10]
+
+    def test_checks_permissions_with_only_a_batch_access_method(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        ability = Ability(policy=BatchOnlyUserPolicy(user))
+        matrix = ability.permissions_for([authorized_project, unauthorized_project])
+        assert matrix.granted(0) == [ProjectPermissions.edit]
+        assert matrix.granted(1) == []
+
+    def test_records_decisions_of_shared_access_methods(
+        self, user: User, authorized_project: Project
+    ) -> None:
+        sink = MemorySink()
+        audit_log = AuditLog(sink, flush_interval=60)
+        ability = Ability(policy=BatchUserPolicy(user), audit_log=audit_log)
+        ability.permissions_for(
+            [authorized_project], [ProjectPermissions.edit, ProjectPermissions.delete]
+        )
+        audit_log.close()
+        assert [(record.permission, record.allowed) for record in sink.records] == [
+            (ProjectPermissions.edit.name, True),
+            (ProjectPermissions.delete.name, True),
+        ]
+
+
+class TestVisibleFields:
+    def test_returns_fields_visible_for_each_object(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = BatchUserPolicy(user)
+        ability = Ability(policy=policy)
+        schema = FieldSchema(
+            {
+                "id": None,
+                "name": ProjectPermissions.view,
+                "budget": ProjectPermissions.edit,
+                "invoices": [ProjectPermissions.edit, ProjectPermissions.delete],
+            }
+        )
+        projection = ability.visible_fields(
+            schema, [authorized_project, unauthorized_project]
+        )
+        assert projection.visible(0) == ("id", "name", "budget", "invoices")
+        assert projection.visible(1) == ("id", "name")
+        # edit and delete share the same batch access method
+        assert policy.calls == [
+            "can_view_project",
+            "can_view_project",
+            "can_edit_projects",
+        ]
+
+
+class TestLoaders:
+    def test_passes_dependencies_to_access_method(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        ability = Ability(policy=MembersPolicy(user))
+        assert ability.can(ProjectPermissions.edit, authorized_project) is True
+        assert ability.can(ProjectPermissions.edit, unauthorized_project) is False
+
+    def test_memoizes_values(self, user: User, authorized_project: Project) -> None:
+        policy = MembersPolicy(user)
+        ability = Ability(policy=policy)
+        ability.can(ProjectPermissions.edit, authorized_project)
+        ability.can(ProjectPermissions.edit, authorized_project)
+        assert policy.loaded == [[authorized_project.owner_id]]
+
+    def test_can_many_loads_dependencies_at_once(
+        self,
+        user: User,
+        authorized_project: Project,
+        unauthorized_project: Project,
+    ) -> None:
+        policy = MembersPolicy(user)
+        ability = Ability(policy=policy)
+        assert ability.can_many(
+            ProjectPermissions.edit, [authorized_project, unauthorized_project]
+        ) == [True, False]
+        assert policy.loaded == [
+            [authorized_project.owner_id, unauthorized_project.owner_id]
+        ]
+
+    def test_does_not_load_primed_values(
+        self, user: User, unauthorized_project: Project
+    ) -> None:
+        policy = MembersPolicy(user)
+        ability = Ability(policy=policy)
+        ability.prime("members", unauthorized_project.owner_id, [user.id])
+        assert ability.can(ProjectPermissions.edit, unauthorized_project) is True
+        assert policy.loaded == []
+
+
+def iterate(objects: List[Project]) -> Iterator[Project]:
+    for obj in objects:
+        yield obj
+
+
+class TestStreamFilter:
+    def test_yields_allowed_objects(self, ability: Ability) -> None:
+        projects = [Project(owner_id=index % 2) for index in range(7)]
+        allowed = [
+            project
+            for project in ability.stream_filter(
+                ProjectPermissions.view, iterate(projects), chunk_size=3
+            )
+        ]
+        assert allowed == [projects[1], projects[3], projects[5]]
+
+    def test_checks_objects_by_chunks(
+        self, ability: Ability, mocker: MockerFixture
+    ) -> None:
+        can_many = mocker.spy(Ability, "can_many")
+        projects = [Project(owner_id=1) for _ in range(7)]
+        for _ in ability.stream_filter(
+            ProjectPermissions.view, iterate(projects), chunk_size=3
+        ):
+            pass
+        sizes = [len(call.args[2]) for call in can_many.call_args_list]
+        assert sizes == [3, 3, 1]
+
+
+class TestFillPage:
+    def test_returns_page_of_allowed_objects(self, ability: Ability) -> None:
+        projects = [Project(owner_id=1 if index % 3 == 0 else 2) for index in range(20)]
+        calls: List[Tuple[int, int]] = []
+
+        def fetch(offset: int, limit: int) -> List[Project]:
+            calls.append((offset, limit))
+            return projects[offset : offset + limit]
+
+        page = ability.fill_page(ProjectPermissions.view, fetch, 3)
+        assert page.items == [projects[0], projects[3], projects[6]]
+        assert page.next_offset == 7
+        # the fetch size grows with the ratio of denied objects
+        assert calls[0] == (0, 3)
+        assert calls[1][1] > 2
+
+        page = ability.fill_page(
+            ProjectPermissions.view, fetch, 10, offset=page.next_offset
+        )
+        assert page.items == [projects[9], projects[12], projects[15], projects[18]]
+        assert page.next_offset is None
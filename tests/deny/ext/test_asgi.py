@@ -0,0 +1,138 @@
+import json
+from typing import Any, Dict, Optional
+
+import pytest
+from pytest_mock import MockerFixture
+from starlette.testclient import TestClient
+
+from deny import Ability, Policy, authorize
+from deny.context import get_current_ability, use_ability
+from deny.ext.asgi import AuthorizationMiddleware, Receive, Scope, Send, all_of
+from deny.ext.errors import AbilityNotFound
+from tests.utils.permissions import ProjectPermissions
+
+
+class UserPolicy(Policy):
+    @authorize(ProjectPermissions.view)
+    async def can_view_project(self, project_id: int) -> bool:
+        return project_id == 1
+
+    @authorize(ProjectPermissions.edit)
+    async def can_edit_project(self, *args: Any, **kwargs: Any) -> bool:
+        del args, kwargs
+        return False
+
+
+class App:
+    scope: Optional[Scope] = None
+    ability: Optional[Ability] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        del receive
+        self.scope = scope
+        self.ability = get_current_ability()
+        body = json.dumps({"path": scope["path"]}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture
+def app() -> App:
+    return App()
+
+
+@pytest.fixture
+def ability() -> Ability:
+    return Ability(policy=UserPolicy())
+
+
+@pytest.fixture
+def routes() -> Dict[Any, Any]:
+    return {
+        ("GET", "/projects/{id:int}"): all_of(
+            ProjectPermissions.view, params={"id": "project_id"}
+        ),
+        ("PUT", "/projects/{id:int}"): ProjectPermissions.edit,
+        ("GET", "/health"): all_of(),
+    }
+
+
+@pytest.fixture
+def client(app: App, ability: Ability, routes: Dict[Any, Any]) -> TestClient:
+    return TestClient(
+        AuthorizationMiddleware(app, routes, ability_factory=lambda scope: ability)
+    )
+
+
+class TestAuthorizationMiddleware:
+    def test_passes_path_params_to_access_methods(
+        self, client: TestClient, app: App, ability: Ability
+    ) -> None:
+        response = client.get("/projects/1")
+        assert response.status_code == 200
+        assert response.json() == {"path": "/projects/1"}
+        assert app.ability is ability
+        assert app.scope is not None
+        assert app.scope["state"]["ability"] is ability
+
+    def test_returns_403_if_permission_denied(
+        self, client: TestClient, app: App
+    ) -> None:
+        response = client.get("/projects/2")
+        assert response.status_code == 403
+        assert response.text == "Forbidden"
+        assert app.scope is None
+
+        response = client.put("/projects/1")
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize("path", ["/health", "/other"])
+    def test_skips_routes_without_permissions(
+        self, app: App, routes: Dict[Any, Any], mocker: MockerFixture, path: str
+    ) -> None:
+        ability_factory = mocker.Mock()
+        client = TestClient(
+            AuthorizationMiddleware(app, routes, ability_factory=ability_factory)
+        )
+        assert client.get(path).status_code == 200
+        ability_factory.assert_not_called()
+
+    def test_uses_current_ability(
+        self, app: App, routes: Dict[Any, Any], ability: Ability
+    ) -> None:
+        async def context_app(scope: Scope, receive: Receive, send: Send) -> None:
+            with use_ability(ability):
+                await AuthorizationMiddleware(app, routes)(scope, receive, send)
+
+        client = TestClient(context_app)
+        assert client.get("/projects/1").status_code == 200
+        assert client.get("/projects/2").status_code == 403
+        assert app.ability is ability
+
+    def test_prefers_ability_factory_to_current_ability(
+        self, app: App, routes: Dict[Any, Any], ability: Ability
+    ) -> None:
+        other_ability = Ability(policy=UserPolicy())
+        middleware = AuthorizationMiddleware(
+            app, routes, ability_factory=lambda scope: ability
+        )
+
+        async def context_app(scope: Scope, receive: Receive, send: Send) -> None:
+            with use_ability(other_ability):
+                await middleware(scope, receive, send)
+
+        assert TestClient(context_app).get("/projects/1").status_code == 200
+        assert app.ability is ability
+
+    def test_raise_error_if_ability_not_found(
+        self, app: App, routes: Dict[Any, Any]
+    ) -> None:
+        client = TestClient(AuthorizationMiddleware(app, routes))
+        with pytest.raises(AbilityNotFound):
+            client.get("/projects/1")
@@ -9,9 +9,21 @@ from pytest_mock import MockerFixture
 
 from deny import Ability, Action, Policy
 from deny import authorize as policy_authorize
+from deny.context import (
+    get_current_ability,
+    reset_current_ability,
+    set_current_ability,
+)
 from deny.errors import UnauthorizedError
 from deny.ext.errors import AbilityNotFound
-from deny.ext.falcon import authorize
+from deny.ext.falcon import (
+    AuthorizationMiddleware,
+    all_of,
+    any_of,
+    authorize,
+    public,
+    requires,
+)
 from tests.utils.permissions import ProjectPermissions
 
 
@@ -29,6 +41,20 @@ class AbilityMiddleware:
         req.context["ability"] = self._ability
 
 
+class ContextAbilityMiddleware:
+    def __init__(self, ability: Ability) -> None:
+        self._ability = ability
+
+    async def process_request(self, req: Request, _: Response) -> None:
+        req.context.ability_token = set_current_ability(self._ability)
+
+    async def process_response(
+        self, req: Request, resp: Response, resource: Any, req_succeeded: bool
+    ) -> None:
+        del resp, resource, req_succeeded
+        reset_current_ability(req.context.ability_token)
+
+
 class ErrorHandler:
     error: Optional[Exception] = None
 
@@ -109,3 +135,203 @@ class TestAuthorize:
         app.add_middleware(ability_middleware)
         client.simulate_get("/1")
         assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_uses_ability_of_current_context(
+        self, client: testing.TestClient, app: App, error_handler: ErrorHandler
+    ) -> None:
+        app.add_middleware(
+            ContextAbilityMiddleware(ability=Ability(default_action=Action.ALLOW))
+        )
+        response = client.simulate_get("/1")
+        assert response.json == {"id": 1}
+        assert get_current_ability() is None
+
+    def test_prefers_ability_of_request_to_current_context(
+        self, client: testing.TestClient, app: App, error_handler: ErrorHandler
+    ) -> None:
+        app.add_middleware(
+            ContextAbilityMiddleware(ability=Ability(default_action=Action.ALLOW))
+        )
+        app.add_middleware(AbilityMiddleware(Ability(default_action=Action.DENY)))
+        client.simulate_get("/1")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+
+class ProjectPolicy(Policy):
+    @policy_authorize(ProjectPermissions.view)
+    async def can_view_project(self, project_id: int) -> bool:
+        return project_id == 1
+
+    @policy_authorize(ProjectPermissions.edit)
+    async def can_edit_project(self, project_id: int) -> bool:
+        return project_id == 2
+
+    @policy_authorize(ProjectPermissions.delete)
+    async def can_delete_project(self, request: Request) -> bool:
+        return request.get_header("X-Admin") == "1"
+
+
+class ProjectResource:
+    @requires(
+        any_of(
+            ProjectPermissions.view,
+            ProjectPermissions.edit,
+            params={"id": "project_id"},
+        )
+    )
+    async def on_get(self, _: Request, resp: Response, id: int) -> None:
+        resp.text = json.dumps({"id": id})
+
+    @requires(
+        all_of(
+            ProjectPermissions.view,
+            ProjectPermissions.edit,
+            params={"id": "project_id"},
+        )
+    )
+    async def on_put(self, _: Request, resp: Response, id: int) -> None:
+        resp.text = json.dumps({"id": id})
+
+    async def on_post(self, _: Request, resp: Response, id: int) -> None:
+        resp.text = json.dumps({"id": id})
+
+    async def on_delete(self, _: Request, resp: Response, id: int) -> None:
+        resp.text = json.dumps({"id": id})
+
+
+class ProjectListResource:
+    async def on_get(self, _: Request, resp: Response, id: int) -> None:
+        resp.text = json.dumps({"id": id})
+
+    @requires(all_of(ProjectPermissions.delete, pass_request=True))
+    async def on_get_list(self, _: Request, resp: Response) -> None:
+        resp.text = json.dumps([])
+
+
+class HealthResource:
+    @public
+    async def on_get(self, _: Request, resp: Response) -> None:
+        resp.text = json.dumps({"status": "ok"})
+
+
+@pytest.fixture
+def suffix_app(error_handler: ErrorHandler) -> App:
+    falcon_app = App()
+    falcon_app.add_middleware(
+        AbilityMiddleware(ability=Ability(policy=ProjectPolicy()))
+    )
+    falcon_app.add_error_handler(Exception, error_handler)
+    resource = ProjectListResource()
+    falcon_app.add_route("/projects/{id:int}", resource)
+    falcon_app.add_route("/projects", resource, suffix="list")
+    return falcon_app
+
+
+@pytest.fixture
+def routes_app(error_handler: ErrorHandler) -> App:
+    falcon_app = App()
+    falcon_app.add_middleware(
+        AbilityMiddleware(ability=Ability(policy=ProjectPolicy()))
+    )
+    falcon_app.add_middleware(
+        AuthorizationMiddleware(
+            routes={
+                (ProjectResource, "delete"): all_of(
+                    ProjectPermissions.delete, pass_request=True
+                )
+            }
+        )
+    )
+    falcon_app.add_error_handler(Exception, error_handler)
+    falcon_app.add_route("/projects/{id:int}", ProjectResource())
+    return falcon_app
+
+
+@pytest.fixture
+def routes_client(routes_app: App) -> testing.TestClient:
+    return testing.TestClient(routes_app)
+
+
+class TestAuthorizationMiddleware:
+    @pytest.mark.parametrize("id", [1, 2])
+    def test_any_of_permissions_is_enough(
+        self, routes_client: testing.TestClient, id: int
+    ) -> None:
+        response = routes_client.simulate_get(f"/projects/{id}")
+        assert response.json == {"id": id}
+
+    def test_raise_error_if_no_permission_is_granted(
+        self, routes_client: testing.TestClient, error_handler: ErrorHandler
+    ) -> None:
+        routes_client.simulate_get("/projects/3")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_raise_error_if_one_permission_is_denied(
+        self, routes_client: testing.TestClient, error_handler: ErrorHandler
+    ) -> None:
+        routes_client.simulate_put("/projects/1")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_does_not_check_responders_without_spec(
+        self, routes_client: testing.TestClient
+    ) -> None:
+        response = routes_client.simulate_post("/projects/3")
+        assert response.json == {"id": 3}
+
+    def test_uses_routes_and_passes_request(
+        self, routes_client: testing.TestClient, error_handler: ErrorHandler
+    ) -> None:
+        response = routes_client.simulate_delete(
+            "/projects/3", headers={"X-Admin": "1"}
+        )
+        assert response.json == {"id": 3}
+        routes_client.simulate_delete("/projects/3")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_raise_error_if_ability_is_not_found(
+        self, error_handler: ErrorHandler
+    ) -> None:
+        falcon_app = App()
+        falcon_app.add_middleware(AuthorizationMiddleware())
+        falcon_app.add_error_handler(Exception, error_handler)
+        falcon_app.add_route("/projects/{id:int}", ProjectResource())
+        testing.TestClient(falcon_app).simulate_get("/projects/1")
+        assert isinstance(error_handler.error, AbilityNotFound)
+
+    def test_checks_responder_of_route_suffix(
+        self, suffix_app: App, error_handler: ErrorHandler
+    ) -> None:
+        middleware = AuthorizationMiddleware()
+        suffix_app.add_middleware(middleware)
+        middleware.build_index(suffix_app)
+        client = testing.TestClient(suffix_app)
+        assert client.simulate_get("/projects/3").json == {"id": 3}
+        response = client.simulate_get("/projects", headers={"X-Admin": "1"})
+        assert response.json == []
+        client.simulate_get("/projects")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_denies_route_suffix_if_routes_not_indexed(
+        self, suffix_app: App, error_handler: ErrorHandler
+    ) -> None:
+        suffix_app.add_middleware(AuthorizationMiddleware())
+        testing.TestClient(suffix_app).simulate_get(
+            "/projects", headers={"X-Admin": "1"}
+        )
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_build_index_raise_error_if_route_spec_matches_no_route(
+        self, suffix_app: App
+    ) -> None:
+        middleware = AuthorizationMiddleware(
+            routes={(ProjectResource, "GET"): ProjectPermissions.view}
+        )
+        with pytest.raises(ValueError, match="ProjectResource GET"):
+            middleware.build_index(suffix_app)
+
+    def test_does_not_require_ability_for_public_responders(self) -> None:
+        falcon_app = App()
+        falcon_app.add_middleware(AuthorizationMiddleware())
+        falcon_app.add_route("/health", HealthResource())
+        response = testing.TestClient(falcon_app).simulate_get("/health")
+        assert response.json == {"status": "ok"}
@@ -3,14 +3,15 @@ from typing import Awaitable, Callable, Dict
 from unittest.mock import ANY
 
 import pytest
-from fastapi import FastAPI, Request, Response
+from fastapi import APIRouter, FastAPI, Request, Response
 from fastapi.testclient import TestClient
 from pytest_mock import MockerFixture
 
 from deny import Ability, Policy
 from deny import authorize as policy_authorize
+from deny.context import use_ability
 from deny.errors import UnauthorizedError
-from deny.ext.fastapi import authorize_factory
+from deny.ext.fastapi import Authorize, all_of, any_of, authorize_factory
 from tests.utils.permissions import ProjectPermissions
 
 
@@ -87,3 +88,115 @@ class TestAuthorize:
         response = client.get("/2")
         assert response.status_code == 403
         assert isinstance(error_recorder.error, UnauthorizedError)
+
+
+class ProjectPolicy(Policy):
+    @policy_authorize(ProjectPermissions.view)
+    async def can_view_project(self, project_id: int) -> bool:
+        return project_id != 3
+
+    @policy_authorize(ProjectPermissions.edit)
+    async def can_edit_project(self, project_id: int) -> bool:
+        return project_id == 1
+
+    @policy_authorize(ProjectPermissions.delete)
+    async def can_delete_project(self, project_id: int) -> bool:
+        return project_id == 2
+
+
+class AbilityDependency:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self) -> Ability:
+        self.calls += 1
+        return Ability(policy=ProjectPolicy())
+
+
+@pytest.fixture
+def ability_dependency() -> AbilityDependency:
+    return AbilityDependency()
+
+
+@pytest.fixture
+def router_client(
+    error_recorder: SimpleNamespace, ability_dependency: AbilityDependency
+) -> TestClient:
+    fastapi_app = FastAPI()
+
+    @fastapi_app.exception_handler(UnauthorizedError)
+    async def _(request: Request, exc: Exception):
+        del request
+        error_recorder.error = exc
+        return Response(status_code=403)
+
+    params = {"id": "project_id"}
+    router = APIRouter(
+        dependencies=[
+            Authorize(
+                all_of(ProjectPermissions.view, params=params),
+                ability_dependency=ability_dependency,
+            )
+        ]
+    )
+
+    @router.get("/projects/{id:int}")
+    async def get_project(id: int) -> Dict[str, int]:
+        return {"id": id}
+
+    @router.put(
+        "/projects/{id:int}",
+        dependencies=[
+            Authorize(
+                any_of(
+                    ProjectPermissions.edit, ProjectPermissions.delete, params=params
+                ),
+                all_of(ProjectPermissions.view, params=params),
+                ability_dependency=ability_dependency,
+            )
+        ],
+    )
+    async def edit_project(id: int) -> Dict[str, int]:
+        return {"id": id}
+
+    fastapi_app.include_router(router)
+    return TestClient(fastapi_app)
+
+
+class TestAuthorizeDependency:
+    def test_checks_router_dependency(
+        self, router_client: TestClient, error_recorder: SimpleNamespace
+    ) -> None:
+        assert router_client.get("/projects/1").json() == {"id": 1}
+        assert router_client.get("/projects/3").status_code == 403
+        assert isinstance(error_recorder.error, UnauthorizedError)
+
+    @pytest.mark.parametrize(
+        ["id", "status_code"], [(1, 200), (2, 200), (3, 403), (4, 403)]
+    )
+    def test_checks_all_specs(
+        self, router_client: TestClient, id: int, status_code: int
+    ) -> None:
+        assert router_client.put(f"/projects/{id}").status_code == status_code
+
+    def test_resolves_ability_once_per_request(
+        self, router_client: TestClient, ability_dependency: AbilityDependency
+    ) -> None:
+        router_client.put("/projects/1")
+        assert ability_dependency.calls == 1
+
+    def test_uses_current_ability_by_default(self) -> None:
+        fastapi_app = FastAPI()
+
+        @fastapi_app.get(
+            "/projects/{id:int}",
+            dependencies=[
+                Authorize(all_of(ProjectPermissions.view, params={"id": "project_id"}))
+            ],
+        )
+        async def get_project(id: int) -> Dict[str, int]:
+            return {"id": id}
+
+        with use_ability(Ability(policy=ProjectPolicy())):
+            response = TestClient(fastapi_app).get("/projects/1")
+        assert response.json() == {"id": 1}
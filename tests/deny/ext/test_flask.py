@@ -2,14 +2,15 @@ from typing import Any, Callable, Optional, Tuple
 from unittest.mock import ANY
 
 import pytest
-from flask import Flask, g, jsonify
+from flask import Blueprint, Flask, g, jsonify
 from flask.testing import FlaskClient
 from flask.wrappers import Response
 from pytest_mock import MockerFixture
 
+from deny.context import use_ability
 from deny.errors import UnauthorizedError
 from deny.ext.errors import AbilityNotFound
-from deny.ext.flask import authorize
+from deny.ext.flask import Deny, all_of, any_of, authorize, public, requires
 from deny.sync import Ability, Action, Policy
 from deny.sync import authorize as policy_authorize
 from tests.utils.permissions import ProjectPermissions
@@ -112,3 +113,153 @@ class TestAuthorize:
         app.before_request(ability_middleware)
         client.get("/1")
         assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_uses_ability_of_current_context(
+        self, client: FlaskClient, app: Flask
+    ) -> None:
+        ability = Ability(default_action=Action.ALLOW)
+        with use_ability(ability):
+            response = client.get("/1")
+        assert response.json == {"id": 1}
+
+    def test_prefers_ability_of_request_to_current_context(
+        self, client: FlaskClient, app: Flask, error_handler: ErrorHandler
+    ) -> None:
+        app.before_request(AbilityMiddleware(Ability(default_action=Action.DENY)))
+        # ex: left set by another request handled in the same thread
+        with use_ability(Ability(default_action=Action.ALLOW)):
+            client.get("/1")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+
+class ProjectPolicy(Policy):
+    @policy_authorize(ProjectPermissions.view)
+    def can_view_project(self, project_id: int) -> bool:
+        return project_id == 1
+
+    @policy_authorize(ProjectPermissions.edit)
+    def can_edit_project(self, project_id: int) -> bool:
+        return project_id == 2
+
+    @policy_authorize(ProjectPermissions.delete)
+    def can_delete_project(self) -> bool:
+        return False
+
+
+class AbilityFactory:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self) -> Ability:
+        self.calls += 1
+        return Ability(policy=ProjectPolicy())
+
+
+@pytest.fixture
+def ability_factory() -> AbilityFactory:
+    return AbilityFactory()
+
+
+@pytest.fixture
+def deny_app(error_handler: ErrorHandler, ability_factory: AbilityFactory) -> Flask:
+    flask_app = Flask("tests")
+    flask_app.errorhandler(Exception)(error_handler)
+    deny = Deny(flask_app, ability_factory=ability_factory)
+
+    @flask_app.get("/projects/<int:id>")
+    @requires(
+        any_of(
+            ProjectPermissions.view,
+            ProjectPermissions.edit,
+            params={"id": "project_id"},
+        )
+    )
+    def get_project(id: int) -> Response:
+        return jsonify({"id": id})
+
+    @flask_app.get("/async/projects/<int:id>")
+    @requires(all_of(ProjectPermissions.view, params={"id": "project_id"}))
+    async def get_project_async(id: int) -> Response:
+        return jsonify({"id": id})
+
+    @flask_app.put("/projects/<int:id>")
+    def edit_project(id: int) -> Response:
+        return jsonify({"id": id})
+
+    @flask_app.get("/health")
+    def health() -> Response:
+        return jsonify({"ok": True})
+
+    admin = Blueprint("admin", "tests", url_prefix="/admin")
+
+    @admin.get("/projects")
+    def list_projects() -> Response:
+        return jsonify([])
+
+    @admin.get("/health")
+    @public
+    def admin_health() -> Response:
+        return jsonify({"ok": True})
+
+    deny.protect(
+        "edit_project", all_of(ProjectPermissions.edit, params={"id": "project_id"})
+    )
+    deny.protect_blueprint(admin, ProjectPermissions.delete)
+    flask_app.register_blueprint(admin)
+    return flask_app
+
+
+@pytest.fixture
+def deny_client(deny_app: Flask) -> FlaskClient:
+    return deny_app.test_client()
+
+
+class TestDeny:
+    @pytest.mark.parametrize("id", [1, 2])
+    def test_any_of_permissions_is_enough(
+        self, deny_client: FlaskClient, id: int
+    ) -> None:
+        assert deny_client.get(f"/projects/{id}").json == {"id": id}
+
+    def test_raise_error_if_not_authorized(
+        self, deny_client: FlaskClient, error_handler: ErrorHandler
+    ) -> None:
+        deny_client.get("/projects/3")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_supports_async_views(
+        self, deny_client: FlaskClient, error_handler: ErrorHandler
+    ) -> None:
+        # Flask runs the async views with asgiref (flask[async])
+        pytest.importorskip("asgiref")
+        assert deny_client.get("/async/projects/1").json == {"id": 1}
+        deny_client.get("/async/projects/2")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_uses_protected_endpoints(
+        self, deny_client: FlaskClient, error_handler: ErrorHandler
+    ) -> None:
+        assert deny_client.put("/projects/2").json == {"id": 2}
+        deny_client.put("/projects/1")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_uses_blueprint_default(
+        self, deny_client: FlaskClient, error_handler: ErrorHandler
+    ) -> None:
+        deny_client.get("/admin/projects")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_does_not_build_ability_for_public_endpoints(
+        self, deny_client: FlaskClient, ability_factory: AbilityFactory
+    ) -> None:
+        assert deny_client.get("/health").json == {"ok": True}
+        assert deny_client.get("/admin/health").json == {"ok": True}
+        assert ability_factory.calls == 0
+
+    def test_builds_ability_once_per_request(
+        self, deny_app: Flask, ability_factory: AbilityFactory
+    ) -> None:
+        deny = deny_app.extensions["deny"]
+        with deny_app.test_request_context("/projects/1"):
+            assert deny.get_ability() is deny.get_ability()
+        assert ability_factory.calls == 1
@@ -0,0 +1,87 @@
+from typing import Any, Callable, ContextManager, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from flask import Flask, g, jsonify
+from flask.wrappers import Response
+
+from deny import Ability, Policy
+from deny import authorize as policy_authorize
+from deny.budget import CheckAccount
+from deny.sync import Ability as SyncAbility
+from deny.sync import Policy as SyncPolicy
+from deny.sync import authorize as sync_policy_authorize
+from tests.utils.permissions import ProjectPermissions
+
+CheckBudgetFixture = Callable[..., ContextManager[List[CheckAccount]]]
+
+PROJECT_IDS = list(range(10))
+
+
+class UserPolicy(Policy):
+    @policy_authorize(ProjectPermissions.view)
+    async def can_view_project(self, id: int) -> bool:
+        return id % 2 == 0
+
+
+class SyncUserPolicy(SyncPolicy):
+    @sync_policy_authorize(ProjectPermissions.view)
+    def can_view_project(self, id: int) -> bool:
+        return id % 2 == 0
+
+
+@pytest.fixture
+def flask_app() -> Flask:
+    app = Flask("tests")
+
+    @app.before_request
+    def inject_ability() -> None:
+        g.ability = SyncAbility(policy=SyncUserPolicy())
+
+    @app.get("/projects")
+    def list_projects() -> Response:
+        # checked one by one
+        ids = [id for id in PROJECT_IDS if g.ability.can(ProjectPermissions.view, id)]
+        return jsonify(ids)
+
+    return app
+
+
+@pytest.fixture
+def fastapi_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/projects")
+    async def list_projects() -> Dict[str, Any]:
+        ability = Ability(policy=UserPolicy())
+        results = await ability.can_many(ProjectPermissions.view, PROJECT_IDS)
+        return {"ids": [id for id, result in zip(PROJECT_IDS, results) if result]}
+
+    return app
+
+
+class TestCheckBudget:
+    def test_passes_under_budget(
+        self, flask_app: Flask, check_budget: CheckBudgetFixture
+    ) -> None:
+        with check_budget(max_checks=10) as accounts:
+            response = flask_app.test_client().get("/projects")
+        assert response.json == [0, 2, 4, 6, 8]
+        assert [account.checks for account in accounts] == [10]
+
+    def test_fails_over_budget(
+        self, flask_app: Flask, check_budget: CheckBudgetFixture
+    ) -> None:
+        with pytest.raises(AssertionError) as error:
+            with check_budget(batch_threshold=5):
+                assert flask_app.test_client().get("/projects").status_code == 200
+        assert "Ability.can_many()" in str(error.value)
+
+    def test_tracks_asgi_requests(
+        self, fastapi_app: FastAPI, check_budget: CheckBudgetFixture
+    ) -> None:
+        # can_many() without a batch access method checks the objects one by one
+        with pytest.raises(AssertionError, match="10 checks"):
+            with check_budget(max_checks=5):
+                TestClient(fastapi_app).get("/projects")
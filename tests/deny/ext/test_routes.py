@@ -0,0 +1,139 @@
+from typing import Any
+
+import pytest
+
+from deny.ext.routes import RouteIndex
+from deny.ext.spec import PermissionSpec, all_of
+from tests.utils.permissions import ProjectPermissions, SessionPermissions
+
+
+@pytest.fixture
+def index() -> RouteIndex:
+    return RouteIndex(
+        {
+            ("GET", "/"): ProjectPermissions.view,
+            ("GET", "/projects/{id:int}"): ProjectPermissions.view,
+            ("put", "/projects/{id:int}"): ProjectPermissions.edit,
+            ("GET", "/projects/new"): ProjectPermissions.delete,
+            ("GET", "/projects/{id:int}/sessions/{name}"): all_of(
+                SessionPermissions.delete, params={"id": "project_id"}
+            ),
+            ("*", "/admin/{path}"): SessionPermissions.create,
+        }
+    )
+
+
+class TestRouteIndex:
+    def test_matches_root(self, index: RouteIndex) -> None:
+        assert index.match("GET", "/") == (
+            PermissionSpec((ProjectPermissions.view,)),
+            {},
+        )
+
+    def test_converts_params(self, index: RouteIndex) -> None:
+        assert index.match("GET", "/projects/1") == (
+            PermissionSpec((ProjectPermissions.view,)),
+            {"id": 1},
+        )
+        assert index.match("GET", "/projects/1/sessions/main") == (
+            all_of(SessionPermissions.delete, params={"id": "project_id"}),
+            {"id": 1, "name": "main"},
+        )
+
+    def test_prefers_static_segments(self, index: RouteIndex) -> None:
+        assert index.match("GET", "/projects/new") == (
+            PermissionSpec((ProjectPermissions.delete,)),
+            {},
+        )
+
+    def test_falls_back_to_params_if_static_segment_has_no_spec_for_method(
+        self,
+    ) -> None:
+        index = RouteIndex(
+            {
+                ("POST", "/projects/new"): ProjectPermissions.edit,
+                ("GET", "/projects/{id}"): ProjectPermissions.view,
+            }
+        )
+        assert index.match("GET", "/projects/new") == (
+            PermissionSpec((ProjectPermissions.view,)),
+            {"id": "new"},
+        )
+        assert index.match("POST", "/projects/new") == (
+            PermissionSpec((ProjectPermissions.edit,)),
+            {},
+        )
+
+    def test_matches_head_as_get(self, index: RouteIndex) -> None:
+        assert index.match("HEAD", "/projects/1") == (
+            PermissionSpec((ProjectPermissions.view,)),
+            {"id": 1},
+        )
+        assert index.match("HEAD", "/admin/users") == (
+            PermissionSpec((SessionPermissions.create,)),
+            {"path": "users"},
+        )
+
+    def test_matches_method(self, index: RouteIndex) -> None:
+        assert index.match("PUT", "/projects/1/") == (
+            PermissionSpec((ProjectPermissions.edit,)),
+            {"id": 1},
+        )
+        assert index.match("DELETE", "/projects/1") is None
+
+    def test_matches_any_method(self, index: RouteIndex) -> None:
+        assert index.match("POST", "/admin/users") == (
+            PermissionSpec((SessionPermissions.create,)),
+            {"path": "users"},
+        )
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/projects",
+            "/projects/abc",
+            "/projects/-1",
+            "/projects/+1",
+            "/projects/\u0663",
+            "/projects/1/sessions",
+            "/other",
+        ],
+    )
+    def test_returns_none_if_no_route_matches(
+        self, index: RouteIndex, path: str
+    ) -> None:
+        assert index.match("GET", path) is None
+
+    def test_uses_param_names_of_each_route(self) -> None:
+        index = RouteIndex(
+            {
+                ("GET", "/projects/{id:int}"): ProjectPermissions.view,
+                ("PUT", "/projects/{project_id:int}"): ProjectPermissions.edit,
+            }
+        )
+        assert index.match("GET", "/projects/1") == (
+            PermissionSpec((ProjectPermissions.view,)),
+            {"id": 1},
+        )
+        assert index.match("PUT", "/projects/1") == (
+            PermissionSpec((ProjectPermissions.edit,)),
+            {"project_id": 1},
+        )
+
+    @pytest.mark.parametrize(
+        "path, params",
+        [("/1.5", {"value": 1.5}), ("/2", {"value": 2.0}), ("/nan", None)],
+    )
+    def test_converts_float_params(self, path: str, params: Any) -> None:
+        index = RouteIndex({("GET", "/{value:float}"): ProjectPermissions.view})
+        match = index.match("GET", path)
+        assert (match[1] if match else None) == params
+
+    def test_raise_error_if_params_conflict(self) -> None:
+        with pytest.raises(ValueError):
+            RouteIndex(
+                {
+                    ("GET", "/projects/{id:int}"): ProjectPermissions.view,
+                    ("PUT", "/projects/{name}"): ProjectPermissions.edit,
+                }
+            )
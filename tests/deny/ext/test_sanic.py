@@ -4,17 +4,18 @@ from unittest.mock import ANY
 
 import pytest
 from pytest_mock import MockerFixture
-from sanic import Sanic
+from sanic import Blueprint, Sanic
 from sanic.handlers import ErrorHandler as SanicErrorHandler
 from sanic.models.handler_types import RouteHandler
 from sanic.request import Request
-from sanic.response import HTTPResponse, json
+from sanic.response import BaseHTTPResponse, HTTPResponse, json
 
 from deny import Ability, Action, Policy
 from deny import authorize as policy_authorize
+from deny.context import reset_current_ability, set_current_ability
 from deny.errors import UnauthorizedError
 from deny.ext.errors import AbilityNotFound
-from deny.ext.sanic import authorize
+from deny.ext.sanic import Deny, all_of, any_of, authorize, public, requires
 from tests.utils.permissions import ProjectPermissions
 
 
@@ -36,6 +37,17 @@ class AbilityMiddleware:
         request.ctx.ability = self._ability
 
 
+class ContextAbilityMiddleware:
+    def __init__(self, ability: Ability) -> None:
+        self._ability = ability
+
+    async def set_ability(self, request: Request) -> None:
+        request.ctx.ability_token = set_current_ability(self._ability)
+
+    async def reset_ability(self, request: Request, _: BaseHTTPResponse) -> None:
+        reset_current_ability(request.ctx.ability_token)
+
+
 class ErrorHandler(SanicErrorHandler):
     error: Optional[Exception] = None
 
@@ -109,3 +121,142 @@ class TestAuthorize:
         app.middleware("request")(ability_middleware)
         app.test_client.get("/1")
         assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_uses_ability_of_current_context(self, app: Sanic) -> None:
+        middleware = ContextAbilityMiddleware(
+            ability=Ability(default_action=Action.ALLOW)
+        )
+        app.middleware("request")(middleware.set_ability)
+        app.middleware("response")(middleware.reset_ability)
+        _, response = app.test_client.get("/1")
+        assert response.json == {"id": 1}
+
+    def test_prefers_ability_of_request_to_current_context(
+        self, app: Sanic, error_handler: ErrorHandler
+    ) -> None:
+        middleware = ContextAbilityMiddleware(
+            ability=Ability(default_action=Action.ALLOW)
+        )
+        app.middleware("request")(middleware.set_ability)
+        app.middleware("request")(
+            AbilityMiddleware(ability=Ability(default_action=Action.DENY))
+        )
+        app.middleware("response")(middleware.reset_ability)
+        app.test_client.get("/1")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+
+class ProjectPolicy(Policy):
+    @policy_authorize(ProjectPermissions.view)
+    async def can_view_project(self, project_id: int) -> bool:
+        return project_id == 1
+
+    @policy_authorize(ProjectPermissions.edit)
+    async def can_edit_project(self, project_id: int) -> bool:
+        return project_id == 2
+
+    @policy_authorize(ProjectPermissions.delete)
+    async def can_delete_project(self) -> bool:
+        return False
+
+
+class AbilityFactory:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, request: Request) -> Ability:
+        del request
+        self.calls += 1
+        return Ability(policy=ProjectPolicy())
+
+
+@pytest.fixture
+def ability_factory() -> AbilityFactory:
+    return AbilityFactory()
+
+
+@pytest.fixture
+def deny_app(error_handler: ErrorHandler, ability_factory: AbilityFactory) -> Sanic:
+    sanic_app = Sanic("test_deny")
+    for logger_name in ("sanic.root", "sanic.error", "sanic.access"):
+        logging.getLogger(logger_name).disabled = True
+    sanic_app.error_handler = error_handler
+    deny = Deny(sanic_app, ability_factory=ability_factory)
+    params = {"id": "project_id"}
+
+    @sanic_app.get(
+        "/projects/<id:int>",
+        ctx_deny=any_of(
+            ProjectPermissions.view, ProjectPermissions.edit, params=params
+        ),
+    )
+    async def get_project(request: Request, id: int) -> HTTPResponse:
+        return json({"id": id})
+
+    @sanic_app.put("/projects/<id:int>")
+    @requires(all_of(ProjectPermissions.edit, params=params))
+    async def edit_project(request: Request, id: int) -> HTTPResponse:
+        return json({"id": id})
+
+    @sanic_app.get("/health")
+    async def health(request: Request) -> HTTPResponse:
+        return json({"ok": True})
+
+    admin = Blueprint("admin", url_prefix="/admin")
+
+    @admin.get("/projects")
+    async def list_projects(request: Request) -> HTTPResponse:
+        return json([])
+
+    @admin.get("/health")
+    @public
+    async def admin_health(request: Request) -> HTTPResponse:
+        return json({"ok": True})
+
+    deny.protect_blueprint(admin, ProjectPermissions.delete)
+    sanic_app.blueprint(admin)
+    return sanic_app
+
+
+class TestDeny:
+    @pytest.mark.parametrize("id", [1, 2])
+    def test_any_of_permissions_is_enough(self, deny_app: Sanic, id: int) -> None:
+        _, response = deny_app.test_client.get(f"/projects/{id}")
+        assert response.json == {"id": id}
+
+    def test_raise_error_if_not_authorized(
+        self, deny_app: Sanic, error_handler: ErrorHandler
+    ) -> None:
+        deny_app.test_client.get("/projects/3")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_uses_handler_spec(
+        self, deny_app: Sanic, error_handler: ErrorHandler
+    ) -> None:
+        _, response = deny_app.test_client.put("/projects/2")
+        assert response.json == {"id": 2}
+        deny_app.test_client.put("/projects/1")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_uses_blueprint_default(
+        self, deny_app: Sanic, error_handler: ErrorHandler
+    ) -> None:
+        deny_app.test_client.get("/admin/projects")
+        assert isinstance(error_handler.error, UnauthorizedError)
+
+    def test_does_not_build_ability_for_public_routes(
+        self, deny_app: Sanic, ability_factory: AbilityFactory
+    ) -> None:
+        _, response = deny_app.test_client.get("/health")
+        assert response.json == {"ok": True}
+        _, response = deny_app.test_client.get("/admin/health")
+        assert response.json == {"ok": True}
+        assert ability_factory.calls == 0
+
+    def test_builds_index_once(self, deny_app: Sanic, mocker: MockerFixture) -> None:
+        build_index = mocker.spy(deny_app.ctx.deny, "build_index")
+        # the test client starts the server for each request
+        for id in (1, 2):
+            _, response = deny_app.test_client.get(f"/projects/{id}")
+            assert response.json == {"id": id}
+        build_index.assert_called_once_with(deny_app)
@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, Iterable, Optional
+
+import pytest
+from pytest_mock import MockerFixture
+from werkzeug.test import Client
+
+from deny.context import get_current_ability, use_ability
+from deny.ext.errors import AbilityNotFound
+from deny.ext.wsgi import AuthorizationMiddleware, Environ, StartResponse, all_of
+from deny.sync import Ability, Policy, authorize
+from tests.utils.permissions import ProjectPermissions
+
+
+class UserPolicy(Policy):
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, project_id: int) -> bool:
+        return project_id == 1
+
+    @authorize(ProjectPermissions.edit)
+    def can_edit_project(self, *args: Any, **kwargs: Any) -> bool:
+        del args, kwargs
+        return False
+
+
+class App:
+    environ: Optional[Environ] = None
+    ability: Optional[Ability] = None
+
+    def __call__(
+        self, environ: Environ, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        self.environ = environ
+        self.ability = get_current_ability()
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [json.dumps({"path": environ["PATH_INFO"]}).encode()]
+
+
+@pytest.fixture
+def app() -> App:
+    return App()
+
+
+@pytest.fixture
+def ability() -> Ability:
+    return Ability(policy=UserPolicy())
+
+
+@pytest.fixture
+def routes() -> Dict[Any, Any]:
+    return {
+        ("GET", "/projects/{id:int}"): all_of(
+            ProjectPermissions.view, params={"id": "project_id"}
+        ),
+        ("PUT", "/projects/{id:int}"): ProjectPermissions.edit,
+        ("GET", "/health"): all_of(),
+    }
+
+
+@pytest.fixture
+def client(app: App, ability: Ability, routes: Dict[Any, Any]) -> Client:
+    return Client(
+        AuthorizationMiddleware(app, routes, ability_factory=lambda environ: ability)
+    )
+
+
+class TestAuthorizationMiddleware:
+    def test_passes_path_params_to_access_methods(
+        self, client: Client, app: App, ability: Ability
+    ) -> None:
+        response = client.get("/projects/1")
+        assert response.status_code == 200
+        assert response.json == {"path": "/projects/1"}
+        assert app.ability is ability
+        assert app.environ is not None
+        assert app.environ["deny.ability"] is ability
+
+    def test_returns_403_if_permission_denied(self, client: Client, app: App) -> None:
+        response = client.get("/projects/2")
+        assert response.status_code == 403
+        assert response.text == "Forbidden"
+        assert app.environ is None
+
+        response = client.put("/projects/1")
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize("path", ["/health", "/other"])
+    def test_skips_routes_without_permissions(
+        self, app: App, routes: Dict[Any, Any], mocker: MockerFixture, path: str
+    ) -> None:
+        ability_factory = mocker.Mock()
+        client = Client(
+            AuthorizationMiddleware(app, routes, ability_factory=ability_factory)
+        )
+        assert client.get(path).status_code == 200
+        ability_factory.assert_not_called()
+
+    def test_uses_current_ability(
+        self, app: App, routes: Dict[Any, Any], ability: Ability
+    ) -> None:
+        client = Client(AuthorizationMiddleware(app, routes))
+        with use_ability(ability):
+            assert client.get("/projects/1").status_code == 200
+            assert client.get("/projects/2").status_code == 403
+        assert app.ability is ability
+
+    def test_prefers_ability_factory_to_current_ability(
+        self, client: Client, app: App, ability: Ability
+    ) -> None:
+        with use_ability(Ability(policy=UserPolicy())):
+            assert client.get("/projects/1").status_code == 200
+        assert app.ability is ability
+
+    def test_raise_error_if_ability_not_found(
+        self, app: App, routes: Dict[Any, Any]
+    ) -> None:
+        client = Client(AuthorizationMiddleware(app, routes))
+        with pytest.raises(AbilityNotFound):
+            client.get("/projects/1")
@@ -0,0 +1,172 @@
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from deny.audit import AuditLog, AuditRecord, FileSink, Overflow, SocketSink
+from tests.utils.audit import MemorySink
+from tests.utils.permissions import ProjectPermissions
+
+
+def make_record(allowed: bool = True) -> AuditRecord:
+    return AuditRecord(0.0, "ProjectPermissions.view", allowed, ("1",), {"a": "'b'"})
+
+
+@pytest.fixture
+def sink() -> MemorySink:
+    return MemorySink()
+
+
+class TestAuditLog:
+    def test_writes_records_to_sink_when_closed(self, sink: MemorySink) -> None:
+        audit_log = AuditLog(sink, flush_interval=60)
+        audit_log.record(ProjectPermissions.view, False, (1,), {"a": 2})
+        audit_log.close()
+        assert len(sink.records) == 1
+        record = sink.records[0]
+        assert record.permission == "ProjectPermissions.view"
+        assert record.allowed is False
+        assert record.args == ("1",)
+        assert record.kwargs == {"a": "2"}
+        assert sink.closed is True
+
+    def test_serializes_arguments_when_recording(self, sink: MemorySink) -> None:
+        audit_log = AuditLog(sink, flush_interval=60)
+        project = {"owner_id": 1}
+        audit_log.record(ProjectPermissions.view, False, (project,), {})
+        project["owner_id"] = 2
+        audit_log.close()
+        assert sink.records[0].args == ("{'owner_id': 1}",)
+
+    def test_writes_records_in_batches(self, sink: MemorySink) -> None:
+        batches: List[List[AuditRecord]] = []
+        sink.write = batches.append  # type: ignore
+        audit_log = AuditLog(sink, batch_size=2, flush_interval=60)
+        for _ in range(5):
+            audit_log.record(ProjectPermissions.view, False, (), {})
+        audit_log.close()
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    def test_samples_allowed_decisions(self, sink: MemorySink) -> None:
+        audit_log = AuditLog(sink, allowed_sample_rate=0, flush_interval=60)
+        audit_log.record(ProjectPermissions.view, True, (), {})
+        audit_log.record(ProjectPermissions.view, False, (), {})
+        audit_log.close()
+        assert [record.allowed for record in sink.records] == [False]
+
+    def test_drops_records_when_full(self, sink: MemorySink) -> None:
+        audit_log = AuditLog(
+            sink, max_size=2, batch_size=10, flush_interval=60, overflow=Overflow.DROP
+        )
+        for _ in range(3):
+            audit_log.record(ProjectPermissions.view, False, (), {})
+        assert audit_log.dropped == 1
+        audit_log.close()
+        assert len(sink.records) == 2
+
+    def test_counts_records_dropped_by_all_threads(self, sink: MemorySink) -> None:
+        audit_log = AuditLog(
+            sink, max_size=1, batch_size=10, flush_interval=60, overflow=Overflow.DROP
+        )
+
+        def record() -> None:
+            for _ in range(1000):
+                audit_log.record(ProjectPermissions.view, False, (), {})
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert audit_log.dropped == 3999
+        audit_log.close()
+        assert len(sink.records) == 1
+
+    def test_waits_for_flush_when_full(self, sink: MemorySink) -> None:
+        audit_log = AuditLog(
+            sink, max_size=2, batch_size=10, flush_interval=60, overflow=Overflow.BLOCK
+        )
+        for _ in range(3):
+            audit_log.record(ProjectPermissions.view, False, (), {})
+        audit_log.close()
+        assert audit_log.dropped == 0
+        assert len(sink.records) == 3
+
+    def test_writes_records_of_forked_processes(self, sink: MemorySink) -> None:
+        audit_log = AuditLog(
+            sink, max_size=1, batch_size=10, flush_interval=60, overflow=Overflow.BLOCK
+        )
+        audit_log.record(ProjectPermissions.view, False, (), {})
+        pid = os.fork()
+        if pid == 0:
+            # the child has its own background thread, so it doesn't wait
+            # forever for its buffer to be flushed
+            timer = threading.Timer(5, os._exit, (1,))
+            timer.daemon = True
+            timer.start()
+            for _ in range(3):
+                audit_log.record(ProjectPermissions.edit, False, (), {})
+            audit_log.close()
+            os._exit(0 if len(sink.records) == 3 else 1)
+        _, status = os.waitpid(pid, 0)
+        audit_log.close()
+        assert os.WEXITSTATUS(status) == 0
+        assert [record.permission for record in sink.records] == [
+            "ProjectPermissions.view"
+        ]
+
+    def test_keeps_running_if_sink_fails(self, sink: MemorySink) -> None:
+        def fail(records):
+            raise OSError()
+
+        sink.write = fail  # type: ignore
+        audit_log = AuditLog(sink, flush_interval=60)
+        audit_log.record(ProjectPermissions.view, False, (), {})
+        audit_log.close()
+
+
+class TestFileSink:
+    def test_writes_json_lines(self, tmp_path: Path) -> None:
+        path = tmp_path / "audit.log"
+        sink = FileSink(str(path))
+        sink.write([make_record(), make_record(False)])
+        sink.close()
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines[0] == {
+            "time": 0.0,
+            "permission": "ProjectPermissions.view",
+            "allowed": True,
+            "args": ["1"],
+            "kwargs": {"a": "'b'"},
+        }
+        assert lines[1]["allowed"] is False
+
+    def test_rotates_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "audit.log"
+        sink = FileSink(str(path), max_bytes=1, backup_count=2)
+        for _ in range(3):
+            sink.write([make_record()])
+        sink.close()
+        assert sorted(file.name for file in tmp_path.iterdir()) == [
+            "audit.log",
+            "audit.log.1",
+            "audit.log.2",
+        ]
+        assert path.read_text() == ""
+
+
+class TestSocketSink:
+    def test_sends_records_as_datagram(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "audit.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        server.bind(path)
+        sink = SocketSink(path)
+        sink.write([make_record(), make_record()])
+        sink.close()
+        data = server.recv(65536).decode()
+        server.close()
+        assert len(data.splitlines()) == 2
@@ -0,0 +1,159 @@
+import logging
+import threading
+from typing import List
+
+import pytest
+
+from deny import Ability, Policy, authorize, authorize_batch
+from deny.budget import (
+    BudgetAction,
+    CheckBudget,
+    CheckBudgetWarning,
+    assert_checks,
+    set_default_budget,
+    track_checks,
+)
+from deny.errors import CheckBudgetExceeded
+from deny.sync import Ability as SyncAbility
+from tests.utils.models import Project, User
+from tests.utils.permissions import ProjectPermissions
+
+
+class UserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    @authorize(ProjectPermissions.view)
+    async def can_view_project(self, project: Project) -> bool:
+        return project.owner_id == self._user.id
+
+    @authorize_batch(ProjectPermissions.edit)
+    async def can_edit_projects(self, projects: List[Project]) -> List[bool]:
+        return [project.owner_id == self._user.id for project in projects]
+
+
+@pytest.fixture
+def policy() -> UserPolicy:
+    return UserPolicy(User(id=1))
+
+
+@pytest.fixture
+def projects() -> List[Project]:
+    return [Project(owner_id=owner_id) for owner_id in range(5)]
+
+
+class TestCheckAccount:
+    async def test_counts_checks(
+        self, policy: UserPolicy, projects: List[Project]
+    ) -> None:
+        ability = Ability(policy=policy, budget=CheckBudget())
+        for project in projects:
+            await ability.can(ProjectPermissions.view, project)
+        await ability.can(ProjectPermissions.view, projects[0])
+        # a batch check counts once
+        await ability.can_many(ProjectPermissions.edit, projects)
+
+        account = ability.check_account
+        assert account is not None
+        assert account.checks == 7
+        assert account.time > 0
+        assert account.repeated() == {(ProjectPermissions.view, (projects[0],)): 2}
+        assert account.violations == []
+
+    def test_compares_unhashable_arguments_by_value(self) -> None:
+        ability = SyncAbility(budget=CheckBudget(max_repeats=1))
+        for id in range(3):
+            ability.can(ProjectPermissions.view, {"id": id})
+        account = ability.check_account
+        assert account is not None
+        assert account.violations == []
+        ability.can(ProjectPermissions.view, {"id": 0})
+        assert account.violations == [
+            "ProjectPermissions.view checked 2 times with the same arguments"
+            " (budget: 1), reuse the decision",
+        ]
+
+    async def test_has_no_account_without_budget(self, policy: UserPolicy) -> None:
+        assert Ability(policy=policy).check_account is None
+
+    async def test_logs_exceeded_limits(
+        self,
+        policy: UserPolicy,
+        projects: List[Project],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        budget = CheckBudget(max_checks=2, max_repeats=1, batch_threshold=3)
+        ability = Ability(policy=policy, budget=budget)
+        with caplog.at_level(logging.WARNING, logger="deny.budget"):
+            for project in projects + projects:
+                await ability.can(ProjectPermissions.view, project)
+
+        account = ability.check_account
+        assert account is not None
+        assert account.violations == [
+            "3 checks (budget: 2)",
+            "ProjectPermissions.view checked one by one for 4 objects (budget: 3),"
+            " check them with Ability.can_many() and an @authorize_batch() method",
+            "ProjectPermissions.view checked 2 times with the same arguments"
+            " (budget: 1), reuse the decision",
+        ]
+        # reported once per limit
+        assert len(caplog.records) == 3
+        assert account.report().startswith("10 checks in ")
+
+    async def test_warns_exceeded_limits(self, policy: UserPolicy) -> None:
+        budget = CheckBudget(max_time=0.0, action=BudgetAction.WARN)
+        ability = Ability(policy=policy, budget=budget)
+        with pytest.warns(CheckBudgetWarning, match="spent in access methods"):
+            await ability.can(ProjectPermissions.view, Project(owner_id=1))
+
+    def test_raises_when_exceeded(self, policy: UserPolicy) -> None:
+        ability = SyncAbility(
+            budget=CheckBudget(max_checks=1, action=BudgetAction.RAISE)
+        )
+        ability.can(ProjectPermissions.view)
+        with pytest.raises(CheckBudgetExceeded):
+            ability.can(ProjectPermissions.view)
+
+    async def test_counts_synchronous_checks(self) -> None:
+        ability = Ability(budget=CheckBudget())
+        ability.can_now(ProjectPermissions.view)
+        assert ability.check_account is not None
+        assert ability.check_account.checks == 1
+
+
+class TestTrackChecks:
+    async def test_uses_default_budget(self, policy: UserPolicy) -> None:
+        set_default_budget(CheckBudget(max_checks=0))
+        try:
+            ability = Ability(policy=policy)
+        finally:
+            set_default_budget(None)
+        await ability.can(ProjectPermissions.view, Project(owner_id=1))
+        assert ability.check_account is not None
+        assert ability.check_account.violations == ["1 checks (budget: 0)"]
+
+    def test_collects_accounts_of_threads(self) -> None:
+        def handle_request() -> None:
+            SyncAbility().can(ProjectPermissions.view)
+
+        with track_checks() as accounts:
+            threads = [threading.Thread(target=handle_request) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert [account.checks for account in accounts] == [1, 1, 1]
+        assert SyncAbility().check_account is None
+
+    async def test_asserts_checks(
+        self, policy: UserPolicy, projects: List[Project]
+    ) -> None:
+        with assert_checks(max_checks=1):
+            await Ability(policy=policy).can_many(ProjectPermissions.edit, projects)
+
+        with pytest.raises(AssertionError, match="5 checks"):
+            with assert_checks(max_checks=1):
+                ability = Ability(policy=policy)
+                for project in projects:
+                    await ability.can(ProjectPermissions.view, project)
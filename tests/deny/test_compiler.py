@@ -0,0 +1,93 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from deny import Ability, Action, Permission, Policy, authorize
+from deny.compiler import MAX_INLINED_PERMISSIONS, AsyncCompiler, SyncCompiler
+from deny.errors import UndefinedPermission
+from tests.utils.models import Project
+from tests.utils.permissions import ProjectPermissions, SessionPermissions
+
+
+class MixedPolicy(Policy):
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, project: Project) -> bool:
+        return project.owner_id == 1
+
+    @authorize(ProjectPermissions.edit)
+    async def can_edit_project(self, project: Project) -> bool:
+        return project.owner_id == 1
+
+
+class TestAsyncCompiler:
+    async def test_calls_sync_and_async_access_methods(self) -> None:
+        can = MixedPolicy._compiled_can[Action.DENY]
+        policy = MixedPolicy()
+        assert await can(policy, ProjectPermissions.view, (Project(1),), {}) is True
+        assert (
+            await can(policy, ProjectPermissions.edit, (), {"project": Project(2)})
+            is False
+        )
+
+    @pytest.mark.parametrize(
+        ["action", "expected_result"], [(Action.ALLOW, True), (Action.DENY, False)]
+    )
+    async def test_inlines_default_action(
+        self, action: Action, expected_result: bool
+    ) -> None:
+        can = MixedPolicy._compiled_can[action]
+        result = await can(MixedPolicy(), SessionPermissions.create, (), {})
+        assert result is expected_result
+
+    async def test_raises_undefined_permission(self) -> None:
+        can = MixedPolicy._compiled_can[Action.RAISE]
+        with pytest.raises(UndefinedPermission):
+            await can(MixedPolicy(), SessionPermissions.create, (), {})
+
+    async def test_looks_up_permissions_not_inlined(self) -> None:
+        permissions = [
+            Permission(f"permission_{index}")
+            for index in range(MAX_INLINED_PERMISSIONS + 2)
+        ]
+        access_methods = {permission: "can_view_project" for permission in permissions}
+        can = AsyncCompiler.compile_can(access_methods, frozenset(), Action.DENY)
+
+        class Checker:
+            async def can_view_project(self, project: Project) -> bool:
+                return project.owner_id == 1
+
+        assert await can(Checker(), permissions[-1], (Project(1),), {}) is True
+        assert await can(Checker(), Permission("other"), (Project(1),), {}) is False
+
+    async def test_calls_patched_access_method(self, mocker: MockerFixture) -> None:
+        policy = MixedPolicy()
+        mocker.patch.object(policy, "can_view_project", return_value=False)
+        can = MixedPolicy._compiled_can[Action.DENY]
+        assert await can(policy, ProjectPermissions.view, (Project(1),), {}) is False
+
+
+class TestSyncCompiler:
+    def test_calls_access_methods(self) -> None:
+        can = SyncCompiler.compile_can(
+            {ProjectPermissions.view: "can_view_project"},
+            frozenset([ProjectPermissions.view]),
+            Action.DENY,
+        )
+        policy = MixedPolicy()
+        assert can(policy, ProjectPermissions.view, (Project(1),), {}) is True
+        assert can(policy, ProjectPermissions.edit, (Project(1),), {}) is False
+
+
+class TestAbility:
+    async def test_uses_compiled_check(self, mocker: MockerFixture) -> None:
+        ability = Ability(policy=MixedPolicy())
+        get_access_method = mocker.spy(MixedPolicy, "get_access_method")
+        assert await ability.can(ProjectPermissions.edit, Project(1)) is True
+        get_access_method.assert_not_called()
+
+    async def test_uses_generic_check_if_not_compiled(
+        self, mocker: MockerFixture
+    ) -> None:
+        ability = Ability(policy=MixedPolicy(), compiled=False)
+        get_access_method = mocker.spy(MixedPolicy, "get_access_method")
+        assert await ability.can(ProjectPermissions.edit, Project(1)) is True
+        get_access_method.assert_called_once()
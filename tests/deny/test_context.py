@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from deny import Ability
+from deny.context import (
+    current_ability,
+    get_current_ability,
+    reset_current_ability,
+    set_current_ability,
+    use_ability,
+)
+from deny.errors import AbilityNotFound
+
+
+class TestCurrentAbility:
+    def test_raise_error_if_not_set(self) -> None:
+        with pytest.raises(AbilityNotFound):
+            current_ability()
+
+    def test_returns_ability_set_in_context(self) -> None:
+        ability = Ability()
+        with use_ability(ability):
+            assert current_ability() is ability
+        assert get_current_ability() is None
+
+    def test_restores_previous_ability(self) -> None:
+        outer, inner = Ability(), Ability()
+        token = set_current_ability(outer)
+        with use_ability(inner):
+            assert current_ability() is inner
+        assert current_ability() is outer
+        reset_current_ability(token)
+        assert get_current_ability() is None
+
+    async def test_child_tasks_inherit_ability(self) -> None:
+        ability = Ability()
+
+        async def child() -> Ability:
+            return current_ability()
+
+        with use_ability(ability):
+            assert await asyncio.create_task(child()) is ability
+
+    async def test_child_task_does_not_change_parent_ability(self) -> None:
+        ability = Ability()
+
+        async def child() -> None:
+            set_current_ability(Ability())
+
+        with use_ability(ability):
+            await asyncio.create_task(child())
+            assert current_ability() is ability
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Iterator, List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from deny import Ability, Action
+from deny.executor import ExecutorPolicy
+from deny.sync import Policy, authorize, depends_on, loader
+from tests.utils.models import Project, User
+from tests.utils.permissions import ProjectPermissions
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+class UserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+        self.threads: List[str] = []
+        self.request_ids: List[str] = []
+        self.loaded: List[List[int]] = []
+
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, project: Project) -> bool:
+        self.threads.append(threading.current_thread().name)
+        self.request_ids.append(request_id.get())
+        return self._user.id == project.owner_id
+
+    @loader("members")
+    def load_members(self, owner_ids: List[int]) -> List[List[int]]:
+        self.threads.append(threading.current_thread().name)
+        self.loaded.append(owner_ids)
+        return [[owner_id] for owner_id in owner_ids]
+
+    @authorize(ProjectPermissions.delete)
+    @depends_on(members=lambda project: project.owner_id)
+    def can_delete_project(self, project: Project, members: List[int]) -> bool:
+        return self._user.id in members
+
+
+@pytest.fixture
+def policy() -> UserPolicy:
+    return UserPolicy(User(id=1))
+
+
+@pytest.fixture
+def executor() -> Iterator[ThreadPoolExecutor]:
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test")
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def ability(policy: UserPolicy, executor: ThreadPoolExecutor) -> Ability:
+    return Ability(policy=ExecutorPolicy(policy, executor=executor))
+
+
+class TestCan:
+    async def test_returns_access_method_result(self, ability: Ability) -> None:
+        assert await ability.can(ProjectPermissions.view, Project(1)) is True
+        assert await ability.can(ProjectPermissions.view, Project(2)) is False
+
+    async def test_runs_access_method_in_executor(
+        self, ability: Ability, policy: UserPolicy
+    ) -> None:
+        await ability.can(ProjectPermissions.view, Project(1))
+        assert policy.threads[0].startswith("test")
+
+    async def test_propagates_context_variables(
+        self, ability: Ability, policy: UserPolicy
+    ) -> None:
+        request_id.set("abc")
+        await ability.can(ProjectPermissions.view, Project(1))
+        assert policy.request_ids == ["abc"]
+
+    async def test_uses_default_action_if_permission_not_defined(
+        self, policy: UserPolicy
+    ) -> None:
+        ability = Ability(policy=ExecutorPolicy(policy), default_action=Action.ALLOW)
+        assert await ability.can(ProjectPermissions.edit) is True
+
+    async def test_loads_data_dependencies_in_executor(
+        self, ability: Ability, policy: UserPolicy
+    ) -> None:
+        assert await ability.can(ProjectPermissions.delete, Project(1)) is True
+        assert await ability.can(ProjectPermissions.delete, Project(2)) is False
+        assert policy.loaded == [[1], [2]]
+        assert all(thread.startswith("test") for thread in policy.threads)
+
+
+class TestCanMany:
+    async def test_checks_all_objects_in_a_single_job(
+        self,
+        ability: Ability,
+        executor: ThreadPoolExecutor,
+        mocker: MockerFixture,
+    ) -> None:
+        submit = mocker.spy(executor, "submit")
+        results = await ability.can_many(
+            ProjectPermissions.view, [Project(1), Project(2), Project(1)]
+        )
+        assert results == [True, False, True]
+        submit.assert_called_once()
+
+    async def test_uses_default_action_if_permission_not_defined(
+        self, ability: Ability
+    ) -> None:
+        assert await ability.can_many(ProjectPermissions.edit, [1, 2]) == [
+            False,
+            False,
+        ]
+
+    async def test_loads_data_dependencies_of_all_objects_at_once(
+        self, ability: Ability, policy: UserPolicy
+    ) -> None:
+        results = await ability.can_many(
+            ProjectPermissions.delete, [Project(1), Project(2), Project(1)]
+        )
+        assert results == [True, False, True]
+        assert policy.loaded == [[1, 2]]
+
+
+class TestShutdown:
+    def test_shuts_down_own_executor(self, policy: UserPolicy) -> None:
+        executor_policy = ExecutorPolicy(policy, max_workers=1)
+        executor_policy.shutdown()
+        with pytest.raises(RuntimeError):
+            executor_policy._executor.submit(print)
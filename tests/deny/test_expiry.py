@@ -0,0 +1,169 @@
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+import pytest
+
+from deny import Ability, Policy, authorize
+from deny.expiry import ExpiringGrants, GrantKey, TimingWheel
+from tests.utils.models import Project, User
+from tests.utils.permissions import ProjectPermissions, SessionPermissions
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def grants(clock: Clock) -> ExpiringGrants:
+    return ExpiringGrants(tick=1.0, slots=4, levels=2, clock=clock)
+
+
+class TestTimingWheel:
+    def test_expires_keys_at_their_deadline(self) -> None:
+        wheel: TimingWheel[str] = TimingWheel(slots=4, levels=2)
+        wheel.schedule("a", 3)
+        wheel.schedule("b", 9)
+        wheel.schedule("c", 100)  # beyond the wheel
+        assert wheel.advance(2) == []
+        assert wheel.advance(3) == ["a"]
+        assert wheel.advance(8) == []
+        assert wheel.advance(9) == ["b"]
+        assert wheel.advance(99) == []
+        assert wheel.advance(100) == ["c"]
+        assert len(wheel) == 0
+
+    def test_reschedules_and_cancels_keys(self) -> None:
+        wheel: TimingWheel[str] = TimingWheel(slots=4, levels=2)
+        wheel.schedule("a", 3)
+        wheel.schedule("a", 6)
+        wheel.schedule("b", 4)
+        wheel.cancel("b")
+        assert wheel.advance(5) == []
+        assert wheel.advance(6) == ["a"]
+
+    def test_expires_past_deadlines_at_next_tick(self) -> None:
+        wheel: TimingWheel[str] = TimingWheel()
+        wheel.advance(10)
+        wheel.schedule("a", 5)
+        assert wheel.advance(11) == ["a"]
+
+    def test_matches_deadlines_of_random_schedules(self) -> None:
+        generator = random.Random(0)
+        wheel: TimingWheel[int] = TimingWheel(slots=4, levels=3)
+        deadlines: Dict[int, int] = {}
+        for tick in range(1, 2000):
+            key = generator.randrange(50)
+            deadlines[key] = tick + generator.randrange(1, 200)
+            wheel.schedule(key, deadlines[key])
+            for expired in wheel.advance(tick):
+                assert deadlines.pop(expired) == tick
+            assert all(deadline > tick for deadline in deadlines.values())
+
+
+class TestExpiringGrants:
+    def test_grants_until_expiry(self, grants: ExpiringGrants, clock: Clock) -> None:
+        grants.grant(1, ProjectPermissions.view, "project", ttl=10)
+        assert grants.has(1, ProjectPermissions.view, "project")
+        assert not grants.has(1, ProjectPermissions.view, "other")
+        assert not grants.has(2, ProjectPermissions.view, "project")
+
+        clock.now += 10
+        # expired even before being purged
+        assert not grants.has(1, ProjectPermissions.view, "project")
+
+    def test_grants_any_resource(self, grants: ExpiringGrants, clock: Clock) -> None:
+        grants.grant(1, SessionPermissions.create, expires_at=clock.now + 5)
+        assert grants.has(1, SessionPermissions.create, "session")
+        assert grants.has(1, SessionPermissions.create)
+
+    def test_raise_error_without_expiry(self, grants: ExpiringGrants) -> None:
+        with pytest.raises(ValueError):
+            grants.grant(1, ProjectPermissions.view)
+
+    def test_purges_expired_grants(self, grants: ExpiringGrants, clock: Clock) -> None:
+        expired: List[GrantKey] = []
+        grants.add_listener(expired.append)
+        grants.grant(1, ProjectPermissions.view, "a", ttl=2.5)
+        grants.grant(1, ProjectPermissions.view, "b", ttl=30)
+        grants.grant(1, ProjectPermissions.edit, "a", ttl=2)
+
+        clock.now += 2.9
+        assert grants.purge() == [(1, ProjectPermissions.edit, "a")]
+        clock.now += 0.1
+        assert grants.purge() == [(1, ProjectPermissions.view, "a")]
+        assert len(grants) == 1
+
+        clock.now += 30
+        grants.purge()
+        assert len(grants) == 0
+        assert expired == [
+            (1, ProjectPermissions.edit, "a"),
+            (1, ProjectPermissions.view, "a"),
+            (1, ProjectPermissions.view, "b"),
+        ]
+
+    def test_extends_grant(self, grants: ExpiringGrants, clock: Clock) -> None:
+        grants.grant(1, ProjectPermissions.view, ttl=2)
+        grants.grant(1, ProjectPermissions.view, ttl=20)
+        clock.now += 5
+        assert grants.purge() == []
+        assert grants.has(1, ProjectPermissions.view)
+
+    def test_revokes_grant(self, grants: ExpiringGrants, clock: Clock) -> None:
+        revoked: List[GrantKey] = []
+        grants.add_listener(revoked.append)
+        grants.grant(1, ProjectPermissions.view, ttl=2)
+        grants.revoke(1, ProjectPermissions.view)
+        grants.revoke(1, ProjectPermissions.view)
+        assert not grants.has(1, ProjectPermissions.view)
+        clock.now += 5
+        assert grants.purge() == []
+        assert revoked == [(1, ProjectPermissions.view, None)]
+
+    async def test_purges_periodically(self) -> None:
+        grants = ExpiringGrants(tick=0.01)
+        grants.grant(1, ProjectPermissions.view, ttl=0.01)
+        task = asyncio.ensure_future(grants.purge_periodically())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        assert len(grants) == 0
+
+    def test_purges_in_thread(self) -> None:
+        grants = ExpiringGrants(tick=0.01)
+        grants.grant(1, ProjectPermissions.view, ttl=0.01)
+        thread = grants.start_purge_thread()
+        time.sleep(0.05)
+        grants.stop_purge_thread()
+        thread.join()
+        assert len(grants) == 0
+
+    async def test_checked_by_policy(
+        self, grants: ExpiringGrants, clock: Clock
+    ) -> None:
+        class UserPolicy(Policy):
+            def __init__(self, user: User) -> None:
+                self._user = user
+
+            @authorize(ProjectPermissions.view)
+            def can_view_project(self, project: Project) -> bool:
+                return project.owner_id == self._user.id or grants.has(
+                    self._user.id, ProjectPermissions.view, project.owner_id
+                )
+
+        ability = Ability(policy=UserPolicy(User(id=1)))
+        project = Project(owner_id=2)
+        grants.grant(1, ProjectPermissions.view, 2, ttl=60)
+        assert await ability.can(ProjectPermissions.view, project)
+        clock.now += 60
+        assert not await ability.can(ProjectPermissions.view, project)
@@ -0,0 +1,53 @@
+from deny.fields import FieldProjection, FieldSchema
+from deny.matrix import PermissionMatrix
+from tests.utils.permissions import ProjectPermissions, SessionPermissions
+
+
+class TestFieldSchema:
+    def test_deduplicates_permissions(self) -> None:
+        schema = FieldSchema(
+            {
+                "id": None,
+                "name": ProjectPermissions.view,
+                "owner": ProjectPermissions.view,
+                "budget": [ProjectPermissions.edit, ProjectPermissions.view],
+            }
+        )
+        assert schema.fields == ["id", "name", "owner", "budget"]
+        assert schema.permissions == [ProjectPermissions.view, ProjectPermissions.edit]
+
+    def test_projects_permissions_granted(self) -> None:
+        schema = FieldSchema(
+            {
+                "id": None,
+                "name": ProjectPermissions.view,
+                "budget": [ProjectPermissions.view, SessionPermissions.create],
+            }
+        )
+        matrix = PermissionMatrix(schema.permissions, [0b00, 0b01, 0b11, 0b10])
+        projection = schema.project(matrix)
+        assert len(projection) == 4
+        assert [projection.visible(index) for index in range(4)] == [
+            ("id",),
+            ("id", "name"),
+            ("id", "name", "budget"),
+            ("id",),
+        ]
+
+
+class TestFieldProjection:
+    def test_applies_to_serialized_rows(self) -> None:
+        projection = FieldProjection(["id", "name", "budget"], [0b111, 0b011])
+        assert projection.is_visible(0, "budget")
+        assert not projection.is_visible(1, "budget")
+        assert not projection.is_visible(0, "unknown")
+        assert projection.apply_all(
+            [
+                {"id": 1, "name": "a", "budget": 10},
+                {"id": 2, "name": "b", "budget": 20, "unknown": True},
+            ]
+        ) == [{"id": 1, "name": "a", "budget": 10}, {"id": 2, "name": "b"}]
+
+    def test_skips_fields_missing_from_row(self) -> None:
+        projection = FieldProjection(["id", "name"], [0b11])
+        assert projection.apply(0, {"id": 1}) == {"id": 1}
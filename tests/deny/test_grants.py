@@ -0,0 +1,125 @@
+import multiprocessing
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from deny.grants import (
+    GrantTable,
+    GrantTableFile,
+    build_grant_table,
+    publish_grant_table,
+)
+from deny.permission import Permission
+from tests.utils.permissions import ProjectPermissions, SessionPermissions
+
+
+def build_table(version: int = 0) -> bytes:
+    return build_grant_table(
+        [ProjectPermissions.view, ProjectPermissions.edit, ProjectPermissions.delete],
+        roles={
+            "reader": [ProjectPermissions.view],
+            "editor": [ProjectPermissions.view, ProjectPermissions.edit],
+        },
+        subjects={1: ["reader"], 2: ["editor"], 3: []},
+        grants={3: [ProjectPermissions.delete], 4: [ProjectPermissions.edit]},
+        version=version,
+    )
+
+
+def check_in_child(path: str, results: "multiprocessing.Queue[bool]") -> None:
+    results.put(GrantTable.open(path).has(2, ProjectPermissions.edit))
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> str:
+    path = str(tmp_path / "grants")
+    publish_grant_table(build_table(), path)
+    return path
+
+
+class TestGrantTable:
+    @pytest.mark.parametrize(
+        "subject_id, granted",
+        [
+            (1, [ProjectPermissions.view]),
+            (2, [ProjectPermissions.view, ProjectPermissions.edit]),
+            (3, [ProjectPermissions.delete]),
+            (4, [ProjectPermissions.edit]),
+            (5, []),
+            (0, []),
+        ],
+    )
+    def test_has_permissions_of_roles_and_grants(
+        self, subject_id: int, granted: List[Permission]
+    ) -> None:
+        table = GrantTable(build_table())
+        for permission in (
+            ProjectPermissions.view,
+            ProjectPermissions.edit,
+            ProjectPermissions.delete,
+        ):
+            assert table.has(subject_id, permission) is (permission in granted)
+
+    def test_denies_permission_not_in_table(self) -> None:
+        table = GrantTable(build_table())
+        assert not table.has(2, SessionPermissions.create)
+        assert not table.role_has("editor", SessionPermissions.create)
+
+    def test_role_has_permissions(self) -> None:
+        table = GrantTable(build_table())
+        assert table.role_has("reader", ProjectPermissions.view)
+        assert not table.role_has("reader", ProjectPermissions.edit)
+        assert not table.role_has("admin", ProjectPermissions.view)
+
+    def test_handles_more_than_64_permissions(self) -> None:
+        permissions = [Permission(f"permission_{index}") for index in range(130)]
+        table = GrantTable(
+            build_grant_table(
+                permissions,
+                roles={"last": permissions[128:]},
+                subjects={1: ["last"]},
+                grants={1: [permissions[64]]},
+            )
+        )
+        granted = [index for index, p in enumerate(permissions) if table.has(1, p)]
+        assert granted == [64, 128, 129]
+
+    @pytest.mark.parametrize("data", [b"", b"x" * 64, build_table()[:-8]])
+    def test_raise_error_if_invalid(self, data: bytes) -> None:
+        with pytest.raises(ValueError):
+            GrantTable(data)
+
+    def test_opens_file(self, path: str) -> None:
+        table = GrantTable.open(path)
+        assert table.version == 0
+        assert table.has(2, ProjectPermissions.edit)
+        table.close()
+
+    def test_shares_file_with_child_processes(self, path: str) -> None:
+        context = multiprocessing.get_context("spawn")
+        results: "multiprocessing.Queue[bool]" = context.Queue()
+        process = context.Process(target=check_in_child, args=(path, results))
+        process.start()
+        assert results.get(timeout=30)
+        process.join()
+
+
+class TestGrantTableFile:
+    def test_follows_published_versions(self, path: str) -> None:
+        tables = GrantTableFile(path, check_interval=0)
+        table = tables.get()
+        assert table.version == 0
+        assert tables.get() is table
+
+        publish_grant_table(build_table(version=1), path)
+        new_table = tables.get()
+        assert new_table.version == 1
+        # the previous version remains readable
+        assert table.has(2, ProjectPermissions.edit)
+
+    def test_checks_file_at_interval(self, path: str) -> None:
+        tables = GrantTableFile(path, check_interval=3600)
+        table = tables.get()
+        publish_grant_table(build_table(version=1), path)
+        assert tables.get() is table
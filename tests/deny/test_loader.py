@@ -0,0 +1,112 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from deny.loader import AsyncLoader, SyncLoader
+
+
+class BatchLoad:
+    def __init__(self) -> None:
+        self.calls: List[List[int]] = []
+
+    async def __call__(self, keys: List[int]) -> List[int]:
+        self.calls.append(keys)
+        return [key * 2 for key in keys]
+
+
+class TestAsyncLoader:
+    async def test_batches_concurrent_loads(self) -> None:
+        batch_load = BatchLoad()
+        loader = AsyncLoader(batch_load)
+        assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1)) == [
+            2,
+            4,
+            2,
+        ]
+        assert batch_load.calls == [[1, 2]]
+
+    async def test_memoizes_values(self) -> None:
+        batch_load = BatchLoad()
+        loader = AsyncLoader(batch_load)
+        await loader.load(1)
+        assert await loader.load_many([1, 2]) == [2, 4]
+        assert batch_load.calls == [[1], [2]]
+
+    async def test_accepts_sync_batch_load_function(self) -> None:
+        loader = AsyncLoader(lambda keys: [str(key) for key in keys])
+        assert await loader.load(1) == "1"
+
+    async def test_propagates_error_and_loads_again(self) -> None:
+        calls = []
+
+        def fail(keys: List[int]) -> List[int]:
+            calls.append(keys)
+            raise ValueError()
+
+        loader = AsyncLoader(fail)
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await loader.load(1)
+        assert calls == [[1], [1]]
+
+    @pytest.mark.parametrize("started", [True, False])
+    async def test_cancels_loads_if_batch_load_is_cancelled(
+        self, started: bool
+    ) -> None:
+        calls: List[List[int]] = []
+
+        async def wait_forever(keys: List[int]) -> List[int]:
+            calls.append(keys)
+            await asyncio.Event().wait()
+            return keys
+
+        loader = AsyncLoader(wait_forever)
+        load = asyncio.ensure_future(loader.load(1))
+        while not loader._tasks or (started and not calls):
+            await asyncio.sleep(0)
+        for task in loader._tasks:
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(load, 1)
+        # the key is loaded again by the next caller
+        assert loader._pending == {}
+        load = asyncio.ensure_future(loader.load(1))
+        while len(calls) < (2 if started else 1):
+            await asyncio.sleep(0)
+        load.cancel()
+
+    async def test_raise_error_if_values_do_not_match_keys(self) -> None:
+        loader = AsyncLoader(lambda keys: [])
+        with pytest.raises(ValueError):
+            await loader.load(1)
+
+    async def test_prime_resolves_pending_load(self) -> None:
+        loader = AsyncLoader(BatchLoad())
+        load = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0)
+        loader.prime(1, 42)
+        assert await load == 42
+
+    def test_load_now_raises_error_if_not_loaded(self) -> None:
+        loader = AsyncLoader(BatchLoad())
+        with pytest.raises(KeyError):
+            loader.load_now(1)
+        loader.prime(1, 42)
+        assert loader.load_now(1) == 42
+
+
+class TestSyncLoader:
+    def test_loads_missing_keys_at_once(self) -> None:
+        calls = []
+
+        def batch_load(keys: List[int]) -> List[int]:
+            calls.append(keys)
+            return [key * 2 for key in keys]
+
+        loader = SyncLoader(batch_load)
+        loader.prime(3, 0)
+        assert loader.load(1) == 2
+        assert loader.load_many([1, 2, 2, 3]) == [2, 4, 4, 0]
+        assert loader.load_now(2) == 4
+        assert calls == [[1], [2]]
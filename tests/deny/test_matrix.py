@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from deny.matrix import PermissionMatrix
+from tests.utils.permissions import ProjectPermissions
+
+
+@pytest.fixture
+def matrix() -> PermissionMatrix:
+    return PermissionMatrix(
+        [ProjectPermissions.view, ProjectPermissions.edit], [0b11, 0b01, 0b00]
+    )
+
+
+class TestCan:
+    def test_returns_true_if_bit_is_set(self, matrix: PermissionMatrix) -> None:
+        assert matrix.can(0, ProjectPermissions.edit) is True
+        assert matrix.can(1, ProjectPermissions.view) is True
+
+    def test_returns_false_if_bit_is_not_set(self, matrix: PermissionMatrix) -> None:
+        assert matrix.can(1, ProjectPermissions.edit) is False
+        assert matrix.can(0, ProjectPermissions.delete) is False
+
+
+class TestSerialization:
+    def test_to_json(self, matrix: PermissionMatrix) -> None:
+        assert json.loads(matrix.to_json()) == {
+            "permissions": ["ProjectPermissions.view", "ProjectPermissions.edit"],
+            "masks": [3, 1, 0],
+        }
+
+    def test_to_bytes_uses_one_byte_per_8_permissions(
+        self, matrix: PermissionMatrix
+    ) -> None:
+        assert matrix.to_bytes() == b"\x03\x01\x00"
+
+    def test_from_bytes(self) -> None:
+        permissions = [ProjectPermissions.view] * 9
+        matrix = PermissionMatrix(permissions, [0b100000001, 0b10])
+        data = matrix.to_bytes()
+        assert len(data) == 4
+        assert PermissionMatrix.from_bytes(permissions, data).masks == matrix.masks
@@ -0,0 +1,16 @@
+from deny.page import get_fetch_size
+
+
+class TestGetFetchSize:
+    def test_returns_missing_count_without_observations(self) -> None:
+        assert get_fetch_size(10, 0, 0, 1000) == 10
+
+    def test_adapts_to_allowed_ratio(self) -> None:
+        # about a quarter of the rows are allowed
+        assert get_fetch_size(10, 99, 24, 1000) == 40
+
+    def test_does_not_exceed_max_fetch_size(self) -> None:
+        assert get_fetch_size(10, 99, 0, 50) == 50
+
+    def test_fetches_at_least_one_row(self) -> None:
+        assert get_fetch_size(0, 10, 10, 1000) == 1
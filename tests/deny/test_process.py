@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+from typing import Iterator, List
+
+import pytest
+
+from deny.process import ProcessPolicy
+from deny.sync import Ability, Action, Policy, authorize, authorize_batch
+from tests.utils.models import Project, User
+from tests.utils.permissions import ProjectPermissions
+
+
+class UserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, project: Project) -> bool:
+        return self._user.id == project.owner_id
+
+    @authorize(ProjectPermissions.edit)
+    def can_edit_project(self, project: Project) -> bool:
+        return self._user.id == project.owner_id and os.getpid() > 0
+
+    @authorize_batch(ProjectPermissions.edit)
+    def can_edit_projects(self, projects: List[Project]) -> List[bool]:
+        # the pid tells in which process the check was made
+        return [project.owner_id == os.getpid() for project in projects]
+
+
+@pytest.fixture(scope="module")
+def policy() -> Iterator[ProcessPolicy]:
+    policy = ProcessPolicy(
+        UserPolicy(User(id=1)),
+        max_workers=2,
+        chunk_size=3,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    yield policy
+    policy.shutdown()
+
+
+@pytest.fixture
+def ability(policy: ProcessPolicy) -> Ability:
+    return Ability(policy=policy)
+
+
+class TestCanMany:
+    def test_returns_result_for_each_object(self, ability: Ability) -> None:
+        projects = [Project(owner_id=index % 2) for index in range(10)]
+        assert ability.can_many(ProjectPermissions.view, projects) == [
+            index % 2 == 1 for index in range(10)
+        ]
+
+    def test_runs_batch_access_method_in_workers(self, ability: Ability) -> None:
+        projects = [Project(owner_id=os.getpid())]
+        assert ability.can_many(ProjectPermissions.edit, projects) == [False]
+
+    def test_applies_default_action_for_undefined_permission(
+        self, policy: ProcessPolicy
+    ) -> None:
+        ability = Ability(policy=policy, default_action=Action.ALLOW)
+        assert ability.can_many(ProjectPermissions.delete, [Project(1)]) == [True]
+
+    def test_returns_empty_list_without_objects(self, ability: Ability) -> None:
+        assert ability.can_many(ProjectPermissions.view, []) == []
+
+
+class TestCan:
+    def test_checks_in_current_process(self, ability: Ability) -> None:
+        assert ability.can(ProjectPermissions.view, Project(owner_id=1)) is True
+        assert ability.can(ProjectPermissions.edit, Project(owner_id=1)) is True
@@ -0,0 +1,207 @@
+import asyncio
+import gc
+import threading
+import time
+import weakref
+from typing import Dict, Hashable, List
+
+import pytest
+
+from deny import Ability, Policy, authorize
+from deny.registry import AsyncPolicyRegistry, RegistryStats, SyncPolicyRegistry
+from deny.sync import Policy as SyncPolicy
+from deny.sync import authorize as sync_authorize
+from tests.utils.permissions import ProjectPermissions
+
+# rules of each tenant: the ids of the projects its users can view
+RULES: Dict[Hashable, List[int]] = {"a": [1], "b": [2], "c": [1, 2]}
+
+
+def create_policy_class(tenant: Hashable) -> type:
+    # a Policy subclass created for each tenant, like customized rules
+    project_ids = RULES[tenant]
+
+    class TenantPolicy(Policy):
+        @authorize(ProjectPermissions.view)
+        def can_view_project(self, project_id: int) -> bool:
+            return project_id in project_ids
+
+    return TenantPolicy
+
+
+class Compiler:
+    def __init__(self) -> None:
+        self.tenants: List[Hashable] = []
+
+    async def __call__(self, tenant: Hashable) -> Policy:
+        self.tenants.append(tenant)
+        await asyncio.sleep(0.01)
+        return create_policy_class(tenant)()
+
+
+class SyncCompiler:
+    def __init__(self) -> None:
+        self.tenants: List[Hashable] = []
+
+    def __call__(self, tenant: Hashable) -> SyncPolicy:
+        self.tenants.append(tenant)
+        time.sleep(0.01)
+        project_ids = RULES[tenant]
+
+        class TenantPolicy(SyncPolicy):
+            @sync_authorize(ProjectPermissions.view)
+            def can_view_project(self, project_id: int) -> bool:
+                return project_id in project_ids
+
+        return TenantPolicy()
+
+
+@pytest.fixture
+def compiler() -> Compiler:
+    return Compiler()
+
+
+@pytest.fixture
+def registry(compiler: Compiler) -> AsyncPolicyRegistry:
+    return AsyncPolicyRegistry(compiler, max_size=2)
+
+
+class TestAsyncPolicyRegistry:
+    async def test_builds_ability_of_tenant(
+        self, registry: AsyncPolicyRegistry
+    ) -> None:
+        ability = await registry.ability("a")
+        assert isinstance(ability, Ability)
+        assert await ability.can(ProjectPermissions.view, 1)
+        assert not await ability.can(ProjectPermissions.view, 2)
+        assert await (await registry.ability("b")).can(ProjectPermissions.view, 2)
+
+    async def test_compiles_once_for_concurrent_requests(
+        self, registry: AsyncPolicyRegistry, compiler: Compiler
+    ) -> None:
+        policies = await asyncio.gather(*[registry.get("a") for _ in range(10)])
+        assert compiler.tenants == ["a"]
+        assert all(policy is policies[0] for policy in policies)
+        assert await registry.get("a") is policies[0]
+
+    async def test_evicts_least_recently_used(
+        self, registry: AsyncPolicyRegistry, compiler: Compiler
+    ) -> None:
+        await registry.get("a")
+        await registry.get("b")
+        await registry.get("a")
+        await registry.get("c")  # evicts "b"
+        await registry.get("a")
+        await registry.get("b")
+        assert compiler.tenants == ["a", "b", "c", "b"]
+        assert registry.stats().evictions == 2
+
+    async def test_releases_evicted_policy_classes(
+        self, registry: AsyncPolicyRegistry
+    ) -> None:
+        policy_class = weakref.ref(type(await registry.get("a")))
+        await registry.get("b")
+        await registry.get("c")
+        gc.collect()
+        assert policy_class() is None
+
+    async def test_bounds_memory(self, compiler: Compiler) -> None:
+        registry = AsyncPolicyRegistry(
+            compiler, max_memory=100, get_size=lambda policy: 40
+        )
+        for tenant in ("a", "b", "c"):
+            await registry.get(tenant)
+        stats = registry.stats()
+        assert (stats.size, stats.memory, stats.evictions) == (2, 80, 1)
+
+    async def test_invalidates_tenant(
+        self, registry: AsyncPolicyRegistry, compiler: Compiler
+    ) -> None:
+        await registry.get("a")
+        registry.invalidate("a")
+        await registry.get("a")
+        registry.clear()
+        await registry.get("a")
+        assert compiler.tenants == ["a", "a", "a"]
+
+    async def test_does_not_cache_policy_invalidated_while_compiled(
+        self, registry: AsyncPolicyRegistry, compiler: Compiler
+    ) -> None:
+        stale = asyncio.ensure_future(registry.get("a"))
+        await asyncio.sleep(0)
+        registry.invalidate("a")
+        # a request arriving after the invalidation compiles the policy again
+        policy = await registry.get("a")
+        assert await stale is not policy
+        assert await registry.get("a") is policy
+        assert compiler.tenants == ["a", "a"]
+
+    async def test_forgets_generations_once_no_compilation_is_awaited(
+        self, registry: AsyncPolicyRegistry
+    ) -> None:
+        for tenant in ("a", "b", "c"):
+            compilation = asyncio.ensure_future(registry.get(tenant))
+            await asyncio.sleep(0)
+            registry.invalidate(tenant)
+            await compilation
+            registry.invalidate(tenant)
+        with pytest.raises(KeyError):
+            await registry.get("unknown")
+        assert registry._cache._generations == {}
+        assert registry._cache._waiting == {}
+
+    async def test_exposes_stats(self, registry: AsyncPolicyRegistry) -> None:
+        for tenant in ("a", "a", "a", "b"):
+            await registry.get(tenant)
+        stats = registry.stats()
+        assert stats.hits == 2
+        assert stats.misses == 2
+        assert stats.hit_ratio == 0.5
+        assert stats.compilations == 2
+        assert stats.compile_time >= 0.02
+        assert stats.size == 2
+
+    async def test_does_not_cache_failed_compilation(
+        self, registry: AsyncPolicyRegistry
+    ) -> None:
+        with pytest.raises(KeyError):
+            await registry.get("unknown")
+        assert registry.stats().size == 0
+
+    def test_raise_error_if_memory_not_measured(self, compiler: Compiler) -> None:
+        with pytest.raises(ValueError):
+            AsyncPolicyRegistry(compiler, max_memory=100)
+
+
+class TestSyncPolicyRegistry:
+    def test_compiles_once_for_concurrent_threads(self) -> None:
+        compiler = SyncCompiler()
+        registry = SyncPolicyRegistry(compiler, max_size=2)
+        policies: List[SyncPolicy] = []
+        threads = [
+            threading.Thread(target=lambda: policies.append(registry.get("c")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert compiler.tenants == ["c"]
+        assert all(policy is policies[0] for policy in policies)
+        assert registry.ability("c").can(ProjectPermissions.view, 2)
+
+    def test_evicts_least_recently_used(self) -> None:
+        compiler = SyncCompiler()
+        registry = SyncPolicyRegistry(compiler, max_size=1)
+        for tenant in ("a", "a", "b", "a"):
+            registry.get(tenant)
+        assert compiler.tenants == ["a", "b", "a"]
+        assert registry.stats() == RegistryStats(
+            hits=1,
+            misses=3,
+            evictions=2,
+            compilations=3,
+            compile_time=registry.stats().compile_time,
+            size=1,
+            memory=0,
+        )
@@ -0,0 +1,236 @@
+import asyncio
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List
+
+import pytest
+
+from deny import Ability, Action, Policy, authorize, authorize_batch
+from deny.errors import SidecarError, UndefinedPermission
+from deny.sidecar import (
+    AsyncSidecarClient,
+    SidecarPolicy,
+    SidecarServer,
+    SyncSidecarClient,
+    SyncSidecarPolicy,
+)
+from deny.sync import Ability as SyncAbility
+from tests.utils.permissions import ProjectPermissions, SessionPermissions
+
+
+class UserPolicy(Policy):
+    def __init__(self) -> None:
+        self.batches: List[List[int]] = []
+
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, project_id: int, user_id: int = 0) -> bool:
+        return project_id == user_id
+
+    @authorize_batch(ProjectPermissions.view)
+    async def can_view_projects(
+        self, project_ids: List[int], user_id: int = 0
+    ) -> List[bool]:
+        self.batches.append(project_ids)
+        return [project_id == user_id for project_id in project_ids]
+
+    @authorize(ProjectPermissions.edit)
+    async def can_edit_project(self, project_id: int) -> bool:
+        if project_id < 0:
+            raise ValueError("Invalid id")
+        return project_id == 1
+
+    @authorize(SessionPermissions.create)
+    def can_create_session(self) -> bool:
+        return True
+
+    @authorize_batch(SessionPermissions.delete)
+    def can_delete_sessions(self, session_ids: List[int]) -> List[bool]:
+        # returns too few results
+        return []
+
+
+@pytest.fixture
+def user_policy() -> UserPolicy:
+    return UserPolicy()
+
+
+@pytest.fixture
+def path(user_policy: UserPolicy) -> Iterator[str]:
+    # the server runs in its own thread, like in another process
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "deny.sock")
+        loop = asyncio.new_event_loop()
+        server = SidecarServer({"UserPolicy": user_policy}, batch_window=0.01)
+        loop.run_until_complete(server.start(path))
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        yield path
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(server.close())
+        loop.close()
+
+
+@pytest.fixture
+async def client(path: str) -> AsyncIterator[AsyncSidecarClient]:
+    client = AsyncSidecarClient(path, pool_size=2)
+    yield client
+    await client.close()
+
+
+@pytest.fixture
+def ability(client: AsyncSidecarClient) -> Ability:
+    return Ability(policy=SidecarPolicy(client, UserPolicy))
+
+
+@pytest.fixture
+def sync_client(path: str) -> Iterator[SyncSidecarClient]:
+    client = SyncSidecarClient(path, pool_size=2)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def sync_ability(sync_client: SyncSidecarClient) -> SyncAbility:
+    return SyncAbility(policy=SyncSidecarPolicy(sync_client, UserPolicy))
+
+
+class TestSidecarPolicy:
+    async def test_checks_permissions_in_server(self, ability: Ability) -> None:
+        assert await ability.can(ProjectPermissions.view, 1, user_id=1)
+        assert not await ability.can(ProjectPermissions.view, 2, user_id=1)
+        assert await ability.can(ProjectPermissions.edit, 1)
+        assert await ability.can(SessionPermissions.create)
+
+    async def test_coalesces_concurrent_checks(
+        self, ability: Ability, user_policy: UserPolicy
+    ) -> None:
+        results = await asyncio.gather(
+            *[ability.can(ProjectPermissions.view, id, user_id=1) for id in range(6)],
+            ability.can(ProjectPermissions.view, 1, user_id=2),
+        )
+        assert results == [False, True, False, False, False, False, False]
+        assert sorted(map(sorted, user_policy.batches)) == [[0, 1, 2, 3, 4, 5], [1]]
+
+    async def test_can_many_sends_single_request(
+        self, ability: Ability, user_policy: UserPolicy
+    ) -> None:
+        results = await ability.can_many(ProjectPermissions.view, [1, 2, 1], user_id=1)
+        assert results == [True, False, True]
+        assert user_policy.batches == [[1, 2, 1]]
+
+    async def test_uses_default_action_for_undefined_permission(
+        self, client: AsyncSidecarClient
+    ) -> None:
+        policy = SidecarPolicy(client, UserPolicy)
+        assert not await Ability(policy=policy).can(ProjectPermissions.delete)
+        with pytest.raises(UndefinedPermission):
+            await Ability(policy=policy, default_action=Action.RAISE).can(
+                ProjectPermissions.delete
+            )
+
+    async def test_raise_error_if_access_method_fails(self, ability: Ability) -> None:
+        with pytest.raises(SidecarError, match="ValueError: Invalid id"):
+            await ability.can(ProjectPermissions.edit, -1)
+
+    async def test_raise_error_if_policy_not_served(
+        self, client: AsyncSidecarClient
+    ) -> None:
+        ability = Ability(policy=SidecarPolicy(client, UserPolicy, name="Other"))
+        with pytest.raises(SidecarError, match="Policy Other is not served"):
+            await ability.can(ProjectPermissions.edit, 1)
+
+    async def test_raise_error_if_argument_not_builtin(self, ability: Ability) -> None:
+        with pytest.raises(ValueError):
+            await ability.can(ProjectPermissions.edit, object())
+
+    async def test_raise_error_if_request_invalid(
+        self, client: AsyncSidecarClient
+    ) -> None:
+        name = ProjectPermissions.view.name
+        with pytest.raises(SidecarError, match="Invalid request"):
+            await client.check("UserPolicy", name, 1, {})  # type: ignore[arg-type]
+        with pytest.raises(SidecarError, match="Invalid request"):
+            await client.check("UserPolicy", name, (1,), {1: 1})  # type: ignore
+        # the connection still answers the next requests
+        assert await client.check("UserPolicy", name, (1,), {"user_id": 1})
+
+    async def test_answers_every_request_if_batch_method_returns_too_few(
+        self, client: AsyncSidecarClient
+    ) -> None:
+        name = SessionPermissions.delete.name
+        results = await asyncio.gather(
+            *[client.check("UserPolicy", name, (id,), {}) for id in range(3)],
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, SidecarError) for result in results)
+
+    async def test_raise_error_if_server_not_running(self) -> None:
+        client = AsyncSidecarClient("/nonexistent/deny.sock")
+        ability = Ability(policy=SidecarPolicy(client, UserPolicy))
+        with pytest.raises(SidecarError):
+            await ability.can(ProjectPermissions.edit, 1)
+
+
+class TestSyncSidecarPolicy:
+    def test_checks_permissions_in_server(self, sync_ability: SyncAbility) -> None:
+        assert sync_ability.can(ProjectPermissions.view, 1, user_id=1)
+        assert not sync_ability.can(ProjectPermissions.view, 2, user_id=1)
+        assert sync_ability.can(ProjectPermissions.edit, 1)
+        assert not sync_ability.can(ProjectPermissions.delete)
+
+    def test_can_many_sends_single_request(
+        self, sync_ability: SyncAbility, user_policy: UserPolicy
+    ) -> None:
+        results = sync_ability.can_many(ProjectPermissions.view, [1, 2], user_id=2)
+        assert results == [False, True]
+        assert user_policy.batches == [[1, 2]]
+
+    def test_reuses_connections(
+        self, sync_ability: SyncAbility, sync_client: SyncSidecarClient
+    ) -> None:
+        for id in range(5):
+            sync_ability.can(ProjectPermissions.edit, id)
+        assert len(sync_client._idle_connections) == 1
+
+    def test_shares_client_between_threads(self, sync_ability: SyncAbility) -> None:
+        results: List[bool] = []
+
+        def check(id: int) -> None:
+            results.append(sync_ability.can(ProjectPermissions.view, id, user_id=id))
+
+        threads = [threading.Thread(target=check, args=(id,)) for id in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [True] * 8
+
+    def test_raise_error_if_access_method_fails(
+        self, sync_ability: SyncAbility, sync_client: SyncSidecarClient
+    ) -> None:
+        with pytest.raises(SidecarError, match="ValueError: Invalid id"):
+            sync_ability.can(ProjectPermissions.edit, -1)
+        # the connection is still usable after an error of the server
+        assert sync_ability.can(ProjectPermissions.edit, 1)
+        assert len(sync_client._idle_connections) == 1
+
+
+class TestSidecarServer:
+    async def test_creates_socket_only_accessible_to_current_user(
+        self, tmp_path: Path, user_policy: UserPolicy
+    ) -> None:
+        path = str(tmp_path / "deny.sock")
+        umask = os.umask(0o022)
+        server = SidecarServer({"UserPolicy": user_policy})
+        try:
+            await server.start(path)
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            # the umask of the process is restored
+            assert os.umask(0o022) == 0o022
+        finally:
+            os.umask(umask)
+            await server.close()
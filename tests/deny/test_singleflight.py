@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from typing import Any, List
+
+import pytest
+
+from deny import Ability, Policy, authorize
+from deny.singleflight import AsyncSingleFlight, SyncSingleFlight, get_call_key
+from tests.utils.models import Project
+from tests.utils.permissions import ProjectPermissions
+
+
+class SlowPolicy(Policy):
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    @authorize(ProjectPermissions.view)
+    async def can_view_project(self, project: Project) -> bool:
+        self.calls += 1
+        await self.release.wait()
+        return project.owner_id == 1
+
+
+class TestGetCallKey:
+    def test_returns_same_key_for_same_call(self) -> None:
+        policy = object()
+        assert get_call_key(
+            policy, ProjectPermissions.view, (1,), {"a": 2}
+        ) == get_call_key(policy, ProjectPermissions.view, (1,), {"a": 2})
+
+    def test_returns_none_if_argument_is_not_hashable(self) -> None:
+        assert get_call_key(object(), ProjectPermissions.view, ([],), {}) is None
+
+
+class TestAsyncSingleFlight:
+    async def test_concurrent_calls_share_result(self) -> None:
+        single_flight = AsyncSingleFlight()
+        policy = SlowPolicy()
+        ability = Ability(policy=policy, single_flight=single_flight)
+        project = Project(1)
+        checks = [
+            asyncio.ensure_future(ability.can(ProjectPermissions.view, project))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        policy.release.set()
+        assert await asyncio.gather(*checks) == [True, True, True]
+        assert policy.calls == 1
+
+    async def test_calls_again_once_done(self) -> None:
+        policy = SlowPolicy()
+        policy.release.set()
+        ability = Ability(policy=policy, single_flight=AsyncSingleFlight())
+        project = Project(1)
+        await ability.can(ProjectPermissions.view, project)
+        await ability.can(ProjectPermissions.view, project)
+        assert policy.calls == 2
+
+    async def test_propagates_exception_to_all_callers(self) -> None:
+        single_flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fail() -> Any:
+            await release.wait()
+            raise ValueError()
+
+        calls = [asyncio.ensure_future(single_flight.run("key", fail)) for _ in "ab"]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+    async def test_cancelling_a_caller_does_not_cancel_the_others(self) -> None:
+        single_flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def wait() -> bool:
+            await release.wait()
+            return True
+
+        first = asyncio.ensure_future(single_flight.run("key", wait))
+        second = asyncio.ensure_future(single_flight.run("key", wait))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second is True
+        assert first.cancelled()
+
+    async def test_cancelling_all_callers_cancels_the_call(self) -> None:
+        single_flight = AsyncSingleFlight()
+        started: List[bool] = []
+
+        async def wait() -> bool:
+            started.append(True)
+            await asyncio.Event().wait()
+            return True
+
+        caller = asyncio.ensure_future(single_flight.run("key", wait))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        assert started == [True]
+        assert single_flight._calls == {}
+
+    async def test_call_after_cancelling_all_callers_starts_a_new_call(self) -> None:
+        single_flight = AsyncSingleFlight()
+        calls: List[bool] = []
+
+        async def wait() -> bool:
+            calls.append(True)
+            await asyncio.Event().wait()
+            return True
+
+        async def get() -> bool:
+            calls.append(True)
+            return False
+
+        caller = asyncio.ensure_future(single_flight.run("key", wait))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        # the cancelled call is not done yet
+        assert await single_flight.run("key", get) is False
+        assert calls == [True, True]
+        await asyncio.sleep(0)
+        assert single_flight._calls == {}
+
+
+class TestSyncSingleFlight:
+    def test_concurrent_calls_share_result(self) -> None:
+        single_flight = SyncSingleFlight()
+        release = threading.Event()
+        calls: List[bool] = []
+        results: List[int] = []
+
+        def call() -> int:
+            calls.append(True)
+            release.wait()
+            return 42
+
+        threads = [
+            threading.Thread(target=lambda: results.append(single_flight.run(1, call)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        # let the other threads wait for the first call
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert results == [42, 42, 42]
+        assert calls == [True]
+
+    def test_propagates_exception(self) -> None:
+        def fail() -> int:
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            SyncSingleFlight().run(1, fail)
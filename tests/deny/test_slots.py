@@ -0,0 +1,53 @@
+import pickle
+
+from deny import Ability, Policy, authorize
+from deny.errors import UnauthorizedError, UndefinedPermission
+from tests.utils.models import Project, User
+from tests.utils.permissions import ProjectPermissions
+
+
+class SlottedPolicy(Policy):
+    __slots__ = ("_user",)
+
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    @authorize(ProjectPermissions.view)
+    async def can_view_project(self, project: Project) -> bool:
+        return self._user.id == project.owner_id
+
+
+class TestSlottedPolicy:
+    def test_has_no_dict(self) -> None:
+        assert not hasattr(SlottedPolicy(User(id=1)), "__dict__")
+
+    def test_registers_access_methods(self) -> None:
+        assert SlottedPolicy._access_methods == {
+            ProjectPermissions.view: "can_view_project"
+        }
+
+    async def test_checks_permissions(self) -> None:
+        ability = Ability(policy=SlottedPolicy(User(id=1)))
+        assert await ability.can(ProjectPermissions.view, Project(1)) is True
+        assert await ability.can(ProjectPermissions.view, Project(2)) is False
+
+
+class TestAbility:
+    def test_has_no_dict(self) -> None:
+        assert not hasattr(Ability(), "__dict__")
+
+
+class TestErrors:
+    def test_unauthorized_error_message(self) -> None:
+        error = UnauthorizedError(ProjectPermissions.view)
+        assert str(error) == "Access denied for permission ProjectPermissions.view"
+
+    def test_undefined_permission_message(self) -> None:
+        error = UndefinedPermission(ProjectPermissions.view)
+        assert str(error) == (
+            "Permission ProjectPermissions.view was not set in this policy"
+        )
+
+    def test_errors_can_be_pickled(self) -> None:
+        error = pickle.loads(pickle.dumps(UnauthorizedError(ProjectPermissions.view)))
+        assert str(error) == "Access denied for permission ProjectPermissions.view"
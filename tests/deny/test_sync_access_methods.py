@@ -0,0 +1,41 @@
+import pytest
+
+from deny import Ability, Policy, authorize
+from deny.errors import AccessMethodNotSync
+from tests.utils.models import Project
+from tests.utils.permissions import ProjectPermissions
+
+
+class MixedPolicy(Policy):
+    @authorize(ProjectPermissions.view)
+    def can_view_project(self, project: Project) -> bool:
+        return project.owner_id == 1
+
+    @authorize(ProjectPermissions.edit)
+    async def can_edit_project(self, project: Project) -> bool:
+        return project.owner_id == 1
+
+
+@pytest.fixture
+def ability() -> Ability:
+    return Ability(policy=MixedPolicy())
+
+
+class TestMetaclass:
+    def test_register_sync_access_methods(self) -> None:
+        assert MixedPolicy._sync_access_methods == frozenset([ProjectPermissions.view])
+
+
+class TestCan:
+    async def test_calls_sync_access_method(self, ability: Ability) -> None:
+        assert await ability.can(ProjectPermissions.view, Project(1)) is True
+        assert await ability.can(ProjectPermissions.view, Project(2)) is False
+
+    async def test_awaits_async_access_method(self, ability: Ability) -> None:
+        assert await ability.can(ProjectPermissions.edit, Project(1)) is True
+
+
+class TestCanNow:
+    def test_raise_error_if_access_method_is_async(self, ability: Ability) -> None:
+        with pytest.raises(AccessMethodNotSync):
+            ability.can_now(ProjectPermissions.edit, Project(1))
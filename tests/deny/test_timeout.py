@@ -0,0 +1,203 @@
+import asyncio
+import time
+from typing import List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from deny import Ability, Action, Policy, authorize, authorize_batch
+from deny.errors import AccessMethodTimeout, CircuitBreakerOpen
+from deny.timeout import CircuitBreaker, deadline, get_deadline, get_timeout
+from tests.utils.permissions import ProjectPermissions
+
+
+class SlowPolicy(Policy):
+    def __init__(self, delay: float) -> None:
+        self._delay = delay
+        self.calls = 0
+
+    @authorize(ProjectPermissions.view)
+    async def can_view_project(self) -> bool:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return True
+
+    @authorize(ProjectPermissions.edit)
+    def can_edit_project(self) -> bool:
+        self.calls += 1
+        time.sleep(self._delay)
+        return True
+
+    @authorize_batch(ProjectPermissions.view)
+    async def can_view_projects(self, ids: List[int]) -> List[bool]:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return [True for _ in ids]
+
+    @authorize_batch(ProjectPermissions.edit)
+    def can_edit_projects(self, ids: List[int]) -> List[bool]:
+        self.calls += 1
+        time.sleep(self._delay)
+        return [True for _ in ids]
+
+
+class TestDeadline:
+    def test_sets_deadline_in_context(self) -> None:
+        assert get_deadline() is None
+        with deadline(10):
+            assert get_deadline() is not None
+        assert get_deadline() is None
+
+    def test_nested_deadline_can_not_extend_current_one(self) -> None:
+        with deadline(1):
+            current = get_deadline()
+            with deadline(10):
+                assert get_deadline() == current
+
+    def test_get_timeout_returns_time_left_before_deadline(self) -> None:
+        assert get_timeout(5) == 5
+        with deadline(1):
+            timeout = get_timeout(5)
+            assert timeout is not None and timeout <= 1
+
+
+class TestCan:
+    async def test_returns_result_if_access_method_is_fast_enough(self) -> None:
+        ability = Ability(policy=SlowPolicy(0), timeout=1)
+        assert await ability.can(ProjectPermissions.view) is True
+
+    async def test_uses_timeout_action_on_timeout(self) -> None:
+        ability = Ability(
+            policy=SlowPolicy(1), timeout=0.01, timeout_action=Action.ALLOW
+        )
+        assert await ability.can(ProjectPermissions.view) is True
+        ability = Ability(policy=SlowPolicy(1), timeout=0.01)
+        assert await ability.can(ProjectPermissions.view) is False
+
+    async def test_raise_error_on_timeout_if_timeout_action_is_raise(self) -> None:
+        ability = Ability(
+            policy=SlowPolicy(1), timeout=0.01, timeout_action=Action.RAISE
+        )
+        with pytest.raises(AccessMethodTimeout):
+            await ability.can(ProjectPermissions.view)
+
+    async def test_uses_permission_timeout(self) -> None:
+        ability = Ability(
+            policy=SlowPolicy(0.05),
+            timeout=0.01,
+            timeouts={ProjectPermissions.view: 1},
+        )
+        assert await ability.can(ProjectPermissions.view) is True
+
+    async def test_uses_deadline(self) -> None:
+        ability = Ability(policy=SlowPolicy(1))
+        with deadline(0.01):
+            assert await ability.can(ProjectPermissions.view) is False
+
+    async def test_does_not_call_access_method_once_deadline_passed(self) -> None:
+        policy = SlowPolicy(0)
+        ability = Ability(policy=policy)
+        with deadline(0):
+            assert await ability.can(ProjectPermissions.edit) is False
+        assert policy.calls == 0
+
+    async def test_sync_access_method_exceeding_timeout(self) -> None:
+        ability = Ability(policy=SlowPolicy(0.02), timeout=0.01)
+        assert await ability.can(ProjectPermissions.edit) is False
+
+    async def test_stops_calling_access_method_once_circuit_is_open(self) -> None:
+        policy = SlowPolicy(1)
+        ability = Ability(
+            policy=policy,
+            timeout=0.01,
+            timeout_action=Action.RAISE,
+            circuit_breaker=CircuitBreaker(failure_threshold=2),
+        )
+        for _ in range(2):
+            with pytest.raises(AccessMethodTimeout):
+                await ability.can(ProjectPermissions.view)
+        with pytest.raises(CircuitBreakerOpen):
+            await ability.can(ProjectPermissions.view)
+        assert policy.calls == 2
+
+
+class TestCanMany:
+    async def test_returns_results_if_batch_access_method_is_fast_enough(
+        self,
+    ) -> None:
+        ability = Ability(policy=SlowPolicy(0), timeout=1)
+        assert await ability.can_many(ProjectPermissions.view, [1, 2]) == [True, True]
+
+    async def test_uses_timeout_action_for_all_objects_on_timeout(self) -> None:
+        ability = Ability(
+            policy=SlowPolicy(1), timeout=0.01, timeout_action=Action.ALLOW
+        )
+        assert await ability.can_many(ProjectPermissions.view, [1, 2]) == [True, True]
+        ability = Ability(policy=SlowPolicy(1), timeout=0.01)
+        assert await ability.can_many(ProjectPermissions.view, [1, 2]) == [
+            False,
+            False,
+        ]
+
+    async def test_uses_deadline(self) -> None:
+        ability = Ability(policy=SlowPolicy(1))
+        with deadline(0.01):
+            assert await ability.can_many(ProjectPermissions.view, [1, 2]) == [
+                False,
+                False,
+            ]
+
+    async def test_sync_batch_access_method_exceeding_deadline(self) -> None:
+        policy = SlowPolicy(0.02)
+        ability = Ability(policy=policy)
+        with deadline(0.01):
+            assert await ability.can_many(ProjectPermissions.edit, [1]) == [False]
+            assert await ability.can_many(ProjectPermissions.edit, [1]) == [False]
+        # the second call is not made once the deadline passed
+        assert policy.calls == 1
+
+    async def test_stops_calling_batch_access_method_once_circuit_is_open(
+        self,
+    ) -> None:
+        policy = SlowPolicy(1)
+        ability = Ability(
+            policy=policy,
+            timeout=0.01,
+            timeout_action=Action.RAISE,
+            circuit_breaker=CircuitBreaker(failure_threshold=2),
+        )
+        for _ in range(2):
+            with pytest.raises(AccessMethodTimeout):
+                await ability.can_many(ProjectPermissions.view, [1, 2])
+        with pytest.raises(CircuitBreakerOpen):
+            await ability.can_many(ProjectPermissions.view, [1, 2])
+        assert policy.calls == 2
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self) -> None:
+        circuit_breaker = CircuitBreaker(failure_threshold=2)
+        circuit_breaker.record_failure(ProjectPermissions.view)
+        assert circuit_breaker.is_open(ProjectPermissions.view) is False
+        circuit_breaker.record_failure(ProjectPermissions.view)
+        assert circuit_breaker.is_open(ProjectPermissions.view) is True
+        assert circuit_breaker.is_open(ProjectPermissions.edit) is False
+
+    def test_success_resets_failures(self) -> None:
+        circuit_breaker = CircuitBreaker(failure_threshold=2)
+        circuit_breaker.record_failure(ProjectPermissions.view)
+        circuit_breaker.record_success(ProjectPermissions.view)
+        circuit_breaker.record_failure(ProjectPermissions.view)
+        assert circuit_breaker.is_open(ProjectPermissions.view) is False
+
+    def test_lets_a_single_call_through_after_reset_timeout(
+        self, mocker: MockerFixture
+    ) -> None:
+        monotonic = mocker.patch("deny.timeout.time.monotonic", return_value=0)
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        circuit_breaker.record_failure(ProjectPermissions.view)
+        monotonic.return_value = 11
+        assert circuit_breaker.is_open(ProjectPermissions.view) is False
+        assert circuit_breaker.is_open(ProjectPermissions.view) is True
+        circuit_breaker.record_success(ProjectPermissions.view)
+        assert circuit_breaker.is_open(ProjectPermissions.view) is False
@@ -0,0 +1,250 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from pathlib import Path
+from typing import Hashable, List
+
+import pytest
+
+from deny import Ability, Action, Policy, authorize, authorize_batch
+from deny.replay import format_report, main, replay_trace
+from deny.sync import Ability as SyncAbility
+from deny.sync import Policy as SyncPolicy
+from deny.sync import authorize as sync_authorize
+from deny.trace import TraceRecord, TraceRecorder, read_trace
+from tests.utils.models import Project, User
+from tests.utils.permissions import ProjectPermissions, SessionPermissions
+
+
+class UserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self.user = user
+
+    @authorize(ProjectPermissions.view)
+    async def can_view_project(self, project: Project) -> bool:
+        return project.owner_id == self.user.id
+
+    @authorize(ProjectPermissions.edit)
+    def can_edit_project(self, project: Project) -> bool:
+        return project.owner_id == self.user.id
+
+
+class NextUserPolicy(SyncPolicy):
+    # the next version of the policy, users can view all the projects
+    def __init__(self, user: User) -> None:
+        self.user = user
+
+    @sync_authorize(ProjectPermissions.view)
+    def can_view_project(self, project: Project) -> bool:
+        return True
+
+    @sync_authorize(ProjectPermissions.edit)
+    def can_edit_project(self, project: Project) -> bool:
+        return project.owner_id == self.user.id
+
+
+class BatchUserPolicy(Policy):
+    def __init__(self, user: User) -> None:
+        self.user = user
+
+    @authorize_batch(ProjectPermissions.view)
+    async def can_view_projects(self, projects: List[Project]) -> List[bool]:
+        return [project.owner_id == self.user.id for project in projects]
+
+
+def build_batch_user_policy(user_id: Hashable) -> BatchUserPolicy:
+    return BatchUserPolicy(User(id=int(user_id)))  # type: ignore
+
+
+def build_user_policy(user_id: Hashable) -> UserPolicy:
+    return UserPolicy(User(id=int(user_id)))  # type: ignore
+
+
+def build_next_user_policy(user_id: Hashable) -> NextUserPolicy:
+    return NextUserPolicy(User(id=int(user_id)))  # type: ignore
+
+
+def get_user_id(policy: UserPolicy) -> int:
+    return policy.user.id
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> str:
+    return str(tmp_path / "decisions.trace")
+
+
+@pytest.fixture
+async def trace(path: str) -> str:
+    recorder = TraceRecorder(path, get_context=get_user_id, buffer_size=0)
+    for user_id in (1, 2):
+        ability = Ability(policy=UserPolicy(User(id=user_id)), trace_recorder=recorder)
+        for owner_id in (1, 2):
+            await ability.can(ProjectPermissions.view, Project(owner_id=owner_id))
+            ability.can_now(ProjectPermissions.edit, Project(owner_id=owner_id))
+    recorder.close()
+    return path
+
+
+class TestTraceRecorder:
+    async def test_records_decisions(self, path: str) -> None:
+        recorder = TraceRecorder(path, get_context=get_user_id)
+        ability = Ability(policy=UserPolicy(User(id=1)), trace_recorder=recorder)
+        assert await ability.can(ProjectPermissions.view, Project(owner_id=1))
+        assert not await ability.can(SessionPermissions.create, key="value")
+        recorder.close()
+
+        records = list(read_trace(path))
+        assert [
+            (record.permission, record.allowed, record.context) for record in records
+        ] == [
+            ("ProjectPermissions.view", True, 1),
+            ("SessionPermissions.create", False, 1),
+        ]
+        assert records[0].args[0].owner_id == 1
+        assert records[1].kwargs == {"key": "value"}
+        assert all(record.duration >= 0 for record in records)
+
+    def test_records_sync_decisions(self, path: str) -> None:
+        recorder = TraceRecorder(path)
+        ability = SyncAbility(
+            policy=NextUserPolicy(User(id=1)), trace_recorder=recorder
+        )
+        assert ability.can(ProjectPermissions.view, Project(owner_id=2))
+        assert ability.can_many(ProjectPermissions.edit, [Project(owner_id=1)]) == [
+            True
+        ]
+        recorder.close()
+        assert [record.permission for record in read_trace(path)] == [
+            "ProjectPermissions.view",
+            "ProjectPermissions.edit",
+        ]
+
+    async def test_samples_decisions(self, path: str) -> None:
+        recorder = TraceRecorder(path, sample_rate=0.0)
+        ability = Ability(policy=UserPolicy(User(id=1)), trace_recorder=recorder)
+        await ability.can(ProjectPermissions.view, Project(owner_id=1))
+        recorder.close()
+        assert list(read_trace(path)) == []
+
+    async def test_drops_unpicklable_arguments(self, path: str) -> None:
+        recorder = TraceRecorder(path)
+        ability = Ability(trace_recorder=recorder)
+        await ability.can(ProjectPermissions.view, lambda: None)
+        recorder.close()
+        assert recorder.dropped == 1
+        assert list(read_trace(path)) == []
+
+    def test_writes_records_from_background_thread(self, path: str) -> None:
+        recorder = TraceRecorder(path, buffer_size=0, flush_interval=60)
+        SyncAbility(trace_recorder=recorder).can(ProjectPermissions.view)
+        # written once the buffer is full, without waiting for the interval
+        deadline = time.monotonic() + 5
+        while os.path.getsize(path) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(list(read_trace(path))) == 1
+        recorder.close()
+        # closing twice (ex: at exit) does nothing
+        recorder.close()
+        assert len(list(read_trace(path))) == 1
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+    def test_writes_records_of_forked_processes(self, path: str) -> None:
+        recorder = TraceRecorder(path, buffer_size=0, flush_interval=60)
+        ability = SyncAbility(trace_recorder=recorder)
+        ability.can(ProjectPermissions.view)
+        pid = os.fork()
+        if pid == 0:
+            # the child has its own background thread writing its records
+            ability.can(ProjectPermissions.edit)
+            deadline = time.monotonic() + 5
+            while len(list(read_trace(path))) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            os._exit(0 if len(list(read_trace(path))) == 2 else 1)
+        _, status = os.waitpid(pid, 0)
+        recorder.close()
+        assert os.WEXITSTATUS(status) == 0
+        assert sorted(record.permission for record in read_trace(path)) == [
+            "ProjectPermissions.edit",
+            "ProjectPermissions.view",
+        ]
+
+    async def test_appends_to_trace(self, trace: str) -> None:
+        recorder = TraceRecorder(trace)
+        await Ability(trace_recorder=recorder).can(ProjectPermissions.view)
+        recorder.close()
+        assert len(list(read_trace(trace))) == 9
+
+    def test_ignores_truncated_frame(self, trace: str) -> None:
+        with open(trace, "ab") as file:
+            file.write(b"\x00\x00\x01\x00partial")
+        assert len(list(read_trace(trace))) == 8
+
+
+class TestReplay:
+    def test_reports_same_decisions(self, trace: str) -> None:
+        report = replay_trace(trace, build_user_policy)
+        assert report.checks == 8
+        assert report.changed == []
+        assert report.throughput > 0
+        assert len(report.latencies) == len(report.recorded_latencies) == 8
+        assert report.percentile(0.5) <= report.percentile(0.99)
+
+    def test_reports_changed_decisions(self, trace: str) -> None:
+        report = replay_trace(trace, build_next_user_policy)
+        assert [
+            (change.position, change.record.context, change.allowed)
+            for change in report.changed
+        ] == [(2, 1, True), (4, 2, True)]
+        assert all(
+            isinstance(change.record, TraceRecord) and not change.record.allowed
+            for change in report.changed
+        )
+        assert "changed decisions: 2" in format_report(report)
+        assert "... 1 more" in format_report(report, max_changes=1)
+
+    async def test_replays_batch_decisions(self, path: str) -> None:
+        recorder = TraceRecorder(path, get_context=get_user_id)
+        ability = Ability(policy=BatchUserPolicy(User(id=1)), trace_recorder=recorder)
+        projects = [Project(owner_id=1), Project(owner_id=2)]
+        assert await ability.can_many(ProjectPermissions.view, projects) == [
+            True,
+            False,
+        ]
+        recorder.close()
+        report = await asyncio.to_thread(replay_trace, path, build_batch_user_policy)
+        assert report.checks == 2
+        assert report.changed == []
+
+    async def test_replays_with_default_action(self, path: str) -> None:
+        recorder = TraceRecorder(path, get_context=get_user_id)
+        ability = Ability(
+            policy=UserPolicy(User(id=1)),
+            trace_recorder=recorder,
+            default_action=Action.ALLOW,
+        )
+        assert await ability.can(SessionPermissions.create)
+        recorder.close()
+        report = await asyncio.to_thread(
+            replay_trace, path, build_user_policy, default_action=Action.ALLOW
+        )
+        assert report.changed == []
+        report = await asyncio.to_thread(replay_trace, path, build_user_policy)
+        assert [change.allowed for change in report.changed] == [False]
+
+    def test_replays_in_worker_processes(self, trace: str) -> None:
+        report = replay_trace(
+            trace,
+            build_next_user_policy,
+            workers=2,
+            chunk_size=3,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        assert report.checks == 8
+        assert [change.position for change in report.changed] == [2, 4]
+
+    def test_command_line(self, trace: str, capsys: pytest.CaptureFixture[str]) -> None:
+        main([trace, "tests.deny.test_trace:build_next_user_policy"])
+        output = capsys.readouterr().out
+        assert "checks: 8" in output
+        assert "#2 ProjectPermissions.view context=1" in output
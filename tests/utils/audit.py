@@ -0,0 +1,15 @@
+from typing import List
+
+from deny.audit import AuditRecord, AuditSink
+
+
+class MemorySink(AuditSink):
+    def __init__(self) -> None:
+        self.records: List[AuditRecord] = []
+        self.closed = False
+
+    def write(self, records: List[AuditRecord]) -> None:
+        self.records.extend(records)
+
+    def close(self) -> None:
+        self.closed = True
@@ -8,6 +8,11 @@ _ROOT_DIR = Path(__file__).absolute().parent.parent
 _ASYNC_TESTS_DIR = _ROOT_DIR / "tests/deny/_async"
 _SYNC_TESTS_DIR = _ROOT_DIR / "tests/deny/_sync"
 _ASYNC_LIB_DIR = _ROOT_DIR / "deny/_async"
+_SYNC_LIB_DIR = _ROOT_DIR / "deny/_sync"
+# the lines between these comments (ex: branches calling the synchronous
+# access methods of an asynchronous policy) are removed from the sync code
+_ASYNC_ONLY_BEGIN = "# unasync: begin async only"
+_ASYNC_ONLY_END = "# unasync: end async only"
 
 
 def _get_python_files_from_directory(directory: Path) -> List[str]:
@@ -19,8 +24,29 @@ def _get_python_files_from_directory(directory: Path) -> List[str]:
     return filepaths
 
 
+def _remove_async_only_blocks(content: str) -> str:
+    lines: List[str] = []
+    is_async_only = False
+    for line in content.splitlines(keepends=True):
+        if line.strip() == _ASYNC_ONLY_BEGIN:
+            is_async_only = True
+        elif line.strip() == _ASYNC_ONLY_END:
+            is_async_only = False
+        elif not is_async_only:
+            lines.append(line)
+    return "".join(lines)
+
+
 def main():
-    additional_replacements = {"AccessMethod": "SyncAccessMethod"}
+    additional_replacements = {
+        "AccessMethod": "SyncAccessMethod",
+        "AnyAccessMethod": "SyncAccessMethod",
+        "BatchAccessMethod": "SyncBatchAccessMethod",
+        "AnyBatchAccessMethod": "SyncBatchAccessMethod",
+        "BatchLoadFunction": "SyncBatchLoadFunction",
+        "FetchFunction": "SyncFetchFunction",
+        "CompiledCan": "SyncCompiledCan",
+    }
     rules = [
         unasync.Rule(
             fromdir="deny/_async/",
@@ -38,6 +64,13 @@ def main():
     ) + _get_python_files_from_directory(_ASYNC_TESTS_DIR)
     unasync.unasync_files(filepaths, rules)
 
+    for filepath in _get_python_files_from_directory(_SYNC_LIB_DIR):
+        file = Path(filepath)
+        content = file.read_text()
+        new_content = _remove_async_only_blocks(content)
+        if content != new_content:
+            file.write_text(new_content)
+
     for filepath in _get_python_files_from_directory(_SYNC_TESTS_DIR):
         file = Path(filepath)
         content = file.read_text()